@@ -0,0 +1,69 @@
+"""
+Compare the legacy `INSERT ... VALUES` text path with the native columnar
+insert path of ClickHouseServices.
+
+    python -m benchmarks.clickhouse_insert --rows 10000 100000
+    python -m benchmarks.clickhouse_insert --rows 10000 --build-only
+
+Needs the usual CLICKHOUSE_* variables; point them at a scratch database,
+rows are really inserted into `logs` (twice per path: once timed, once
+under tracemalloc) unless --build-only is given.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_entries
+from src.db.clickhouse.services import ClickHouseServices
+
+
+def measure(label: str, fn, rows: int) -> dict:
+    gc.collect()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+
+    # second run under tracemalloc so the timing above isn't skewed by tracing
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "path": label,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed) if elapsed else None,
+        "peak_mib": round(peak / (1024 * 1024), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--build-only", action="store_true", help="only build the payload, don't send it")
+    args = parser.parse_args()
+
+    service = ClickHouseServices()
+    results = []
+
+    for rows in args.rows:
+        entries = make_entries(rows)
+        payloads = service._unpack_entries(entries)
+
+        if args.build_only:
+            results.append(measure("sql_values (build)", lambda: service._build_insert_sql(payloads), rows))
+            results.append(measure("native (build)", lambda: service._build_columns(payloads), rows))
+        else:
+            results.append(measure("sql_values", lambda: service._insert_sql(payloads), rows))
+            results.append(measure("native", lambda: service._insert_native(payloads), rows))
+
+    print(f"{'path':<22}{'rows':>10}{'seconds':>10}{'rows/sec':>12}{'peak MiB':>10}")
+    for r in results:
+        print(f"{r['path']:<22}{r['rows']:>10}{r['seconds']:>10}{r['rows_per_sec']:>12}{r['peak_mib']:>10}")
+
+
+if __name__ == "__main__":
+    main()
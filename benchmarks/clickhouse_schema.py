@@ -0,0 +1,101 @@
+"""
+Storage and scan cost of the original `logs` layout vs the migrated one
+(src/db/clickhouse/migrations.py).
+
+    python -m src.db.clickhouse.migrations migrate
+    python -m src.db.clickhouse.migrations backfill      # no --swap
+    python -m benchmarks.clickhouse_schema --old logs --new logs_v2
+
+Storage comes from system.parts. Each scan is a /logs/query page built by
+LogQueryService against both tables; rows/bytes read are taken from the
+ClickHouse query summary, so they show how much the sort key, partitions
+and skip indexes prune.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.db.clickhouse.services import ClickHouseServices
+from src.fetch.query import LogQueryService
+from src.models.query import LogQuery
+
+
+def storage(client, table: str) -> dict:
+    row = client.query(
+        """
+        SELECT sum(rows), sum(data_compressed_bytes), sum(data_uncompressed_bytes),
+               uniqExact(partition), count()
+        FROM system.parts
+        WHERE database = currentDatabase() AND table = {table:String} AND active
+        """,
+        parameters={"table": table},
+    ).result_rows[0]
+    return {"rows": row[0], "compressed": row[1], "uncompressed": row[2], "partitions": row[3], "parts": row[4]}
+
+
+def sample_filters(client, table: str, app_id: str | None) -> dict:
+    if app_id is None:
+        app_id = str(client.command(f"SELECT app_id FROM {table} GROUP BY app_id ORDER BY count() DESC LIMIT 1"))
+    event_name, session_id = client.query(
+        f"""
+        SELECT event_name, toString(request_info.session_id)
+        FROM {table} WHERE app_id = {{app_id:UUID}} AND event_name IS NOT NULL
+        LIMIT 1
+        """,
+        parameters={"app_id": app_id},
+    ).result_rows[0]
+    return {"app_id": app_id, "event_name": event_name, "session_id": session_id}
+
+
+def scan(services: ClickHouseServices, table: str, app_id: str, params: LogQuery, repeat: int) -> dict:
+    service = LogQueryService(services, table=table)
+    query, parameters = service.build_query(app_id, params)
+    timings, summary = [], {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = services.init.client.query(query, parameters=parameters, settings={"use_query_cache": 0})
+        timings.append(time.perf_counter() - start)
+        summary = result.summary or {}
+    timings.sort()
+    return {
+        "ms": timings[len(timings) // 2] * 1000,
+        "read_rows": int(summary.get("read_rows", 0)),
+        "read_mib": int(summary.get("read_bytes", 0)) / (1024 * 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--old", default="logs")
+    parser.add_argument("--new", default="logs_v2")
+    parser.add_argument("--app-id", default=None, help="tenant to query; the busiest one when omitted")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    services = ClickHouseServices()
+    client = services.init.client
+
+    print(f"{'table':<12}{'rows':>12}{'compressed MiB':>16}{'raw MiB':>10}{'ratio':>8}{'partitions':>12}{'parts':>8}")
+    for table in (args.old, args.new):
+        s = storage(client, table)
+        ratio = s["uncompressed"] / s["compressed"] if s["compressed"] else 0
+        print(f"{table:<12}{s['rows']:>12}{s['compressed'] / 2**20:>16.1f}{s['uncompressed'] / 2**20:>10.1f}{ratio:>8.1f}{s['partitions']:>12}{s['parts']:>8}")
+
+    filters = sample_filters(client, args.old, args.app_id)
+    day_ago = datetime.now(timezone.utc) - timedelta(days=1)
+    cases = {
+        "tenant page": LogQuery(),
+        "tenant last 24h": LogQuery(start=day_ago),
+        "event_name": LogQuery(event_name=filters["event_name"]),
+        "session_id": LogQuery(session_id=filters["session_id"]),
+    }
+
+    print(f"\n{'query':<18}{'table':<12}{'p50 ms':>10}{'read rows':>14}{'read MiB':>10}")
+    for label, params in cases.items():
+        for table in (args.old, args.new):
+            r = scan(services, table, filters["app_id"], params, args.repeat)
+            print(f"{label:<18}{table:<12}{r['ms']:>10.1f}{r['read_rows']:>14}{r['read_mib']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Time to shape /logs/get responses: the pandas path (DataFrame flatten,
+concat, tz convert, strftime, recursive sanitize) vs src/fetch/shaping.py.
+No servers are needed.
+
+    python -m benchmarks.fetch_shaping --rows 10000 100000
+
+Half of the rows look like Redis payloads (ISO string timestamps), half like
+ClickHouse rows (UUID log_id, naive datetime timestamp).
+"""
+import argparse
+import math
+import time
+import uuid
+from datetime import date, datetime
+
+from benchmarks.synthetic import make_payload
+from src.fetch.fetch_logs import FetchLogs
+
+
+class _Source:
+    hot_index = False
+
+    def __init__(self, redis_entries: list[dict], clickhouse_rows: list[dict]):
+        self.redis_entries = redis_entries
+        self.clickhouse_rows = clickhouse_rows
+
+    def get_object(self):
+        return self.redis_entries
+
+    def fetch_logs(self):
+        return self.clickhouse_rows
+
+
+def make_sources(rows: int) -> _Source:
+    redis_entries, clickhouse_rows = [], []
+    for i in range(rows):
+        payload = make_payload(i)
+        if i % 2:
+            redis_entries.append({payload.pop("log_id"): payload})
+        else:
+            payload["log_id"] = uuid.UUID(payload["log_id"])
+            payload["timestamp"] = datetime.fromisoformat(payload["timestamp"]).replace(tzinfo=None)
+            clickhouse_rows.append(payload)
+    return _Source(redis_entries, clickhouse_rows)
+
+
+def pandas_path(source: _Source) -> list[dict]:
+    import numpy as np
+
+    df = FetchLogs(redis_services=source, clickhouse_services=source).merge_format_logs()
+    if df["timestamp"].dt.tz is not None:
+        df["timestamp"] = df["timestamp"].dt.tz_convert("Asia/Kolkata")
+    else:
+        df["timestamp"] = df["timestamp"].dt.tz_localize("UTC").dt.tz_convert("Asia/Kolkata")
+    df["timestamp"] = df["timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%S+05:30")
+    records = df.to_dict(orient="records")
+
+    def sanitize(obj):
+        if isinstance(obj, dict):
+            return {k: sanitize(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [sanitize(v) for v in obj]
+        if isinstance(obj, uuid.UUID):
+            return str(obj)
+        if isinstance(obj, (datetime, date)):
+            return obj.isoformat()
+        if isinstance(obj, float) and (math.isnan(obj) or math.isinf(obj)):
+            return None
+        if isinstance(obj, (np.integer,)):
+            return int(obj)
+        if isinstance(obj, (np.floating,)):
+            return None if math.isnan(obj) else float(obj)
+        if isinstance(obj, np.ndarray):
+            return sanitize(obj.tolist())
+        return obj
+
+    return sanitize(records)
+
+
+def shaping_path(source: _Source) -> list[dict]:
+    return FetchLogs(redis_services=source, clickhouse_services=source).shaped_logs()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8}  {'path':<10}{'ms':>10}{'us/row':>10}")
+    for rows in args.rows:
+        source = make_sources(rows)
+        for label, path in (("pandas", pandas_path), ("shaping", shaping_path)):
+            try:
+                start = time.perf_counter()
+                path(source)
+                elapsed = time.perf_counter() - start
+            except ImportError as e:
+                print(f"{rows:>8}  {label:<10}  skipped ({e})")
+                continue
+            print(f"{rows:>8}  {label:<10}{elapsed * 1000:>10.1f}{elapsed / rows * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
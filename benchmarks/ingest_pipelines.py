@@ -0,0 +1,80 @@
+"""
+Compare the Redis-buffered pipeline with direct-to-ClickHouse async inserts
+under the same load: per-log ingest latency percentiles and the number of
+active parts each pipeline leaves behind.
+
+    python -m benchmarks.ingest_pipelines --logs 5000 --threads 8
+    python -m benchmarks.ingest_pipelines --logs 5000 --no-wait
+
+Needs the CLICKHOUSE_* and REDIS_* variables of a scratch environment.
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.synthetic import make_payload
+from src.logging.flusher import BackgroundFlusher
+from src.logging.ingestion import LogIngestionService
+from src.models.logs import Logs
+
+BUFFERED_APP_ID = "00000000-0000-4000-8000-00000000b0ff"
+DIRECT_APP_ID = "00000000-0000-4000-8000-0000000d1ec7"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(service: LogIngestionService, app_id: str, logs: int, threads: int) -> list[float]:
+    def ingest_one(i: int) -> float:
+        log_object = Logs.model_validate(make_payload(i, app_id=app_id))
+        start = time.perf_counter()
+        service.ingest_log(log_object)
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(ingest_one, range(logs)))
+
+
+def report(label: str, latencies: list[float], parts_before: dict, parts_after: dict) -> None:
+    print(
+        f"{label:<10} p50={percentile(latencies, 50):7.2f}ms  p95={percentile(latencies, 95):7.2f}ms  "
+        f"p99={percentile(latencies, 99):7.2f}ms  mean={statistics.mean(latencies):7.2f}ms  "
+        f"new_parts={parts_after.get('parts', 0) - parts_before.get('parts', 0)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logs", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--no-wait", action="store_true", help="wait_for_async_insert=0 for the direct pipeline")
+    args = parser.parse_args()
+
+    service = LogIngestionService(internal_batch_size=1)
+    service.direct_app_ids = {DIRECT_APP_ID}
+    if args.no_wait:
+        service.click_house_services.wait_for_async_insert = False
+    clickhouse = service.click_house_services
+
+    # buffered: Redis write on the request path, background flusher drains it
+    flusher = BackgroundFlusher(service)
+    flusher.start()
+    parts_before = clickhouse.part_stats()
+    buffered = run(service, BUFFERED_APP_ID, args.logs, args.threads)
+    flusher.stop()
+    report("buffered", buffered, parts_before, clickhouse.part_stats())
+
+    # direct: async insert straight into ClickHouse
+    parts_before = clickhouse.part_stats()
+    direct = run(service, DIRECT_APP_ID, args.logs, args.threads)
+    # give the server time to flush its async insert buffers
+    time.sleep(clickhouse.async_insert_busy_timeout_ms / 1000 + 1)
+    report("direct", direct, parts_before, clickhouse.part_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Requests/sec on one uvicorn worker with the blocking request path
+(INGEST_ASYNC_IO=false) and the asyncio one (INGEST_ASYNC_IO=true).
+
+    python -m benchmarks.ingest_rps --api-key <key> --concurrency 64 --seconds 20
+
+Each mode starts its own `uvicorn main:app --workers 1` against the backends
+configured in the environment and hammers one endpoint from `--concurrency`
+concurrent clients. Latency percentiles are per request, client side.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.synthetic import make_payload
+
+
+async def wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{base_url}/health_check")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("server did not come up")
+
+
+async def hammer(base_url: str, path: str, api_key: str, concurrency: int, seconds: float) -> dict:
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    deadline = time.monotonic() + seconds
+
+    async def worker(client: httpx.AsyncClient, worker_id: int) -> None:
+        i = 0
+        while time.monotonic() < deadline:
+            payload = make_payload(worker_id * 1_000_000 + i)
+            payload.pop("log_id")
+            payload.pop("app_id")
+            start = time.perf_counter()
+            response = await client.post(
+                f"{base_url}{path}",
+                content=json.dumps(payload),
+                headers={"X-API-Key": api_key, "Content-Type": "application/json"},
+            )
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            i += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        started = time.monotonic()
+        await asyncio.gather(*(worker(client, n) for n in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": pct(0.50),
+        "p99": pct(0.99),
+        "statuses": statuses,
+    }
+
+
+def run_mode(async_io: bool, args) -> dict:
+    env = {**os.environ, "INGEST_ASYNC_IO": "true" if async_io else "false"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--workers", "1", "--port", str(args.port), "--log-level", "warning"],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        asyncio.run(wait_ready(base_url))
+        # warm the engine and the auth cache before measuring
+        asyncio.run(hammer(base_url, args.path, args.api_key, concurrency=2, seconds=1))
+        return asyncio.run(hammer(base_url, args.path, args.api_key, args.concurrency, args.seconds))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api-key", required=True)
+    parser.add_argument("--path", default="/logging/ingest")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}  statuses")
+    for label, async_io in (("blocking", False), ("asyncio", True)):
+        result = run_mode(async_io, args)
+        print(f"{label:<10}{result['rps']:>10.1f}{result['p50']:>10.2f}{result['p99']:>10.2f}  {result['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
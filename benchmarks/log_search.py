@@ -0,0 +1,69 @@
+"""
+Rows and bytes ClickHouse reads for a /logs/search query with and without
+the message skip indexes, next to the old approach of scanning the JSON.
+
+    python -m benchmarks.log_search --q "timeout" --mode tokens
+    python -m benchmarks.log_search --q "payment fail" --mode prefix --app-id <uuid>
+
+Needs migration 4 (and materialize-search for older parts). "json scan" is
+positionCaseInsensitive over message_info.message with no index to help.
+"""
+import argparse
+import time
+
+from src.db.clickhouse.services import ClickHouseServices
+from src.fetch.search import LogSearchService
+from src.models.query import LogSearchQuery
+
+
+def run(client, query: str, parameters: dict, settings: dict, repeat: int) -> dict:
+    timings, summary = [], {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = client.query(query, parameters=parameters, settings={"use_query_cache": 0, **settings})
+        timings.append(time.perf_counter() - start)
+        summary = result.summary or {}
+    timings.sort()
+    return {
+        "ms": timings[len(timings) // 2] * 1000,
+        "read_rows": int(summary.get("read_rows", 0)),
+        "read_mib": int(summary.get("read_bytes", 0)) / (1024 * 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--q", required=True)
+    parser.add_argument("--mode", choices=["tokens", "phrase", "prefix"], default="tokens")
+    parser.add_argument("--app-id", default=None, help="tenant to search; the busiest one when omitted")
+    parser.add_argument("--table", default="logs")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    services = ClickHouseServices()
+    client = services.init.client
+    app_id = args.app_id or str(client.command(f"SELECT app_id FROM {args.table} GROUP BY app_id ORDER BY count() DESC LIMIT 1"))
+
+    service = LogSearchService(services, table=args.table)
+    query, parameters = service.build_query(app_id, LogSearchQuery(q=args.q, mode=args.mode))
+    json_scan = f"""
+        SELECT log_id FROM {args.table}
+        WHERE app_id = {{app_id:UUID}}
+          AND positionCaseInsensitive(toString(message_info.message), {{q:String}}) > 0
+        ORDER BY timestamp DESC
+        LIMIT 100
+    """
+
+    cases = [
+        ("json scan", json_scan, {"app_id": app_id, "q": args.q}, {}),
+        ("no skip idx", query, parameters, {"use_skip_indexes": 0}),
+        ("skip indexes", query, parameters, {"use_skip_indexes": 1}),
+    ]
+    print(f"{'path':<14}{'p50 ms':>10}{'read rows':>14}{'read MiB':>10}")
+    for label, sql, params, settings in cases:
+        r = run(client, sql, params, settings, args.repeat)
+        print(f"{label:<14}{r['ms']:>10.1f}{r['read_rows']:>14}{r['read_mib']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
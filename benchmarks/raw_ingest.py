@@ -0,0 +1,61 @@
+"""
+CPU per log for the model ingest path vs the raw bytes lane, from request
+body to the ClickHouse insert body. No servers are needed.
+
+    python -m benchmarks.raw_ingest --logs 20000
+
+"model" is POST /logging/ingest with the native flush (Logs model, dump,
+Redis JSON round trip, row dict); "raw" is POST /logging/ingest/raw with
+CLICKHOUSE_INSERT_MODE=jsoneachrow.
+"""
+import argparse
+import json
+import time
+
+from benchmarks.synthetic import make_payload
+from src.db.clickhouse.services import ClickHouseServices
+from src.db.redis.codec import PayloadCodec, payload_to_json_bytes
+from src.logging.ingestion import _with_log_id
+from src.logging.url import _stamp_tenant
+from src.models.logs import Logs
+
+TENANT = {"app_id": "b158dac7-eb5a-4823-81fa-a2c1143eceab", "server_id": "7d5c2f0e-3f7a-4c1e-9a59-5b7b0f2c8e11"}
+
+
+def model_path(bodies: list[bytes], codec: PayloadCodec) -> None:
+    for body in bodies:
+        log_model = _stamp_tenant(Logs.model_validate(json.loads(body)), TENANT)
+        blob = codec.encode(json.loads(log_model.model_dump_json(exclude_none=True)))
+        ClickHouseServices._payload_to_dict(payload_to_json_bytes(blob))
+
+
+def raw_path(bodies: list[bytes], codec: PayloadCodec) -> None:
+    rows = []
+    for i, body in enumerate(bodies):
+        log_model = _stamp_tenant(Logs.model_validate_json(body), TENANT)
+        blob = codec.encode_json_bytes(_with_log_id(str(i), log_model.model_dump_json(exclude_none=True).encode()))
+        rows.append(ClickHouseServices._json_row(payload_to_json_bytes(blob)))
+    b"\n".join(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logs", type=int, default=20_000)
+    args = parser.parse_args()
+
+    bodies = []
+    for i in range(args.logs):
+        payload = make_payload(i)
+        payload.pop("log_id")
+        bodies.append(json.dumps(payload).encode())
+
+    codec = PayloadCodec()
+    for label, path in (("model", model_path), ("raw", raw_path)):
+        start = time.perf_counter()
+        path(bodies, codec)
+        per_log = (time.perf_counter() - start) / len(bodies) * 1e6
+        print(f"{label:<8}{per_log:>10.2f} us/log")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Bytes per log and encode/decode time for every Redis payload codec available
+in this environment.
+
+    python -m benchmarks.redis_codecs --logs 20000
+
+zstd is measured with and without a dictionary trained on a separate sample
+of the same synthetic log shapes.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import make_payload
+from src.db.redis import codec as codec_module
+from src.db.redis.codec import PayloadCodec, decode_payload, train_zstd_dictionary
+
+
+def candidates(dict_path: str | None) -> list[tuple[str, dict]]:
+    combos = [("json (legacy)", {"serializer": "json"})]
+    if codec_module.orjson is not None:
+        combos.append(("orjson", {"serializer": "orjson"}))
+    if codec_module.msgpack is not None:
+        combos.append(("msgpack", {"serializer": "msgpack"}))
+
+    for name, kwargs in list(combos):
+        if codec_module.lz4_frame is not None:
+            combos.append((f"{name} + lz4", {**kwargs, "compression": "lz4"}))
+        if codec_module.zstandard is not None:
+            combos.append((f"{name} + zstd", {**kwargs, "compression": "zstd"}))
+            if dict_path:
+                combos.append((f"{name} + zstd dict", {**kwargs, "compression": "zstd", "zstd_dict_path": dict_path}))
+    return combos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logs", type=int, default=20_000)
+    parser.add_argument("--train", type=int, default=5_000, help="samples used to train the zstd dictionary")
+    args = parser.parse_args()
+
+    payloads = [make_payload(i) for i in range(args.logs)]
+
+    dict_path = None
+    if codec_module.zstandard is not None:
+        training = [PayloadCodec().serialize(make_payload(i)) for i in range(args.train)]
+        dict_path = os.path.join(tempfile.mkdtemp(), "bench.dict")
+        with open(dict_path, "wb") as f:
+            f.write(train_zstd_dictionary(training))
+
+    print(f"{'codec':<26}{'bytes/log':>11}{'encode us/log':>15}{'decode us/log':>15}")
+    for label, kwargs in candidates(dict_path):
+        codec = PayloadCodec(**kwargs)
+
+        start = time.perf_counter()
+        encoded = [codec.encode(p) for p in payloads]
+        encode_us = (time.perf_counter() - start) / len(payloads) * 1e6
+
+        start = time.perf_counter()
+        for blob in encoded:
+            decode_payload(blob)
+        decode_us = (time.perf_counter() - start) / len(payloads) * 1e6
+
+        bytes_per_log = sum(len(b) for b in encoded) / len(encoded)
+        print(f"{label:<26}{bytes_per_log:>11.1f}{encode_us:>15.2f}{decode_us:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+
+SEVERITIES = ["DEBUG", "INFO", "INFO", "INFO", "WARNING", "ERROR"]
+EVENT_TYPES = ["http_request", "db_query", "auth", "job"]
+STATUS_CODES = [200, 200, 200, 201, 204, 400, 401, 404, 500]
+
+
+def make_payload(i: int, app_id: str | None = None, now: datetime | None = None) -> dict:
+    """
+    One log shaped like the payloads the ingest endpoint buffers in Redis
+    (a stamped `Logs.model_dump()` after a JSON round trip).
+    """
+    now = now or datetime.now(timezone.utc)
+    session_id = str(uuid.UUID(int=random.getrandbits(128)))
+    request_id = str(uuid.uuid4())
+    event_type = random.choice(EVENT_TYPES)
+    status_code = random.choice(STATUS_CODES)
+    app_id = app_id or "b158dac7-eb5a-4823-81fa-a2c1143eceab"
+
+    return {
+        "log_id": str(uuid.uuid4()),
+        "timestamp": (now - timedelta(milliseconds=i * 37)).isoformat(),
+        "app_id": app_id,
+        "event_type": event_type,
+        "event_name": f"{event_type}.{random.choice(['start', 'finish', 'retry'])}",
+        "event_category": random.choice(["backend", "frontend", "worker"]),
+        "version": "1.4.2",
+        "server_info": {"hostname": f"web-{i % 12}", "portnumber": 8000 + i % 4},
+        "request_info": {
+            "severity_level": random.choice(SEVERITIES),
+            "status_code": status_code,
+            "session_id": session_id,
+            "request_id": request_id,
+            "request_type": random.choice(["GET", "POST", "PUT"]),
+            "success_flag": status_code < 400,
+        },
+        "message_info": {
+            "message": f"Handled {event_type} for user {i % 977} in {random.randint(1, 900)}ms",
+            "description": "Request completed" if status_code < 400 else "Request failed",
+        },
+        "source_info": {
+            "diagnostics": {
+                "request": {"request_id": request_id, "request_type": "GET", "session_id": session_id},
+            },
+            "source": {
+                "tenant": {"app_id": app_id, "server_id": "7d5c2f0e-3f7a-4c1e-9a59-5b7b0f2c8e11"},
+                "server": {"hostname": f"web-{i % 12}", "portnumber": 8000 + i % 4},
+            },
+        },
+    }
+
+
+def make_entries(count: int, app_id: str | None = None) -> list[dict]:
+    """`{log_id: payload}` entries, the shape returned by RedisServices.drain_batch()."""
+    now = datetime.now(timezone.utc)
+    entries = []
+    for i in range(count):
+        payload = make_payload(i, app_id=app_id, now=now)
+        entries.append({payload["log_id"]: payload})
+    return entries
@@ -1,11 +1,26 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
 
 from src.logging.url import router as logging_router
 from src.fetch.urls import router as fetch_logs_router
+from src.logging.engine import get_engine, start_engine, shutdown_engine
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # build every backend client once and reuse it for the life of the process
+    app.state.engine = start_engine()
+    yield
+    if app.state.engine is not None:
+        # the asyncio Redis pool belongs to this event loop, close it here
+        await app.state.engine.async_redis_services.close()
+    shutdown_engine()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 # app.add_middleware(
 #     CORSMiddleware,
@@ -20,6 +35,26 @@ async def health_check():
     return {"server": "ok"}
 
 
+@app.get("/health_check/backends")
+def backends_health_check():
+    try:
+        status = get_engine().ensure_healthy(force=True)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Ingestion engine unavailable: {str(e)}")
+
+    if not all(status.values()):
+        raise HTTPException(status_code=503, detail=status)
+    return status
+
+
+@app.get("/health_check/query_cache")
+def query_cache_metrics():
+    cache = get_engine().query_cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.metrics()}
+
+
 @app.get("/debug-routes")
 async def debug_routes():
     return [{"path": r.path, "name": r.name} for r in app.routes]
@@ -28,4 +63,6 @@ app.include_router(logging_router)
 app.include_router(fetch_logs_router)
 
 # If your routes are mounted without a prefix issue, use this:
+# Mangum runs the ASGI lifespan on every invocation, so keep it off and let
+# get_engine() build the shared clients lazily; they then survive warm invocations.
 handler = Mangum(app, lifespan="off", api_gateway_base_path=None)
\ No newline at end of file
@@ -1,19 +1,40 @@
-from typing import Optional, Tuple
+import hashlib
+from typing import Any, Awaitable, Callable, Optional, Tuple
 
+from src.api_key.cache import APIKeyCache
+from src.api_key.revocation import RevocationSet
+from src.api_key.signed import SignedAPIKeys, is_signed_key
 from src.db.postgres.services import PostgresServices
 from src.utils.utils import logging, Crypting
 
+
+def _aes_key_id(api_key: str) -> str:
+    # AES keys carry no key id; their digest goes on the revocation list instead
+    return "aes:" + hashlib.sha256(api_key.encode()).hexdigest()
+
+
 class GenerateAPIKey:
-    def __init__(self):
-        self.db_pgs = PostgresServices()
+    def __init__(self, db_pgs: PostgresServices | None = None, cache: APIKeyCache | None = None):
+        self.db_pgs = db_pgs or PostgresServices()
         self.crypting = Crypting()
+        self.cache = cache
+
+        # signed keys verify without Postgres; AES keys keep the lookup path
+        self.signed_keys = SignedAPIKeys()
+        self.revocations = RevocationSet(load=lambda: self.db_pgs.get_revoked_key_ids())
 
     def generate_api_key(self, app_id: str) -> Optional[str]:
         try:
             server_id = self.db_pgs.get_servers_by_app_id(app_id)[0].get('server_id')
             logging.info(f"Generating api key for app id: {app_id} and server id: {server_id}")
-            api_key = self.crypting.encrypt(f"{app_id}:{server_id}")
+            if self.signed_keys.enabled:
+                api_key, _ = self.signed_keys.issue(app_id=app_id, server_id=server_id)
+            else:
+                api_key = self.crypting.encrypt(f"{app_id}:{server_id}")
             insert_true = self.db_pgs.insert_api_key(app_id=app_id, api_key=api_key)
+            if self.cache is not None:
+                # drop a negative entry left by anyone who tried this key before it existed
+                self.cache.invalidate(api_key)
 
             return api_key
             
@@ -22,11 +43,115 @@ class GenerateAPIKey:
             return None
 
 
-    def validate_api_key(self, api_key: str) -> Tuple[bool, Optional[str], Optional[str]]:
+    def revoke_api_key(self, api_key: str) -> bool:
         try:
-            if not api_key or not isinstance(api_key, str):
+            if is_signed_key(api_key):
+                claims = self.signed_keys.verify(api_key)
+                if not claims:
+                    return False
+
+                revoked = self.db_pgs.insert_revoked_api_key(
+                    key_id=claims["k"],
+                    app_id=claims["a"],
+                    expires_at=claims.get("e") or None,
+                )
+                if not revoked:
+                    logging.error(f"Signed API key revocation not stored | app_id={claims['a']} | key_id={claims['k']}")
+                    return False
+                self.db_pgs.delete_api_key(app_id=claims["a"], api_key=api_key)
+                self.revocations.add(claims["k"])
+
+                logging.info(f"Signed API key revoked | app_id={claims['a']} | key_id={claims['k']}")
+                return True
+
+            decrypted = self.crypting.decrypt(api_key)
+            if not decrypted or ":" not in decrypted:
+                return False
+
+            # the server_id inside the key stays valid, so deleting the api_keys row alone
+            # would not stop the key; it goes on the same revocation list as signed keys
+            app_id, _ = decrypted.split(":", 1)
+            key_id = _aes_key_id(api_key)
+            if not self.db_pgs.insert_revoked_api_key(key_id=key_id, app_id=app_id):
+                logging.error(f"API key revocation not stored | app_id={app_id}")
+                return False
+            self.revocations.add(key_id)
+            deleted = self.db_pgs.delete_api_key(app_id=app_id, api_key=api_key)
+            if self.cache is not None and not self.cache.invalidate(api_key):
+                # the revocation is stored and safe to repeat; report failure so the caller retries
+                logging.error(f"API key revoked but its cached validation was not dropped | app_id={app_id}")
+                return False
+
+            logging.info(f"API key revoked | app_id={app_id} | deleted={deleted}")
+            return True
+
+        except Exception as e:
+            logging.error(f"Error revoking API key: {str(e)}")
+            return False
+
+
+    def validate_api_key(self, api_key: str) -> Tuple[bool, Optional[str], Optional[str]]:
+        if not api_key or not isinstance(api_key, str):
+            return (False, None, None)
+
+        if is_signed_key(api_key):
+            return self._validate_signed_key(api_key)
+
+        # ahead of the cache, so a positive entry cached elsewhere can't outlive a revocation
+        if self.revocations.is_revoked(_aes_key_id(api_key)):
+            logging.info("Revoked API key rejected")
+            return (False, None, None)
+
+        if self.cache is not None:
+            cached = self.cache.get(api_key)
+            if cached is not None:
+                return cached
+
+        result = self._validate_api_key(api_key)
+        if self.cache is not None:
+            self.cache.set(api_key, result)
+        return result
+
+
+    async def validate_api_key_async(
+        self,
+        api_key: str,
+        run_blocking: Callable[..., Awaitable[Any]],
+    ) -> Tuple[bool, Optional[str], Optional[str]]:
+        """
+        validate_api_key() for async endpoints. Signed keys, revoked keys and
+        in-process cache hits are answered on the loop; anything that may
+        reach Redis or Postgres goes through `run_blocking`.
+        """
+        if not api_key or not isinstance(api_key, str):
+            return (False, None, None)
+
+        if not self.revocations.sync_due():
+            if is_signed_key(api_key):
+                return self._validate_signed_key(api_key)
+            if self.revocations.is_revoked(_aes_key_id(api_key)):
                 return (False, None, None)
+            cached = self.cache.get_local(api_key) if self.cache is not None else None
+            if cached is not None:
+                return cached
+
+        return await run_blocking(self.validate_api_key, api_key)
+
+
+    def _validate_signed_key(self, api_key: str) -> Tuple[bool, Optional[str], Optional[str]]:
+        claims = self.signed_keys.verify(api_key)
+        if not claims:
+            return (False, None, None)
 
+        if self.revocations.is_revoked(claims["k"]):
+            logging.info(f"Revoked API key rejected | app_id={claims['a']} | key_id={claims['k']}")
+            return (False, None, None)
+
+        return (True, claims["a"], claims["s"])
+
+
+    def _validate_api_key(self, api_key: str) -> Tuple[bool, Optional[str], Optional[str]]:
+        try:
             decrypted = self.crypting.decrypt(api_key)
             if not decrypted or ":" not in decrypted:
                 return (False, None, None)
@@ -34,18 +159,11 @@ class GenerateAPIKey:
             app_id, server_id = decrypted.split(":", 1)
             logging.info(f"Decrypted API Key - App ID: {app_id}, Server ID: {server_id}")
 
-            app = self.db_pgs.get_app_by_app_id(app_id)
-            if not app:
+            tenant = self.db_pgs.resolve_tenant(app_id=app_id, server_id=server_id, api_key=api_key)
+            if not tenant:
                 return (False, None, None)
 
-            key_row = self.db_pgs.get_api_key(app_id=app_id, api_key=api_key)
-            if key_row:
-                return (True, app_id, server_id)
-
-            servers = self.db_pgs.get_servers_by_app_id(app_id) or []
-            valid_server_ids = {s.get("server_id") for s in servers if s.get("server_id")}
-
-            if server_id in valid_server_ids:
+            if tenant["key_found"] or tenant["server_found"]:
                 return (True, app_id, server_id)
 
             return (False, None, None)
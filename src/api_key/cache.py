@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from src.utils.utils import logging
+
+ValidationResult = Tuple[bool, Optional[str], Optional[str]]
+
+
+class APIKeyCache:
+    """
+    Two-level cache of `validate_api_key` results: an in-process LRU with TTL
+    in front of an optional shared Redis layer.
+
+    Keys are stored as sha256 digests, never in clear. Failed validations are
+    cached for `negative_ttl` only, long enough to absorb a key-guessing flood
+    but short enough that a freshly inserted key works almost immediately even
+    on instances that did not see the insert. Invalidation reaches Redis and
+    this process; other processes drop their copy within `local_ttl`.
+    """
+
+    def __init__(
+        self,
+        redis_client: Callable[[], Any] | None = None,
+        max_size: int | None = None,
+        ttl: float | None = None,
+        negative_ttl: float | None = None,
+        key_prefix: str | None = None,
+    ):
+        self.redis_client = redis_client
+        self.max_size = max_size or int(os.getenv("API_KEY_CACHE_MAX_SIZE", "10000"))
+        self.ttl = ttl if ttl is not None else float(os.getenv("API_KEY_CACHE_TTL_SECONDS", "300"))
+        self.negative_ttl = negative_ttl if negative_ttl is not None else float(
+            os.getenv("API_KEY_CACHE_NEGATIVE_TTL_SECONDS", "10")
+        )
+        # caps the in-process layer so invalidations from other instances land quickly
+        self.local_ttl = float(os.getenv("API_KEY_CACHE_LOCAL_TTL_SECONDS", "30"))
+        self.key_prefix = key_prefix or os.getenv("API_KEY_CACHE_PREFIX", "apikey")
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, ValidationResult]] = OrderedDict()
+
+    @staticmethod
+    def _digest(api_key: str) -> str:
+        return hashlib.sha256(api_key.encode()).hexdigest()
+
+    def _redis(self):
+        if self.redis_client is None:
+            return None
+        try:
+            return self.redis_client()
+        except Exception:
+            return None
+
+    def _set_local(self, digest: str, result: ValidationResult, ttl: float) -> None:
+        with self._lock:
+            self._entries[digest] = (time.monotonic() + min(ttl, self.local_ttl), result)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _get_local(self, digest: str) -> ValidationResult | None:
+        with self._lock:
+            cached = self._entries.get(digest)
+            if cached is not None:
+                if time.monotonic() < cached[0]:
+                    self._entries.move_to_end(digest)
+                    return cached[1]
+                del self._entries[digest]
+        return None
+
+    def get_local(self, api_key: str) -> ValidationResult | None:
+        """In-process layer only; never blocks on Redis."""
+        return self._get_local(self._digest(api_key))
+
+    def get(self, api_key: str) -> ValidationResult | None:
+        digest = self._digest(api_key)
+
+        cached = self._get_local(digest)
+        if cached is not None:
+            return cached
+
+        client = self._redis()
+        if client is None:
+            return None
+
+        try:
+            raw = client.get(f"{self.key_prefix}:{digest}")
+            if raw is None:
+                return None
+            is_valid, app_id, server_id = json.loads(raw)
+            result = (bool(is_valid), app_id, server_id)
+            self._set_local(digest, result, self.ttl if is_valid else self.negative_ttl)
+            return result
+
+        except Exception as e:
+            logging.warning(f"API key cache read from Redis failed | error={e}")
+            return None
+
+    def set(self, api_key: str, result: ValidationResult) -> None:
+        digest = self._digest(api_key)
+        ttl = self.ttl if result[0] else self.negative_ttl
+        if ttl <= 0:
+            return
+
+        self._set_local(digest, result, ttl)
+
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.set(f"{self.key_prefix}:{digest}", json.dumps(list(result)), px=int(ttl * 1000))
+        except Exception as e:
+            logging.warning(f"API key cache write to Redis failed | error={e}")
+
+    def invalidate(self, api_key: str) -> bool:
+        """False when the Redis entry could not be dropped and may still be served."""
+        digest = self._digest(api_key)
+
+        with self._lock:
+            self._entries.pop(digest, None)
+
+        if self.redis_client is None:
+            return True
+        client = self._redis()
+        if client is None:
+            logging.warning("API key cache invalidation skipped, Redis unavailable")
+            return False
+        try:
+            client.delete(f"{self.key_prefix}:{digest}")
+            return True
+        except Exception as e:
+            logging.warning(f"API key cache invalidation in Redis failed | error={e}")
+            return False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
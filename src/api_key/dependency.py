@@ -1,18 +1,29 @@
 from typing import Dict, Optional
 
-from fastapi import Header, HTTPException
+from fastapi import Depends, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
 
-from src.api_key.authenticate import GenerateAPIKey
+from src.logging.engine import IngestionEngine, get_engine
 
 
-def require_api_key(x_api_key: Optional[str] = Header(default=None, alias="X-API-Key")) -> Dict[str, str]:
+async def require_api_key(
+    x_api_key: Optional[str] = Header(default=None, alias="X-API-Key"),
+    # a sync dependency, so engine start-up and its health checks run in the threadpool
+    engine: IngestionEngine = Depends(get_engine),
+) -> Dict[str, str]:
     
     if not x_api_key:
         raise HTTPException(status_code=401, detail="Missing API key (X-API-Key)")
 
-    _api_key_manager = GenerateAPIKey()
-    
-    is_valid, app_id, server_id = _api_key_manager.validate_api_key(x_api_key)
+    _api_key_manager = engine.api_key_manager
+
+    if engine.async_io:
+        # Postgres lookups run on the bounded Postgres pool, never on the loop
+        is_valid, app_id, server_id = await _api_key_manager.validate_api_key_async(
+            x_api_key, engine.async_postgres_services.run
+        )
+    else:
+        is_valid, app_id, server_id = await run_in_threadpool(_api_key_manager.validate_api_key, x_api_key)
     if not is_valid or not app_id or not server_id:
         raise HTTPException(status_code=403, detail="Invalid API key")
 
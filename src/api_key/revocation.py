@@ -0,0 +1,108 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from typing import Callable, Iterable
+
+from src.utils.utils import logging
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # double hashing: two 64-bit halves of one digest give every position
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationSet:
+    """
+    Revoked signed-key ids, synced from Postgres every `sync_interval` seconds.
+
+    The bloom filter answers "not revoked", which is nearly every lookup,
+    without touching the exact set. A bloom hit is confirmed against the exact
+    set so a false positive never rejects a good key. The sync happens lazily
+    on the request path, starting with the very first lookup: one caller
+    refreshes and the rest keep using the previous snapshot.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[], list[str] | None],
+        sync_interval: float | None = None,
+        capacity: int | None = None,
+        error_rate: float | None = None,
+    ):
+        self.load = load
+        self.sync_interval = sync_interval or float(os.getenv("API_KEY_REVOCATION_SYNC_SECONDS", "30"))
+        self.capacity = capacity or int(os.getenv("API_KEY_REVOCATION_CAPACITY", "100000"))
+        self.error_rate = error_rate or float(os.getenv("API_KEY_REVOCATION_ERROR_RATE", "0.001"))
+
+        self._sync_lock = threading.Lock()
+        # never synced: due on the first lookup, however young the process (monotonic() may start near 0)
+        self._synced_at = float("-inf")
+        self._exact: frozenset[str] = frozenset()
+        self._bloom = BloomFilter(self.capacity, self.error_rate)
+
+    def sync(self) -> bool:
+        try:
+            key_ids = self.load()
+        except Exception as e:
+            logging.error(f"Revocation list sync failed | error={e}")
+            key_ids = None
+
+        if key_ids is None:
+            # keep serving the previous snapshot, retry on the next interval
+            self._synced_at = time.monotonic()
+            return False
+
+        exact = frozenset(key_ids)
+        bloom = BloomFilter(max(self.capacity, len(exact) * 2), self.error_rate)
+        for key_id in exact:
+            bloom.add(key_id)
+
+        # swap both references, readers never see a half-built filter
+        self._bloom, self._exact = bloom, exact
+        self._synced_at = time.monotonic()
+        logging.info(f"Revocation list synced | revoked={len(exact)}")
+        return True
+
+    def sync_due(self) -> bool:
+        """True when the next is_revoked() call would reload the list from Postgres."""
+        return time.monotonic() - self._synced_at >= self.sync_interval
+
+    def _maybe_sync(self) -> None:
+        if not self.sync_due():
+            return
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() - self._synced_at >= self.sync_interval:
+                self.sync()
+        finally:
+            self._sync_lock.release()
+
+    def add(self, key_id: str) -> None:
+        """Revoke locally right away; other instances pick it up on their next sync."""
+        self._bloom.add(key_id)
+        self._exact = self._exact | {key_id}
+
+    def is_revoked(self, key_id: str) -> bool:
+        self._maybe_sync()
+        bloom, exact = self._bloom, self._exact
+        return key_id in bloom and key_id in exact
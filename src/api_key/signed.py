@@ -0,0 +1,114 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from typing import Optional
+
+from src.utils.utils import logging
+
+# cl2.<base64url(payload json)>.<base64url(hmac-sha256)>
+SIGNED_KEY_PREFIX = "cl2."
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("utf-8").rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def is_signed_key(api_key: str) -> bool:
+    return isinstance(api_key, str) and api_key.startswith(SIGNED_KEY_PREFIX)
+
+
+class SignedAPIKeys:
+    """
+    Issues and verifies self-contained API keys.
+
+    The payload carries app_id, server_id, the signing-secret version, an
+    optional expiry and a random key id (used for revocation), and is
+    authenticated with HMAC-SHA256. Verification is CPU only. Secrets are
+    configured as `API_KEY_SIGNING_SECRETS="1:secret,2:newer-secret"`; new keys
+    are signed with `API_KEY_SIGNING_VERSION` and every listed version
+    still verifies, so secrets can be rotated without reissuing keys.
+    """
+
+    def __init__(
+        self,
+        secrets_spec: str | None = None,
+        signing_version: int | None = None,
+        default_ttl: int | None = None,
+    ):
+        secrets_spec = secrets_spec if secrets_spec is not None else os.getenv("API_KEY_SIGNING_SECRETS", "")
+        self.secrets: dict[int, bytes] = {}
+        for item in secrets_spec.split(","):
+            if not item.strip():
+                continue
+            version, _, secret = item.strip().partition(":")
+            if not secret:
+                raise ValueError("API_KEY_SIGNING_SECRETS entries must look like <version>:<secret>")
+            self.secrets[int(version)] = secret.encode("utf-8")
+
+        self.signing_version = signing_version or int(
+            os.getenv("API_KEY_SIGNING_VERSION", str(max(self.secrets) if self.secrets else 1))
+        )
+        # seconds until new keys expire, 0 = never
+        self.default_ttl = default_ttl if default_ttl is not None else int(os.getenv("API_KEY_TTL_SECONDS", "0"))
+
+    @property
+    def enabled(self) -> bool:
+        return self.signing_version in self.secrets
+
+    def _sign(self, version: int, payload_b64: str) -> str:
+        digest = hmac.new(self.secrets[version], payload_b64.encode("utf-8"), hashlib.sha256).digest()
+        return _b64encode(digest)
+
+    def issue(self, app_id: str, server_id: str, ttl: int | None = None) -> tuple[str, dict]:
+        if not self.enabled:
+            raise RuntimeError("No signing secret configured for API_KEY_SIGNING_VERSION")
+
+        ttl = self.default_ttl if ttl is None else ttl
+        claims = {
+            "a": str(app_id),
+            "s": str(server_id),
+            "v": self.signing_version,
+            "e": int(time.time()) + ttl if ttl else 0,
+            "k": _b64encode(secrets.token_bytes(12)),
+        }
+        payload_b64 = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        return f"{SIGNED_KEY_PREFIX}{payload_b64}.{self._sign(self.signing_version, payload_b64)}", claims
+
+    def verify(self, api_key: str) -> Optional[dict]:
+        """Claims of a genuine, unexpired key, otherwise None."""
+        try:
+            if not is_signed_key(api_key):
+                return None
+
+            payload_b64, _, signature = api_key[len(SIGNED_KEY_PREFIX):].partition(".")
+            if not payload_b64 or not signature:
+                return None
+
+            claims = json.loads(_b64decode(payload_b64))
+            version = int(claims.get("v", 0))
+            if version not in self.secrets:
+                return None
+
+            if not hmac.compare_digest(signature, self._sign(version, payload_b64)):
+                return None
+
+            expires_at = int(claims.get("e") or 0)
+            if expires_at and expires_at < time.time():
+                return None
+
+            if not claims.get("a") or not claims.get("s") or not claims.get("k"):
+                return None
+
+            return claims
+
+        except Exception as e:
+            logging.warning(f"Malformed signed API key rejected | error={e}")
+            return None
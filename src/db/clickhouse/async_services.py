@@ -0,0 +1,19 @@
+import os
+from typing import Callable
+
+from src.db.clickhouse.services import ClickHouseServices
+from src.db.executor import AsyncServiceProxy
+
+
+class AsyncClickHouseServices(AsyncServiceProxy):
+    """
+    Awaitable ClickHouseServices: `await async_ch.insert_log(...)`,
+    `await async_ch.run_query(...)`, etc. on a bounded worker pool.
+    """
+
+    def __init__(self, click_house_services: Callable[[], ClickHouseServices], max_concurrency: int | None = None):
+        super().__init__(
+            click_house_services,
+            max_concurrency=max_concurrency or int(os.getenv("CLICKHOUSE_ASYNC_CONCURRENCY", "8")),
+            name="clickhouse-io",
+        )
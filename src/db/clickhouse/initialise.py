@@ -7,6 +7,29 @@ from src.utils.utils import logging
 
 dotenv.load_dotenv()
 
+# original layout; kept as migration 1 so existing deployments line up with src/db/clickhouse/migrations.py
+LOGS_TABLE_V1_DDL = """
+    CREATE TABLE IF NOT EXISTS logs
+    (
+        log_id UUID DEFAULT generateUUIDv4(),
+        app_id UUID,
+        version String DEFAULT 'development',
+
+        timestamp DateTime DEFAULT now(),
+        event_type Nullable(String),
+        event_name Nullable(String),
+        event_category Nullable(String),
+
+        -- Nested objects (native JSON)
+        server_info Nullable(JSON),
+        request_info Nullable(JSON),
+        message_info Nullable(JSON),
+        source_info Nullable(JSON)
+    )
+    ENGINE = MergeTree()
+    ORDER BY timestamp;
+"""
+
 
 class Initialise:
     def __init__(self):
@@ -28,6 +51,8 @@ class Initialise:
                 secure=self.secure,
                 connect_timeout=10,
                 send_receive_timeout=10,
+                # the client is shared across requests/threads, so don't pin it to one server session
+                autogenerate_session_id=False,
             )
 
             logging.info("ClickHouse client initialised successfully.")
@@ -47,29 +72,7 @@ class Initialise:
 
     def create_logs_table(self):
         try:
-            create_table_query = """
-                CREATE TABLE IF NOT EXISTS logs
-                (
-                    log_id UUID DEFAULT generateUUIDv4(),
-                    app_id UUID,
-                    version String DEFAULT 'development',
-
-                    timestamp DateTime DEFAULT now(),
-                    event_type Nullable(String),
-                    event_name Nullable(String),
-                    event_category Nullable(String),
-
-                    -- Nested objects (native JSON)
-                    server_info Nullable(JSON),
-                    request_info Nullable(JSON),
-                    message_info Nullable(JSON),
-                    source_info Nullable(JSON)
-                )
-                ENGINE = MergeTree()
-                ORDER BY timestamp;
-            """
-
-            result = self.client.query(create_table_query)
+            result = self.client.query(LOGS_TABLE_V1_DDL)
             logging.info("Logs table created or already exists.")
             return result
 
@@ -133,8 +136,10 @@ class Initialise:
 
 if __name__ == "__main__":
     try:
+        from src.db.clickhouse.migrations import MigrationRunner
+
         initialise = Initialise()
-        initialise.create_logs_table()
+        MigrationRunner(initialise).migrate()
         logging.info("Initialisation flow completed.")
 
     except Exception as e:
@@ -0,0 +1,357 @@
+import argparse
+import time
+from dataclasses import dataclass, field
+
+from clickhouse_connect.driver.exceptions import ClickHouseError
+
+from src.db.clickhouse.initialise import LOGS_TABLE_V1_DDL, Initialise
+from src.utils.utils import logging
+
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: list[str] = field(default_factory=list)
+
+
+# ====================== SCHEMA ======================
+
+# Tenant-first layout: every query is scoped to one app_id, so it leads the
+# sort key and the primary index prunes other tenants' granules. Daily
+# partitions let time filters skip whole parts and make backfill/retention
+# a partition operation. The request_info fields we filter on most are
+# MATERIALIZED into real columns so they don't need a JSON subcolumn read.
+LOGS_TABLE_V2_DDL = """
+    CREATE TABLE IF NOT EXISTS logs_v2
+    (
+        log_id UUID DEFAULT generateUUIDv4(),
+        app_id UUID,
+        version LowCardinality(String) DEFAULT 'development',
+
+        timestamp DateTime DEFAULT now() CODEC(Delta, ZSTD(1)),
+        event_type LowCardinality(Nullable(String)),
+        event_name Nullable(String) CODEC(ZSTD(1)),
+        event_category LowCardinality(Nullable(String)),
+
+        -- Nested objects (native JSON)
+        server_info Nullable(JSON),
+        request_info Nullable(JSON),
+        message_info Nullable(JSON),
+        source_info Nullable(JSON),
+
+        severity_level LowCardinality(Nullable(String)) MATERIALIZED CAST(request_info.severity_level, 'Nullable(String)'),
+        status_code Nullable(Int32) MATERIALIZED CAST(request_info.status_code, 'Nullable(Int32)') CODEC(ZSTD(1)),
+        session_id Nullable(String) MATERIALIZED CAST(request_info.session_id, 'Nullable(String)') CODEC(ZSTD(1)),
+
+        INDEX idx_event_name event_name TYPE bloom_filter(0.01) GRANULARITY 4,
+        INDEX idx_session_id session_id TYPE bloom_filter(0.01) GRANULARITY 4
+    )
+    ENGINE = MergeTree()
+    PARTITION BY toDate(timestamp)
+    ORDER BY (app_id, timestamp)
+    SETTINGS index_granularity = 8192;
+"""
+
+# grain -> (bucket function, TTL in days or None to keep forever)
+ROLLUPS: dict[str, tuple[str, int | None]] = {
+    "1m": ("toStartOfMinute", 30),
+    "1h": ("toStartOfHour", 400),
+    "1d": ("toStartOfDay", None),
+}
+ROLLUP_KEYS = ("event_type", "severity_level", "status_code")
+
+
+def rollup_table(grain: str) -> str:
+    return f"logs_stats_{grain}"
+
+
+def rollup_select(grain: str, source: str = "logs") -> str:
+    """
+    Rows of `source` counted into `grain` buckets. Read through the JSON
+    paths so it works on either logs layout; NULL keys become ''/0 because
+    sort-key columns can't be Nullable. The inner aliases avoid a key
+    expression shadowing the column it reads.
+    """
+    bucket_fn, _ = ROLLUPS[grain]
+    return f"""
+        SELECT app_id, bucket, event_type_key AS event_type, severity_key AS severity_level,
+               status_key AS status_code, count() AS logs
+        FROM (
+            SELECT app_id,
+                   {bucket_fn}(timestamp) AS bucket,
+                   ifNull(event_type, '') AS event_type_key,
+                   ifNull(CAST(request_info.severity_level, 'Nullable(String)'), '') AS severity_key,
+                   ifNull(CAST(request_info.status_code, 'Nullable(Int32)'), 0) AS status_key
+            FROM {source}
+        )
+        GROUP BY app_id, bucket, event_type, severity_level, status_code
+    """
+
+
+def _rollup_statements(grain: str) -> list[str]:
+    _, ttl_days = ROLLUPS[grain]
+    table = rollup_table(grain)
+    ttl = f"TTL bucket + INTERVAL {ttl_days} DAY" if ttl_days else ""
+    return [
+        f"""
+        CREATE TABLE IF NOT EXISTS {table}
+        (
+            app_id UUID,
+            bucket DateTime CODEC(Delta, ZSTD(1)),
+            event_type LowCardinality(String),
+            severity_level LowCardinality(String),
+            status_code Int32,
+            logs SimpleAggregateFunction(sum, UInt64)
+        )
+        ENGINE = AggregatingMergeTree()
+        PARTITION BY toYYYYMM(bucket)
+        ORDER BY (app_id, bucket, event_type, severity_level, status_code)
+        {ttl}
+        """,
+        f"CREATE MATERIALIZED VIEW IF NOT EXISTS {table}_mv TO {table} AS {rollup_select(grain)}",
+    ]
+
+
+# Search runs on lower(message): tokenbf serves whole-word and phrase
+# matches (hasToken), ngrambf serves substring/prefix LIKEs of 3+ chars.
+SEARCH_INDEXES: dict[str, str] = {
+    "idx_message_tokens": "tokenbf_v1(32768, 3, 0)",
+    "idx_message_ngrams": "ngrambf_v1(3, 65536, 3, 0)",
+}
+
+
+def _search_statements(table: str) -> list[str]:
+    statements = [
+        f"""
+        ALTER TABLE {table} ADD COLUMN IF NOT EXISTS message String
+            MATERIALIZED ifNull(CAST(message_info.message, 'Nullable(String)'), '') CODEC(ZSTD(3))
+        """,
+    ]
+    for name, index_type in SEARCH_INDEXES.items():
+        statements.append(f"ALTER TABLE {table} ADD INDEX IF NOT EXISTS {name} lower(message) TYPE {index_type} GRANULARITY 1")
+    return statements
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "create_logs", [LOGS_TABLE_V1_DDL]),
+    Migration(2, "create_logs_v2", [LOGS_TABLE_V2_DDL]),
+    Migration(3, "create_stats_rollups", [s for grain in ROLLUPS for s in _rollup_statements(grain)]),
+    # both tables, so search works whichever of them is live when this runs
+    Migration(4, "add_message_search", _search_statements("logs") + _search_statements("logs_v2")),
+]
+
+
+class MigrationRunner:
+    """
+    Applies MIGRATIONS in version order and records each one in
+    `schema_migrations`, so running it again only applies what is new.
+    Statements should be idempotent (IF NOT EXISTS) because a migration
+    that fails halfway is retried from its first statement.
+    """
+
+    def __init__(self, init: Initialise | None = None, migrations: list[Migration] | None = None):
+        self.init = init or Initialise()
+        self.client = self.init.client
+        self.migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+
+    def ensure_migrations_table(self) -> None:
+        self.client.command(f"""
+            CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE}
+            (
+                version UInt32,
+                name String,
+                applied_at DateTime DEFAULT now()
+            )
+            ENGINE = ReplacingMergeTree(applied_at)
+            ORDER BY version
+        """)
+
+    def applied_versions(self) -> set[int]:
+        self.ensure_migrations_table()
+        rows = self.client.query(f"SELECT version FROM {MIGRATIONS_TABLE} FINAL").result_rows
+        return {int(row[0]) for row in rows}
+
+    def pending(self) -> list[Migration]:
+        applied = self.applied_versions()
+        return [m for m in self.migrations if m.version not in applied]
+
+    def migrate(self, target: int | None = None) -> list[int]:
+        """Apply pending migrations up to `target` (all when None). Returns the versions applied."""
+        applied = []
+        for migration in self.pending():
+            if target is not None and migration.version > target:
+                break
+            try:
+                for statement in migration.statements:
+                    self.client.command(statement)
+                self.client.insert(MIGRATIONS_TABLE, [[migration.version, migration.name]], column_names=["version", "name"])
+            except ClickHouseError as che:
+                logging.error(f"Migration failed | version={migration.version} | name={migration.name} | error={che}")
+                raise
+            logging.info(f"Migration applied | version={migration.version} | name={migration.name}")
+            applied.append(migration.version)
+        return applied
+
+
+# ====================== BACKFILL ======================
+
+class Backfill:
+    """
+    Copies `source` into `target` one daily partition at a time, then
+    optionally swaps the two tables.
+
+    A day is skipped when both tables already hold the same number of rows
+    for it, and re-copied from scratch otherwise, so an interrupted run can
+    simply be started again. Writes keep landing in `source` until the
+    swap; the swap then copies over whatever arrived since the last day was
+    copied.
+    """
+
+    def __init__(self, init: Initialise | None = None, source: str = "logs", target: str = "logs_v2"):
+        self.init = init or Initialise()
+        self.client = self.init.client
+        self.source = source
+        self.target = target
+
+    def _insertable_columns(self, table: str) -> list[str]:
+        rows = self.client.query(f"DESCRIBE TABLE {table}").result_rows
+        return [row[0] for row in rows if row[2] not in ("MATERIALIZED", "ALIAS", "EPHEMERAL")]
+
+    def _columns(self) -> list[str]:
+        target_columns = set(self._insertable_columns(self.target))
+        return [name for name in self._insertable_columns(self.source) if name in target_columns]
+
+    def _count(self, table: str, day) -> int:
+        return int(self.client.command(
+            f"SELECT count() FROM {table} WHERE toDate(timestamp) = {{day:Date}}",
+            parameters={"day": day},
+        ))
+
+    def days(self) -> list:
+        rows = self.client.query(f"SELECT DISTINCT toDate(timestamp) AS day FROM {self.source} ORDER BY day").result_rows
+        return [row[0] for row in rows]
+
+    def copy_day(self, day, columns: list[str]) -> int:
+        source_rows = self._count(self.source, day)
+        target_rows = self._count(self.target, day)
+        if source_rows == target_rows:
+            return 0
+
+        if target_rows:
+            # partial copy from an earlier run; partition id of toDate() is YYYYMMDD
+            self.client.command(f"ALTER TABLE {self.target} DROP PARTITION ID '{day.strftime('%Y%m%d')}'")
+
+        column_list = ", ".join(columns)
+        self.client.command(
+            f"INSERT INTO {self.target} ({column_list}) "
+            f"SELECT {column_list} FROM {self.source} WHERE toDate(timestamp) = {{day:Date}}",
+            parameters={"day": day},
+            settings={"max_execution_time": 0},
+        )
+        return source_rows
+
+    def run(self, swap: bool = False) -> int:
+        columns = self._columns()
+        days = self.days()
+        copied = 0
+        for day in days:
+            started = time.monotonic()
+            rows = self.copy_day(day, columns)
+            copied += rows
+            logging.info(f"Backfill day | day={day} | rows={rows} | seconds={time.monotonic() - started:.1f}")
+
+        if swap:
+            self.swap(columns, since=days[-1] if days else None)
+        logging.info(f"Backfill finished | source={self.source} | target={self.target} | rows={copied} | swapped={swap}")
+        return copied
+
+    def swap(self, columns: list[str], since=None) -> None:
+        """Exchange the tables, then copy rows written to the old layout during the last day's copy."""
+        self.client.command(f"EXCHANGE TABLES {self.source} AND {self.target}")
+        logging.info(f"Tables exchanged | {self.source} <-> {self.target}")
+        if self.source == "logs":
+            # the rollup views stay bound to the table they were created on, point them at the new one
+            for grain in ROLLUPS:
+                self.client.command(f"DROP VIEW IF EXISTS {rollup_table(grain)}_mv")
+                self.client.command(_rollup_statements(grain)[1])
+        if since is None:
+            return
+
+        # after the exchange `source` is the new layout and `target` holds the old rows
+        column_list = ", ".join(columns)
+        self.client.command(
+            f"INSERT INTO {self.source} ({column_list}) "
+            f"SELECT {column_list} FROM {self.target} "
+            f"WHERE toDate(timestamp) >= {{since:Date}} "
+            f"AND log_id NOT IN (SELECT log_id FROM {self.source} WHERE toDate(timestamp) >= {{since:Date}})",
+            parameters={"since": since},
+            settings={"max_execution_time": 0},
+        )
+
+
+def rebuild_rollups(init: Initialise | None = None, source: str = "logs") -> None:
+    """
+    Recount every rollup from `source`. The materialized views only see
+    inserts made after they were created, so run this once after migration
+    3 on a table that already has data. Logs flushed while it runs can be
+    counted twice; run it while ingestion is quiet.
+    """
+    client = (init or Initialise()).client
+    for grain in ROLLUPS:
+        table = rollup_table(grain)
+        client.command(f"TRUNCATE TABLE {table}")
+        client.command(f"INSERT INTO {table} {rollup_select(grain, source)}", settings={"max_execution_time": 0})
+        logging.info(f"Rollup rebuilt | table={table} | source={source}")
+
+
+def materialize_search(init: Initialise | None = None, table: str = "logs") -> None:
+    """
+    Compute `message` and its indexes for parts written before migration 4.
+    These are background mutations; follow them in system.mutations.
+    """
+    client = (init or Initialise()).client
+    client.command(f"ALTER TABLE {table} MATERIALIZE COLUMN message")
+    for name in SEARCH_INDEXES:
+        client.command(f"ALTER TABLE {table} MATERIALIZE INDEX {name}")
+    logging.info(f"Search column materialization queued | table={table}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ClickHouse schema migrations and logs backfill.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate", help="apply pending migrations")
+    migrate.add_argument("--target", type=int, default=None)
+    commands.add_parser("status", help="list migrations and whether they are applied")
+    backfill = commands.add_parser("backfill", help="copy the old logs table into the new layout")
+    backfill.add_argument("--source", default="logs")
+    backfill.add_argument("--target", default="logs_v2")
+    backfill.add_argument("--swap", action="store_true", help="exchange the tables once the copy is done")
+    rollups = commands.add_parser("rebuild-rollups", help="recount the stats rollups from the logs table")
+    rollups.add_argument("--source", default="logs")
+    search = commands.add_parser("materialize-search", help="build the message column and indexes for existing parts")
+    search.add_argument("--table", default="logs")
+    args = parser.parse_args()
+
+    init = Initialise()
+    if args.command == "migrate":
+        MigrationRunner(init).migrate(target=args.target)
+    elif args.command == "status":
+        runner = MigrationRunner(init)
+        applied = runner.applied_versions()
+        for migration in runner.migrations:
+            print(f"{migration.version:>4}  {'applied' if migration.version in applied else 'pending':<8} {migration.name}")
+    elif args.command == "backfill":
+        Backfill(init, source=args.source, target=args.target).run(swap=args.swap)
+    elif args.command == "rebuild-rollups":
+        rebuild_rollups(init, source=args.source)
+    elif args.command == "materialize-search":
+        materialize_search(init, table=args.table)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
+from datetime import datetime
 from typing import Any
 import json
+import os
+import time
+import uuid
 from clickhouse_connect.driver.exceptions import ClickHouseError
 
 from src.utils.utils import logging, to_sql_literal
@@ -7,13 +11,53 @@ from src.db.clickhouse.initialise import Initialise
 from src.models.logs import Logs, ServerInfo, RequestInfo, MessageInfo, SourceInfo
 
 
+# Python-side values for non-nullable columns whose server DEFAULT can't be
+# triggered through a columnar insert (every listed column is always sent)
+_COLUMN_DEFAULTS = {
+    "log_id": uuid.uuid4,
+    "timestamp": datetime.now,
+    "version": lambda: "development",
+}
+
+# JSONEachRow rows carry whole logs (extra/legacy keys included) and ISO-8601 timestamps
+_JSON_EACH_ROW_SETTINGS = {
+    "input_format_skip_unknown_fields": 1,
+    "date_time_input_format": "best_effort",
+}
+
+
 class ClickHouseServices:
     def __init__(self):
         self.init = Initialise()
 
-    def run_query(self, query: str):
+        # "native": column arrays through client.insert(), "sql": legacy INSERT ... VALUES text,
+        # "jsoneachrow": buffered JSON bytes streamed to the server as-is
+        self.insert_mode = os.getenv("CLICKHOUSE_INSERT_MODE", "native").lower()
+        self.schema_ttl = float(os.getenv("CLICKHOUSE_SCHEMA_TTL_SECONDS", "300"))
+        self._schema_cache: dict[str, tuple[float, list[tuple[str, str, str]]]] = {}
+
+        # server-side async inserts: ClickHouse coalesces small inserts into one part
+        self.async_insert = os.getenv("CLICKHOUSE_ASYNC_INSERT", "false").lower() == "true"
+        self.wait_for_async_insert = os.getenv("CLICKHOUSE_WAIT_FOR_ASYNC_INSERT", "true").lower() == "true"
+        self.async_insert_busy_timeout_ms = int(os.getenv("CLICKHOUSE_ASYNC_INSERT_BUSY_TIMEOUT_MS", "200"))
+        self.async_insert_max_data_size = int(os.getenv("CLICKHOUSE_ASYNC_INSERT_MAX_DATA_SIZE", str(10 * 1024 * 1024)))
+
+    def ping(self) -> bool:
         try:
-            result = self.init.client.query(query).result_set
+            return bool(self.init.client.ping())
+        except Exception as e:
+            logging.error(f"ClickHouse health check failed: {e}")
+            return False
+
+    def close(self) -> None:
+        try:
+            self.init.client.close()
+        except Exception as e:
+            logging.error(f"Error closing ClickHouse client: {e}")
+
+    def run_query(self, query: str, settings: dict[str, Any] | None = None):
+        try:
+            result = self.init.client.query(query, settings=settings).result_set
             logging.info(f"Query executed successfully: {query}")
             return result
         except Exception as e:
@@ -67,67 +111,88 @@ class ClickHouseServices:
         return normalized
 
 
-    def insert_log(self, log_entry: dict[str, Any] | list[dict[str, Any]]):
-        try:
-            entries = log_entry if isinstance(log_entry, list) else [log_entry]
-            if not entries:
-                return None
+    @staticmethod
+    def _payload_to_dict(payload: Any) -> dict[str, Any]:
+        """
+        Turn one buffered payload (Logs, dict, JSON text or bytes) into a plain
+        dict without touching nested values.
+        """
+        if payload is None:
+            return {}
 
-            def payload_to_row(payload: Any) -> dict[str, Any]:
-                if payload is None:
-                    return {}
+        # bytes/bytearray -> str
+        if isinstance(payload, (bytes, bytearray)):
+            payload = payload.decode()
 
-                # bytes/bytearray -> str
-                if isinstance(payload, (bytes, bytearray)):
-                    payload = payload.decode()
+        # string -> try JSON else treat as message text
+        if isinstance(payload, str):
+            try:
+                payload = json.loads(payload)
+            except json.JSONDecodeError:
+                # minimal compatible row
+                return {"message_info": {"message": payload}}
 
-                # string -> try JSON else treat as message text
-                if isinstance(payload, str):
-                    try:
-                        payload = json.loads(payload)
-                    except json.JSONDecodeError:
-                        # minimal compatible row
-                        return self._normalize_row({"message_info": {"message": payload}})
-
-                # Logs model -> dump and normalize nested fields
-                if isinstance(payload, Logs):
-                    row = payload.model_dump(exclude_none=True)
-                    return self._normalize_row(row)
-
-                # Dict payload -> keep non-null keys; normalize nested fields if present
-                if isinstance(payload, dict):
-                    row = {k: v for k, v in payload.items() if v is not None}
-                    return self._normalize_row(row)
-
-                # Fallback -> treat as message
-                return self._normalize_row({"message_info": {"message": str(payload)}})
-
-            row_dicts: list[dict[str, Any]] = []
-            for item in entries:
-                if not isinstance(item, dict) or len(item) != 1:
-                    raise ValueError(
-                        "Each entry must be a dict with exactly one key-value pair: {redis_key: payload}"
-                    )
-
-                _, payload = next(iter(item.items()))
-                row = payload_to_row(payload)
-                row_dicts.append(row)
-
-            if not any(row_dicts):
+        # Logs model -> dump
+        if isinstance(payload, Logs):
+            return payload.model_dump(exclude_none=True)
+
+        # Dict payload -> keep non-null keys
+        if isinstance(payload, dict):
+            return {k: v for k, v in payload.items() if v is not None}
+
+        # Fallback -> treat as message
+        return {"message_info": {"message": str(payload)}}
+
+    @staticmethod
+    def _unpack_entries(log_entry: dict[str, Any] | list[dict[str, Any]]) -> list[Any]:
+        entries = log_entry if isinstance(log_entry, list) else [log_entry]
+
+        payloads: list[Any] = []
+        for item in entries:
+            if not isinstance(item, dict) or len(item) != 1:
+                raise ValueError(
+                    "Each entry must be a dict with exactly one key-value pair: {redis_key: payload}"
+                )
+
+            key, payload = next(iter(item.items()))
+            if isinstance(payload, dict) and not payload.get("log_id"):
+                # the entry key is the buffer's log_id; keep it rather than minting a new one
+                payload = {"log_id": str(key), **payload}
+            payloads.append(payload)
+
+        return payloads
+
+    def async_insert_settings(self, wait: bool | None = None) -> dict[str, Any]:
+        wait = self.wait_for_async_insert if wait is None else wait
+        return {
+            "async_insert": 1,
+            "wait_for_async_insert": 1 if wait else 0,
+            "async_insert_busy_timeout_ms": self.async_insert_busy_timeout_ms,
+            "async_insert_max_data_size": self.async_insert_max_data_size,
+        }
+
+    def insert_log(
+        self,
+        log_entry: dict[str, Any] | list[dict[str, Any]],
+        settings: dict[str, Any] | None = None,
+        async_insert: bool | None = None,
+    ):
+        try:
+            payloads = self._unpack_entries(log_entry)
+            if not payloads:
                 return None
 
-            # Build INSERT with union of keys across rows
-            columns_list = sorted({k for d in row_dicts for k in d.keys()})
-            columns = ", ".join(columns_list)
+            use_async = self.async_insert if async_insert is None else async_insert
+            if use_async:
+                settings = {**self.async_insert_settings(), **(settings or {})}
 
-            values_rows: list[str] = []
-            for d in row_dicts:
-                row_vals = [to_sql_literal(d.get(col, None)) for col in columns_list]
-                values_rows.append(f"({', '.join(row_vals)})")
+            if self.insert_mode == "sql":
+                return self._insert_sql(payloads, settings=settings)
 
-            query = f"INSERT INTO logs ({columns}) VALUES {', '.join(values_rows)}"
-            self.run_query(query)
-            return len(row_dicts)
+            if self.insert_mode == "jsoneachrow":
+                return self._insert_json_each_row(payloads, settings=settings)
+
+            return self._insert_native(payloads, settings=settings)
 
         except ClickHouseError as che:
             logging.error(f"ClickHouse error inserting log entry: {che}")
@@ -136,6 +201,211 @@ class ClickHouseServices:
             logging.error(f"Error inserting log entry: {log_entry}. Error: {str(e)}")
             return None
 
+    # ====================== SQL VALUES INSERT (legacy) ======================
+
+    def _build_insert_sql(self, payloads: list[Any]) -> str | None:
+        row_dicts = [self._normalize_row(self._payload_to_dict(payload)) for payload in payloads]
+        if not any(row_dicts):
+            return None
+
+        # Build INSERT with union of keys across rows
+        columns_list = sorted({k for d in row_dicts for k in d.keys()})
+        columns = ", ".join(columns_list)
+
+        values_rows: list[str] = []
+        for d in row_dicts:
+            row_vals = [to_sql_literal(d.get(col, None)) for col in columns_list]
+            values_rows.append(f"({', '.join(row_vals)})")
+
+        return f"INSERT INTO logs ({columns}) VALUES {', '.join(values_rows)}"
+
+    def _insert_sql(self, payloads: list[Any], settings: dict[str, Any] | None = None) -> int | None:
+        query = self._build_insert_sql(payloads)
+        if query is None:
+            return None
+
+        # not run_query(): a failed insert has to reach insert_log() instead of counting as written
+        self.init.client.command(query, settings=settings)
+        return len(payloads)
+
+    # ====================== JSONEachRow INSERT ======================
+
+    @staticmethod
+    def _json_row(payload: Any) -> bytes:
+        if isinstance(payload, str):
+            payload = payload.encode()
+
+        if isinstance(payload, (bytes, bytearray)):
+            if payload.lstrip()[:1] == b"{":
+                # already a serialized log, pass it through untouched
+                return bytes(payload)
+            payload = {"message_info": {"message": payload.decode(errors="replace")}}
+
+        if isinstance(payload, Logs):
+            return payload.model_dump_json(exclude_none=True).encode()
+
+        return json.dumps(payload, ensure_ascii=False, default=str).encode()
+
+    def _insert_json_each_row(self, payloads: list[Any], settings: dict[str, Any] | None = None) -> int:
+        insert_block = b"\n".join(self._json_row(payload) for payload in payloads)
+
+        self.init.client.raw_insert(
+            table="logs",
+            insert_block=insert_block,
+            fmt="JSONEachRow",
+            settings={**_JSON_EACH_ROW_SETTINGS, **(settings or {})},
+        )
+        return len(payloads)
+
+    # ====================== NATIVE COLUMNAR INSERT ======================
+
+    def describe_table(self, table: str = "logs") -> list[tuple[str, str, str]]:
+        """(name, type, default_kind) for every column of `table`, cached for `schema_ttl` seconds."""
+        cached = self._schema_cache.get(table)
+        if cached and time.monotonic() - cached[0] < self.schema_ttl:
+            return cached[1]
+
+        described = self.init.client.query(f"DESCRIBE TABLE {table}").result_rows
+        columns = [(row[0], row[1], row[2] if len(row) > 2 else "") for row in described if row and row[0]]
+        self._schema_cache[table] = (time.monotonic(), columns)
+        return columns
+
+    def table_schema(self, table: str = "logs") -> list[tuple[str, str]]:
+        """
+        Insertable (name, type) pairs for `table`.
+        MATERIALIZED/ALIAS/EPHEMERAL columns are computed by the server and skipped.
+        """
+        return [
+            (name, ch_type)
+            for name, ch_type, default_kind in self.describe_table(table)
+            if default_kind not in ("MATERIALIZED", "ALIAS", "EPHEMERAL")
+        ]
+
+    @staticmethod
+    def _base_type(ch_type: str) -> tuple[str, bool]:
+        nullable = False
+        while True:
+            if ch_type.startswith("Nullable(") and ch_type.endswith(")"):
+                ch_type, nullable = ch_type[9:-1], True
+            elif ch_type.startswith("LowCardinality(") and ch_type.endswith(")"):
+                ch_type = ch_type[15:-1]
+            else:
+                return ch_type, nullable
+
+    @staticmethod
+    def _zero_value(base_type: str) -> Any:
+        if base_type.startswith(("Int", "UInt")):
+            return 0
+        if base_type.startswith(("Float", "Decimal")):
+            return 0.0
+        if base_type == "Bool":
+            return False
+        if base_type == "UUID":
+            return uuid.UUID(int=0)
+        if base_type.startswith("DateTime"):
+            return datetime.fromtimestamp(0)
+        if base_type.startswith(("JSON", "Object", "Map")):
+            return {}
+        return ""
+
+    @staticmethod
+    def _coerce(value: Any, base_type: str) -> Any:
+        if base_type == "UUID":
+            return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+        if base_type.startswith("DateTime"):
+            if isinstance(value, datetime):
+                return value
+            return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+        if base_type.startswith(("JSON", "Object", "Map")):
+            if isinstance(value, str):
+                return json.loads(value)
+            return value
+
+        if base_type.startswith("String") or base_type.startswith("FixedString"):
+            if isinstance(value, (dict, list)):
+                return json.dumps(value, ensure_ascii=False, default=str)
+            return str(value)
+
+        if base_type.startswith(("Int", "UInt")):
+            return int(value)
+        if base_type.startswith("Float"):
+            return float(value)
+        if base_type == "Bool":
+            return bool(value)
+
+        return value
+
+    def _build_columns(self, payloads: list[Any], table: str = "logs") -> tuple[list[str], list[list[Any]]]:
+        """
+        Build one Python list per table column. The column set comes from the
+        table schema, not from the keys present in this batch.
+        """
+        schema = self.table_schema(table)
+        column_names = [name for name, _ in schema]
+        columns: list[list[Any]] = [[] for _ in schema]
+        types = [self._base_type(ch_type) for _, ch_type in schema]
+
+        for payload in payloads:
+            row = self._payload_to_dict(payload)
+            for index, name in enumerate(column_names):
+                base_type, nullable = types[index]
+                value = row.get(name)
+
+                if value is not None:
+                    try:
+                        value = self._coerce(value, base_type)
+                    except (TypeError, ValueError) as e:
+                        logging.warning(f"Dropping unconvertible value | column={name} | type={base_type} | error={e}")
+                        value = None
+
+                if value is None and not nullable:
+                    default = _COLUMN_DEFAULTS.get(name)
+                    value = default() if default else self._zero_value(base_type)
+
+                columns[index].append(value)
+
+        return column_names, columns
+
+    def _insert_native(self, payloads: list[Any], settings: dict[str, Any] | None = None) -> int:
+        column_names, columns = self._build_columns(payloads)
+
+        self.init.client.insert(
+            table="logs",
+            data=columns,
+            column_names=column_names,
+            column_oriented=True,
+            settings=settings,
+        )
+        logging.info(f"Native insert completed | rows={len(payloads)} | columns={len(column_names)}")
+        return len(payloads)
+
+
+    def part_stats(self, table: str = "logs") -> dict[str, int]:
+        """
+        Active part count, rows and bytes on disk for `table`, used to compare
+        the part pressure of the buffered and async-insert pipelines.
+        """
+        try:
+            result = self.init.client.query(
+                """
+                SELECT count(), sum(rows), sum(bytes_on_disk)
+                FROM system.parts
+                WHERE active AND database = currentDatabase() AND table = {table:String}
+                """,
+                parameters={"table": table},
+            ).result_rows
+            parts, rows, bytes_on_disk = result[0] if result else (0, 0, 0)
+            return {"parts": int(parts or 0), "rows": int(rows or 0), "bytes_on_disk": int(bytes_on_disk or 0)}
+
+        except ClickHouseError as che:
+            logging.error(f"ClickHouse error while reading part stats: {che}")
+        except Exception as e:
+            logging.error(f"Unexpected error while reading part stats: {e}")
+
+        return {}
+
 
     def delete_logs(self, log_id: list[str] | str | None = None):
         try:
@@ -0,0 +1,39 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class AsyncServiceProxy:
+    """
+    Awaitable facade over a blocking services object.
+
+    Every method call runs on a dedicated thread pool of `max_concurrency`
+    workers, so the event loop never blocks on the driver. The pool size also
+    bounds how many calls hit the backend at once; extra calls queue instead
+    of piling more connections onto it. `services` is a callable so a client
+    rebuilt by the engine after a failed health check is picked up.
+    """
+
+    def __init__(self, services: Callable[[], Any], max_concurrency: int, name: str):
+        self._services = services
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=name)
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._services(), name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,19 @@
+import os
+from typing import Callable
+
+from src.db.postgres.services import PostgresServices
+from src.db.executor import AsyncServiceProxy
+
+
+class AsyncPostgresServices(AsyncServiceProxy):
+    """
+    Awaitable PostgresServices on a worker pool no larger than the connection
+    pool, so callers queue here instead of timing out on a pool checkout.
+    """
+
+    def __init__(self, postgres_services: Callable[[], PostgresServices], max_concurrency: int | None = None):
+        super().__init__(
+            postgres_services,
+            max_concurrency=max_concurrency or int(os.getenv("POSTGRES_ASYNC_CONCURRENCY", os.getenv("DB_POOL_MAX", "10"))),
+            name="postgres-io",
+        )
@@ -1,8 +1,12 @@
 import os
 import logging
+import threading
+import time
 from contextlib import contextmanager
 from functools import wraps
-from psycopg2.extensions import connection as PGConnection, cursor as PGCursor
+from psycopg2.errors import InvalidSqlStatementName
+from psycopg2.extensions import connection as PGConnection, TRANSACTION_STATUS_IDLE
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 import psycopg2
 
 from src.utils.utils import logging
@@ -17,39 +21,238 @@ class QueryMode:
     ONE = "one"
 
 
-class InitialiseDB:
-    def __init__(self) -> None:
-        self.connection: PGConnection = psycopg2.connect(
+class PooledConnection(PGConnection):
+    """
+    psycopg2 connection that carries its own pool bookkeeping, so it can never
+    be mixed up with a later connection that happens to reuse its id().
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.last_used = time.monotonic()
+        # names of the server-side prepared statements of this session
+        self.prepared: set[str] = set()
+
+
+class ConnectionPool:
+    """
+    Thread-safe psycopg2 pool shared by every Postgres user in the process.
+
+    Callers block (up to `timeout`) instead of failing when all `max_size`
+    connections are checked out. A connection idle for longer than
+    `health_check_after` is pinged before reuse, and one idle for longer
+    than `max_idle` is replaced, so stale server-side sessions never leak
+    into a request.
+    """
+
+    def __init__(
+        self,
+        min_size: int | None = None,
+        max_size: int | None = None,
+        timeout: float | None = None,
+        max_idle: float | None = None,
+        health_check_after: float | None = None,
+    ) -> None:
+        self.max_size = max_size or int(os.getenv("DB_POOL_MAX", "10"))
+        # psycopg2 closes a returned connection once min_size are idle, so anything
+        # below max_size means reconnecting (and re-preparing) under concurrency
+        self.min_size = min(min_size or int(os.getenv("DB_POOL_MIN", str(self.max_size))), self.max_size)
+        self.timeout = timeout or float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "5"))
+        self.max_idle = max_idle or float(os.getenv("DB_POOL_MAX_IDLE_SECONDS", "300"))
+        self.health_check_after = health_check_after or float(os.getenv("DB_POOL_HEALTH_CHECK_SECONDS", "30"))
+
+        self._pool = ThreadedConnectionPool(
+            self.min_size,
+            self.max_size,
             host=os.getenv("DB_HOST"),
             port=os.getenv("DB_PORT"),
             dbname=os.getenv("DB_NAME"),
             user=os.getenv("DB_USER"),
             password=os.getenv("DB_PASSWORD"),
             connect_timeout=5,
+            connection_factory=PooledConnection,
         )
-        self.connection.autocommit = False
-        self.cursor: PGCursor = self.connection.cursor()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+
+    def _discard(self, conn: PooledConnection) -> None:
+        try:
+            self._pool.putconn(conn, close=True)
+        except Exception as e:
+            logging.error(f"Error discarding PostgreSQL connection: {e}")
+
+    def _is_usable(self, conn: PooledConnection) -> bool:
+        if conn.closed:
+            return False
+
+        idle = time.monotonic() - conn.last_used
+        if idle > self.max_idle:
+            return False
+
+        if idle > self.health_check_after:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+            except Exception:
+                return False
+
+        return True
+
+    def getconn(self) -> PooledConnection:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolError(f"No PostgreSQL connection available within {self.timeout}s (max={self.max_size})")
+
+        try:
+            # bounded retries: every attempt either returns a healthy connection or discards one
+            for _ in range(self.max_size + 1):
+                conn = self._pool.getconn()
+                if self._is_usable(conn):
+                    return conn
+                logging.info("Recycling stale PostgreSQL connection")
+                self._discard(conn)
+            raise PoolError("Could not obtain a healthy PostgreSQL connection")
+
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn: PooledConnection, discard: bool = False) -> None:
+        try:
+            if discard or conn.closed:
+                self._discard(conn)
+                return
+
+            if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                # never hand a half-finished transaction to the next borrower
+                conn.rollback()
+
+            conn.last_used = time.monotonic()
+            self._pool.putconn(conn)
+
+        except Exception as e:
+            logging.error(f"Error returning PostgreSQL connection to pool: {e}")
+            self._discard(conn)
+
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, discard=broken)
+
+    def close(self) -> None:
+        try:
+            self._pool.closeall()
+        except Exception as e:
+            logging.error(f"Error closing PostgreSQL pool: {e}")
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def close_pool() -> None:
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+class InitialiseDB:
+    def __init__(self, pool: ConnectionPool | None = None) -> None:
+        # connections are borrowed per query from the process-wide pool
+        self.pool = pool or get_pool()
         
         
     def execute_query(self, query: str, params: tuple = None, fetch: QueryMode = None):
         try:
-            self.cursor.execute(query, params)
-            logging.info(f"Query executed successfully: {query} | params: {params}")
+            with self.pool.connection() as connection:
+                try:
+                    with connection.cursor() as cursor:
+                        cursor.execute(query, params)
+                        logging.info(f"Query executed successfully: {query} | params: {params}")
 
-            if fetch == QueryMode.ALL:
-                return self.cursor.fetchall()
-            elif fetch == QueryMode.ONE:
-                return self.cursor.fetchone()
+                        result = None
+                        if fetch == QueryMode.ALL:
+                            result = cursor.fetchall()
+                        elif fetch == QueryMode.ONE:
+                            result = cursor.fetchone()
 
-            self.connection.commit()
-            return None
+                    # SELECTs too, so the connection goes back to the pool idle
+                    connection.commit()
+                    return result
+
+                except Exception:
+                    connection.rollback()
+                    raise
 
         except Exception as e:
-            self.connection.rollback()
             logging.error(f"Error executing query: {query}. Error: {str(e)}")
             return None
 
 
+    def execute_prepared(self, name: str, statement: str, params: tuple, fetch: QueryMode = None):
+        """
+        Run `statement` as a server-side prepared statement called `name`.
+        It is PREPAREd once per pooled connection and EXECUTEd afterwards.
+        """
+        placeholders = ", ".join(["%s"] * len(params))
+        try:
+            with self.pool.connection() as connection:
+                try:
+                    with connection.cursor() as cursor:
+                        for attempt in range(2):
+                            if name not in connection.prepared:
+                                cursor.execute(f"PREPARE {name} AS {statement}")
+                                connection.prepared.add(name)
+                            try:
+                                cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+                                break
+                            except InvalidSqlStatementName:
+                                # the session lost it (e.g. DISCARD ALL from a proxy); prepare again once
+                                connection.rollback()
+                                connection.prepared.discard(name)
+                                if attempt:
+                                    raise
+
+                        result = None
+                        if fetch == QueryMode.ALL:
+                            result = cursor.fetchall()
+                        elif fetch == QueryMode.ONE:
+                            result = cursor.fetchone()
+
+                    connection.commit()
+                    return result
+
+                except Exception:
+                    connection.rollback()
+                    raise
+
+        except Exception as e:
+            logging.error(f"Error executing prepared statement: {name}. Error: {str(e)}")
+            return None
+
+
     def init_servers_table(self):
         try:
             create_table_query = """
@@ -88,6 +291,23 @@ class InitialiseDB:
             return None
 
         
+    def init_revoked_api_keys_table(self):
+        try:
+            create_table_query = """
+                CREATE TABLE IF NOT EXISTS revoked_api_keys (
+                    key_id TEXT PRIMARY KEY,
+                    app_id UUID NOT NULL REFERENCES apps(app_id),
+                    expires_at TIMESTAMP,
+                    revoked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+            """
+            self.execute_query(create_table_query)
+            return 
+        except Exception as e:
+            logging.error(f"Error initializing revoked_api_keys table: {str(e)}")
+            return None
+
+        
     def init_apps_table(self):
         try:
             create_table_query = """
@@ -96,11 +316,25 @@ class InitialiseDB:
                     app_serial SERIAL UNIQUE NOT NULL,
                     app_name VARCHAR(255) UNIQUE NOT NULL,
                     app_description TEXT,
+                    rate_logs_per_sec INTEGER,
+                    rate_logs_burst INTEGER,
+                    rate_bytes_per_sec BIGINT,
+                    rate_bytes_burst BIGINT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 );
             """
             self.execute_query(create_table_query)
+
+            # per-tenant ingest limits for tables created before they existed; NULL = service default
+            alter_table_query = """
+                ALTER TABLE apps
+                    ADD COLUMN IF NOT EXISTS rate_logs_per_sec INTEGER,
+                    ADD COLUMN IF NOT EXISTS rate_logs_burst INTEGER,
+                    ADD COLUMN IF NOT EXISTS rate_bytes_per_sec BIGINT,
+                    ADD COLUMN IF NOT EXISTS rate_bytes_burst BIGINT;
+            """
+            self.execute_query(alter_table_query)
             return 
         except Exception as e:
             logging.error(f"Error initializing apps table: {str(e)}")
@@ -108,26 +342,23 @@ class InitialiseDB:
         
 
     def close(self) -> None:
-        try:
-            if getattr(self, "cursor", None):
-                self.cursor.close()
-        finally:
-            if getattr(self, "connection", None):
-                self.connection.close()
+        # the pool is shared by the whole process, see close_pool()
+        return None
 
 
 @contextmanager
 def db_session():
-    db = InitialiseDB()
-    try:
-        yield db.connection, db.cursor
-        db.connection.commit()
-    except Exception:
-        db.connection.rollback()
-        logging.exception("Database operation failed. Rolled back for safety.")
-        raise
-    finally:
-        db.close()
+    with get_pool().connection() as connection:
+        cursor = connection.cursor()
+        try:
+            yield connection, cursor
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            logging.exception("Database operation failed. Rolled back for safety.")
+            raise
+        finally:
+            cursor.close()
 
 
 def database_init(func):
@@ -156,7 +387,8 @@ def main():
     dbi.init_apps_table()
     dbi.init_servers_table()
     dbi.init_api_keys_table()
-    dbi.close()
+    dbi.init_revoked_api_keys_table()
+    close_pool()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,10 +1,20 @@
-from src.db.postgres.initialise import InitialiseDB
+from src.db.postgres.initialise import InitialiseDB, QueryMode
 from src.utils.utils import logging
 
 
 class PostgresServices:
     def __init__(self):
         self.dbi = InitialiseDB()
+
+    def ping(self) -> bool:
+        try:
+            return self.dbi.execute_query("SELECT 1", fetch=QueryMode.ONE) is not None
+        except Exception as e:
+            logging.error(f"PostgreSQL health check failed: {e}")
+            return False
+
+    def close(self) -> None:
+        self.dbi.close()
         
         
     # ====================== GET ======================
@@ -22,6 +32,28 @@ class PostgresServices:
         except Exception as e:
             logging.error(f"Error getting app using app_id from PostgreSQL: {str(e)}")
             
+    def get_app_rate_limits(self, app_id: str) -> dict | None:
+        try:
+            query = """
+                SELECT rate_logs_per_sec, rate_logs_burst, rate_bytes_per_sec, rate_bytes_burst
+                FROM apps
+                WHERE app_id = %s
+            """
+            row = self.dbi.execute_query(query, (app_id,), fetch=QueryMode.ONE)
+            if not row:
+                return None
+
+            return {
+                "logs_per_sec": row[0],
+                "logs_burst": row[1],
+                "bytes_per_sec": row[2],
+                "bytes_burst": row[3],
+            }
+
+        except Exception as e:
+            logging.error(f"Error getting rate limits using app_id from PostgreSQL: {str(e)}")
+            return None
+
     def get_servers_by_app_id(self, app_id: str) -> list[dict]:
         try:
             query = """
@@ -50,7 +82,7 @@ class PostgresServices:
                 WHERE app_id = %s AND api_key = %s
                 LIMIT 1
             """
-            row = self.dbi.execute_query(query, (app_id, api_key))
+            row = self.dbi.execute_query(query, (app_id, api_key), fetch=QueryMode.ONE)
             if not row:
                 return None
             
@@ -59,6 +91,54 @@ class PostgresServices:
             logging.error(f"Error getting servers using app_id from PostgreSQL: {str(e)}")
             return False
 
+
+    def resolve_tenant(self, app_id: str, server_id: str, api_key: str) -> dict | None:
+        """
+        App existence, api_key match and server membership in one prepared
+        round trip. Returns None when the app does not exist.
+        """
+        try:
+            statement = """
+                SELECT
+                    a.app_id,
+                    EXISTS (SELECT 1 FROM api_keys k WHERE k.app_id = a.app_id AND k.api_key = $2) AS key_found,
+                    EXISTS (SELECT 1 FROM servers s WHERE s.app_id = a.app_id AND s.server_id::text = $3) AS server_found
+                FROM apps a
+                WHERE a.app_id = $1::uuid
+            """
+            row = self.dbi.execute_prepared(
+                "resolve_tenant",
+                statement,
+                (app_id, api_key, server_id),
+                fetch=QueryMode.ONE,
+            )
+            if not row:
+                return None
+
+            return {"app_id": str(row[0]), "key_found": bool(row[1]), "server_found": bool(row[2])}
+
+        except Exception as e:
+            logging.error(f"Error resolving tenant from PostgreSQL: {str(e)}")
+            return None
+
+
+    def get_revoked_key_ids(self) -> list[str] | None:
+        try:
+            query = """
+                SELECT key_id
+                FROM revoked_api_keys
+                WHERE expires_at IS NULL OR expires_at > NOW()
+            """
+            rows = self.dbi.execute_query(query, fetch=QueryMode.ALL)
+            if rows is None:
+                return None
+
+            return [row[0] for row in rows]
+
+        except Exception as e:
+            logging.error(f"Error getting revoked api keys from PostgreSQL: {str(e)}")
+            return None
+
             
     # ====================== INSERT ======================
  
@@ -101,6 +181,22 @@ class PostgresServices:
         except Exception as e:
             logging.error(f"Error inserting api_key into PostgreSQL: {str(e)}")
             return False
+
+
+    def insert_revoked_api_key(self, key_id: str, app_id: str, expires_at: int | None = None) -> bool:
+        try:
+            # DO UPDATE so a repeat revocation still returns its row; execute_query returns None on error
+            query = """
+                INSERT INTO revoked_api_keys (key_id, app_id, expires_at)
+                VALUES (%s, %s, CASE WHEN %s::bigint > 0 THEN to_timestamp(%s::bigint) ELSE NULL END)
+                ON CONFLICT (key_id) DO UPDATE SET key_id = EXCLUDED.key_id
+                RETURNING key_id
+            """
+            row = self.dbi.execute_query(query, (key_id, app_id, expires_at or 0, expires_at or 0), fetch=QueryMode.ONE)
+            return row is not None
+        except Exception as e:
+            logging.error(f"Error inserting revoked api_key into PostgreSQL: {str(e)}")
+            return False
         
         
     # ====================== UPDATE ======================
@@ -108,6 +204,20 @@ class PostgresServices:
     
     
     # ====================== DELETE ======================
+
+
+    def delete_api_key(self, app_id: str, api_key: str) -> bool:
+        try:
+            query = """
+                DELETE FROM api_keys
+                WHERE app_id = %s AND api_key = %s
+            """
+            self.dbi.execute_query(query, (app_id, api_key))
+            return True
+        except Exception as e:
+            logging.error(f"Error deleting api_key from PostgreSQL: {str(e)}")
+            return False
+
         
 if __name__ == "__main__":
     pgs = PostgresServices()
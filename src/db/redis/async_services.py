@@ -0,0 +1,102 @@
+import os
+from typing import Any, Callable
+
+import redis
+import redis.asyncio as aioredis
+
+from src.db.redis.services import RedisServices, _write_ok
+from src.models.logs import Logs
+from src.utils.utils import logging
+
+
+class AsyncRedisServices:
+    """
+    redis.asyncio counterpart of the request-path parts of RedisServices.
+
+    Buffer layout, codec and key names come from the sync RedisServices
+    (looked up through `redis_services` so a reconnect is followed), so both
+    clients always write the same format. Draining stays on the sync client in
+    the flusher threads.
+    """
+
+    def __init__(self, redis_services: Callable[[], RedisServices]):
+        self.redis_services = redis_services
+
+        # blocking pool: callers wait for a free connection instead of opening unbounded sockets
+        self.pool = aioredis.BlockingConnectionPool(
+            host=os.getenv("REDIS_HOST"),
+            port=os.getenv("REDIS_PORT"),
+            password=os.getenv("REDIS_PASSWORD"),
+            username=os.getenv("REDIS_USERNAME"),
+            max_connections=int(os.getenv("REDIS_ASYNC_MAX_CONNECTIONS", "50")),
+            timeout=float(os.getenv("REDIS_ASYNC_POOL_TIMEOUT_SECONDS", "5")),
+            socket_connect_timeout=5,
+            socket_timeout=5,
+        )
+        self.redis_client = aioredis.Redis(connection_pool=self.pool)
+        self._stream_group_ready = False
+
+    @property
+    def sync(self) -> RedisServices:
+        return self.redis_services()
+
+    async def ping(self) -> bool:
+        try:
+            return bool(await self.redis_client.ping())
+        except Exception as e:
+            logging.error(f"Async Redis health check failed: {e}")
+            return False
+
+    async def close(self) -> None:
+        try:
+            await self.redis_client.aclose()
+            await self.pool.disconnect()
+        except Exception as e:
+            logging.error(f"Error closing async Redis connection pool: {e}")
+
+    async def _ensure_stream_group(self) -> None:
+        if self._stream_group_ready:
+            return
+
+        sync = self.sync
+        try:
+            await self.redis_client.xgroup_create(
+                name=sync.stream_key,
+                groupname=sync.stream_group,
+                id="0",
+                mkstream=True,
+            )
+        except redis.exceptions.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+        self._stream_group_ready = True
+
+    async def _write(self, encoded_pairs: list[tuple[str, bytes]], refs: list | None = None) -> int | None:
+        try:
+            if not encoded_pairs:
+                return 0
+
+            sync = self.sync
+            if sync.buffer_mode == "stream":
+                await self._ensure_stream_group()
+
+            pipe = self.redis_client.pipeline(transaction=False)
+            written = sync._queue_buffer_writes(pipe, encoded_pairs, refs=refs)
+            results = (await pipe.execute(raise_on_error=False))[:written]
+            try:
+                if sync._queue_after_write(pipe, encoded_pairs, results, refs):
+                    await pipe.execute()
+            except Exception as e:
+                logging.warning(f"Buffer counter or hot index update failed | count={written} | error={e}")
+            return sum(1 for resp in results if _write_ok(resp))
+
+        except Exception as e:
+            logging.exception(f"Error buffering objects in Redis (async): {e}")
+            return None
+
+    async def buffer_logs(self, log_pairs: list[tuple[str, Any | Logs]]) -> int | None:
+        return await self._write(*self.sync.encode_logs(log_pairs))
+
+    async def buffer_raw(self, raw_pairs: list[tuple[str, bytes]]) -> int | None:
+        return await self._write(*self.sync.encode_raw(raw_pairs))
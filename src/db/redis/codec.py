@@ -0,0 +1,243 @@
+import glob
+import json
+import os
+from typing import Any
+
+from src.utils.utils import logging
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # optional
+    lz4_frame = None
+
+
+# Encoded payloads start with a 3 byte header: format version, serializer, compression.
+# Legacy payloads are bare JSON text and always start with "{", which never
+# collides with FORMAT_VERSION, so both can sit in the same buffer during rollout.
+FORMAT_VERSION = 1
+
+SERIALIZERS = {"json": 1, "orjson": 2, "msgpack": 3}
+COMPRESSIONS = {"none": 0, "zstd": 1, "lz4": 2}
+_SERIALIZER_NAMES = {v: k for k, v in SERIALIZERS.items()}
+_COMPRESSION_NAMES = {v: k for k, v in COMPRESSIONS.items()}
+
+# zstd dictionaries by dict_id, so payloads compressed with an older dictionary still decode
+_ZSTD_DICTIONARIES: dict[int, Any] = {}
+
+
+def _load_zstd_dictionaries(dict_path: str | None) -> Any | None:
+    """Load every *.dict next to `dict_path` and return the one at `dict_path`."""
+    if not dict_path or zstandard is None:
+        return None
+
+    for path in glob.glob(os.path.join(os.path.dirname(dict_path) or ".", "*.dict")):
+        try:
+            with open(path, "rb") as f:
+                zdict = zstandard.ZstdCompressionDict(f.read())
+            _ZSTD_DICTIONARIES[zdict.dict_id()] = zdict
+        except Exception as e:
+            logging.error(f"Failed to load zstd dictionary | path={path} | error={e}")
+
+    with open(dict_path, "rb") as f:
+        zdict = zstandard.ZstdCompressionDict(f.read())
+    _ZSTD_DICTIONARIES[zdict.dict_id()] = zdict
+    return zdict
+
+
+def train_zstd_dictionary(samples: list[bytes], dict_size: int = 112_640) -> bytes:
+    """Train a zstd dictionary on serialized (uncompressed) payload samples."""
+    if zstandard is None:
+        raise RuntimeError("zstandard is not installed")
+    return zstandard.train_dictionary(dict_size, samples).as_bytes()
+
+
+class PayloadCodec:
+    """
+    Serializer + optional compression for payloads buffered in Redis.
+
+    `encode` always writes the configured format; `decode` reads whatever
+    format the header says, including legacy header-less JSON.
+    """
+
+    def __init__(
+        self,
+        serializer: str = "json",
+        compression: str = "none",
+        level: int = 3,
+        zstd_dict_path: str | None = None,
+    ):
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Unknown payload serializer: {serializer}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown payload compression: {compression}")
+        if serializer == "orjson" and orjson is None:
+            raise RuntimeError("REDIS_CODEC=orjson requires the orjson package")
+        if serializer == "msgpack" and msgpack is None:
+            raise RuntimeError("REDIS_CODEC=msgpack requires the msgpack package")
+        if compression == "zstd" and zstandard is None:
+            raise RuntimeError("REDIS_CODEC_COMPRESSION=zstd requires the zstandard package")
+        if compression == "lz4" and lz4_frame is None:
+            raise RuntimeError("REDIS_CODEC_COMPRESSION=lz4 requires the lz4 package")
+
+        self.serializer = serializer
+        self.compression = compression
+        self.level = level
+        self.header = bytes([FORMAT_VERSION, SERIALIZERS[serializer], COMPRESSIONS[compression]])
+
+        self._zstd_compressor = None
+        if compression == "zstd":
+            zdict = _load_zstd_dictionaries(zstd_dict_path)
+            self._zstd_compressor = zstandard.ZstdCompressor(level=level, dict_data=zdict)
+
+    @classmethod
+    def from_env(cls) -> "PayloadCodec":
+        return cls(
+            serializer=os.getenv("REDIS_CODEC", "json").lower(),
+            compression=os.getenv("REDIS_CODEC_COMPRESSION", "none").lower(),
+            level=int(os.getenv("REDIS_CODEC_LEVEL", "3")),
+            zstd_dict_path=os.getenv("REDIS_CODEC_ZSTD_DICT"),
+        )
+
+    @property
+    def is_legacy(self) -> bool:
+        return self.serializer == "json" and self.compression == "none"
+
+    def serialize(self, obj: Any) -> bytes:
+        if self.serializer == "orjson":
+            return orjson.dumps(obj, default=str)
+        if self.serializer == "msgpack":
+            return msgpack.packb(obj, default=str, use_bin_type=True)
+        return json.dumps(obj, ensure_ascii=False, default=str).encode()
+
+    def encode(self, obj: Any) -> bytes:
+        body = self.serialize(obj)
+        if self.is_legacy:
+            # keep writing the legacy format until a codec is opted into
+            return body
+
+        if self.compression == "zstd":
+            body = self._zstd_compressor.compress(body)
+        elif self.compression == "lz4":
+            body = lz4_frame.compress(body)
+
+        return self.header + body
+
+    def encode_json_bytes(self, body: bytes) -> bytes:
+        """
+        Wrap an already-serialized JSON document without parsing it again.
+        It is always tagged as JSON, whatever serializer is configured, and
+        only the configured compression is applied.
+        """
+        if self.compression == "none":
+            return body
+
+        if self.compression == "zstd":
+            body = self._zstd_compressor.compress(body)
+        elif self.compression == "lz4":
+            body = lz4_frame.compress(body)
+
+        return bytes([FORMAT_VERSION, SERIALIZERS["json"], COMPRESSIONS[self.compression]]) + body
+
+
+def _decompress(compression: int, body: bytes) -> bytes:
+    name = _COMPRESSION_NAMES.get(compression)
+    if name == "none":
+        return body
+    if name == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd payload found but zstandard is not installed")
+        dict_id = zstandard.get_frame_parameters(body).dict_id
+        if dict_id and dict_id not in _ZSTD_DICTIONARIES:
+            # this process may not be writing zstd itself (e.g. during a rollback)
+            _load_zstd_dictionaries(os.getenv("REDIS_CODEC_ZSTD_DICT"))
+        zdict = _ZSTD_DICTIONARIES.get(dict_id) if dict_id else None
+        if dict_id and zdict is None:
+            raise ValueError(f"zstd payload uses unknown dictionary id {dict_id}")
+        return zstandard.ZstdDecompressor(dict_data=zdict).decompress(body)
+    if name == "lz4":
+        if lz4_frame is None:
+            raise RuntimeError("lz4 payload found but lz4 is not installed")
+        return lz4_frame.decompress(body)
+    raise ValueError(f"Unknown payload compression id {compression}")
+
+
+def decode_payload(raw: Any) -> Any:
+    """Decode any payload format written by PayloadCodec (or legacy JSON text)."""
+    if raw is None:
+        return None
+
+    if isinstance(raw, str):
+        raw = raw.encode()
+
+    if not raw or raw[0] != FORMAT_VERSION:
+        try:
+            return json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return raw.decode(errors="replace")
+
+    serializer, compression = raw[1], raw[2]
+    body = _decompress(compression, raw[3:])
+
+    name = _SERIALIZER_NAMES.get(serializer)
+    if name == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("msgpack payload found but msgpack is not installed")
+        return msgpack.unpackb(body, raw=False)
+    if name == "orjson" and orjson is not None:
+        return orjson.loads(body)
+    if name in ("json", "orjson"):
+        return json.loads(body)
+    raise ValueError(f"Unknown payload serializer id {serializer}")
+
+
+def payload_to_json_bytes(raw: Any) -> bytes:
+    """
+    JSON text of a buffered payload. JSON-family payloads are only
+    decompressed, never parsed, so they can be streamed into a JSONEachRow insert.
+    """
+    if isinstance(raw, str):
+        raw = raw.encode()
+
+    if not raw or raw[0] != FORMAT_VERSION:
+        return raw
+
+    serializer, compression = raw[1], raw[2]
+    if _SERIALIZER_NAMES.get(serializer) in ("json", "orjson"):
+        return _decompress(compression, raw[3:])
+
+    return json.dumps(decode_payload(raw), ensure_ascii=False, default=str).encode()
+
+
+if __name__ == "__main__":
+    # Train a dictionary from the payloads currently buffered in Redis:
+    #   python -m src.db.redis.codec /path/to/logs-v1.dict
+    import sys
+    from src.db.redis.services import RedisServices
+
+    output_path = sys.argv[1] if len(sys.argv) > 1 else "logs.dict"
+    # train on the serializer that will be compressed, not on JSON
+    codec = PayloadCodec(serializer=os.getenv("REDIS_CODEC", "json").lower())
+    raw_logs = RedisServices().get_object() or []
+    samples = [
+        codec.serialize(payload)
+        for entry in raw_logs
+        for payload in entry.values()
+    ]
+    with open(output_path, "wb") as f:
+        f.write(train_zstd_dictionary(samples))
+    print(f"Trained dictionary on {len(samples)} payloads -> {output_path}")
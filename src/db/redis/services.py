@@ -1,14 +1,102 @@
+from datetime import datetime, timezone
 from typing import Any
 import json
+import os
+import re
+import time
+
+import redis
 
 from src.db.redis.initialise import Initialise
+from src.db.redis.codec import PayloadCodec, decode_payload, payload_to_json_bytes
 from src.models.logs import Logs
 from src.utils.utils import logging
 
 
+_APP_ID_FIELD = re.compile(rb'"app_id"\s*:\s*"([^"]+)"')
+_TIMESTAMP_FIELD = re.compile(rb'"timestamp"\s*:\s*"([^"]+)"')
+# hot index bucket for logs sent without an app_id, so unscoped reads still see them
+_NO_TENANT = "-"
+
+
+def app_id_of(payload: Any) -> str | None:
+    """Tenant of a buffered payload; JSON bytes are scanned, not parsed."""
+    if isinstance(payload, (bytes, bytearray)):
+        match = _APP_ID_FIELD.search(payload)
+        return match.group(1).decode() if match else None
+    if isinstance(payload, dict):
+        app_id = payload.get("app_id")
+    else:
+        app_id = getattr(payload, "app_id", None)
+    return str(app_id) if app_id else None
+
+
+def timestamp_ms_of(payload: Any) -> int:
+    """Log timestamp in epoch ms (naive values are UTC); now when missing or unreadable."""
+    if isinstance(payload, (bytes, bytearray)):
+        match = _TIMESTAMP_FIELD.search(payload)
+        value = match.group(1).decode() if match else None
+    elif isinstance(payload, dict):
+        value = payload.get("timestamp")
+    else:
+        value = getattr(payload, "timestamp", None)
+
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            value = None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    return int(time.time() * 1000)
+
+
+def _write_ok(reply: Any) -> bool:
+    return bool(reply) and not isinstance(reply, Exception)
+
+
 class RedisServices:
     def __init__(self):
         self.redis_obj = Initialise()
+        # serializer/compression for buffered payloads (REDIS_CODEC, REDIS_CODEC_COMPRESSION)
+        self.codec = PayloadCodec.from_env()
+
+        # "keys": one top-level key per log (legacy), "stream": Redis Streams + consumer group
+        self.buffer_mode = os.getenv("REDIS_BUFFER_MODE", "keys").lower()
+        # keys mode namespace; scans only ever look under it, so other STRING keys
+        # (auth cache, query cache, rate limits) are never mistaken for logs
+        self.buffer_key_prefix = os.getenv("REDIS_BUFFER_KEY_PREFIX", "logs:buf:")
+        self.stream_key = os.getenv("REDIS_STREAM_KEY", "logs:stream")
+        self.stream_group = os.getenv("REDIS_STREAM_GROUP", "clickhouse-flush")
+        self.stream_claim_idle_ms = int(os.getenv("REDIS_STREAM_CLAIM_IDLE_MS", "60000"))
+        # running totals of buffered payload bytes and logs, maintained alongside every write/ack
+        self.buffer_bytes_key = os.getenv("REDIS_BUFFER_BYTES_KEY", "logs:buffer:bytes")
+        self.buffer_count_key = os.getenv("REDIS_BUFFER_COUNT_KEY", "logs:buffer:count")
+        self._stream_group_ready = False
+
+        # per-tenant read index of buffered logs: ZSET of buffer handles (keys-mode log_id or
+        # stream entry id) scored by timestamp ms; payloads are read from the buffer itself
+        self.hot_index = os.getenv("REDIS_HOT_INDEX", "true").lower() == "true"
+        self.hot_prefix = os.getenv("REDIS_HOT_INDEX_PREFIX", "logs:hot")
+        # refreshed on every write, so only an idle tenant's leftovers expire
+        self.hot_ttl = int(os.getenv("REDIS_HOT_INDEX_TTL_SECONDS", "86400"))
+        self.hot_read_max = int(os.getenv("REDIS_HOT_INDEX_READ_MAX", "10000"))
+
+    def ping(self) -> bool:
+        try:
+            return bool(self.redis_obj.redis_client.ping())
+        except Exception as e:
+            logging.error(f"Redis health check failed: {e}")
+            return False
+
+    def close(self) -> None:
+        try:
+            self.redis_obj.redis_client.close()
+            self.redis_obj.pool.disconnect()
+        except Exception as e:
+            logging.error(f"Error closing Redis connection pool: {e}")
 
     @staticmethod
     def _jsonable(value: Any) -> Any:
@@ -49,94 +137,129 @@ class RedisServices:
 
         return normalized
 
-    def insert_object(self, log_pair: tuple[str, Any | Logs]):
-        try:
-            log_key, log_payload = log_pair
-
-            # bytes -> str
-            if isinstance(log_payload, (bytes, bytearray)):
-                log_payload = log_payload.decode()
-
-            # str -> try json else treat as message text
-            if isinstance(log_payload, str):
-                try:
-                    log_payload = json.loads(log_payload)
-                except json.JSONDecodeError:
-                    log_payload = {"message_info": {"message": log_payload}}
-
-            if isinstance(log_payload, Logs):
-                payload_dict = log_payload.model_dump(exclude_none=True)
-
-            elif isinstance(log_payload, dict):
-                payload_dict = {k: v for k, v in log_payload.items() if v is not None}
-                payload_dict = self._normalize_payload_dict(payload_dict)
-
-                # If someone still sends legacy flat keys, map them
-                # (keeps backward compatibility with old callers)
-                if "message" in payload_dict or "description" in payload_dict:
-                    mi = payload_dict.get("message_info") or {}
-                    if "message" in payload_dict and "message" not in mi:
-                        mi["message"] = payload_dict.pop("message")
-                    if "description" in payload_dict and "description" not in mi:
-                        mi["description"] = payload_dict.pop("description")
-                    payload_dict["message_info"] = mi
-
-                if "diagnostics" in payload_dict or "source" in payload_dict:
-                    # If "source" is already nested in your new model, leave it.
-                    # If "diagnostics" is flat legacy, move into source.diagnostics
-                    if isinstance(payload_dict.get("source"), dict):
-                        src_obj = payload_dict["source"]
-                        if "diagnostics" in payload_dict:
-                            diag = payload_dict.pop("diagnostics")
-                            if "diagnostics" not in src_obj:
-                                src_obj["diagnostics"] = diag
-                            payload_dict["source"] = src_obj
-                    else:
-                        # source isn't a dict; create one
-                        diag = payload_dict.pop("diagnostics", None)
-                        src = payload_dict.pop("source", None)
-                        payload_dict["source"] = {
-                            "diagnostics": diag if diag is not None else {},
-                            "source": src if isinstance(src, dict) else ({} if src is None else {"value": src}),
-                        }
+    def _build_payload(self, log_payload: Any | Logs) -> dict[str, Any]:
+        # bytes -> str
+        if isinstance(log_payload, (bytes, bytearray)):
+            log_payload = log_payload.decode()
 
-            else:
-                payload_dict = {"message_info": {"message": str(log_payload)}}
+        # str -> try json else treat as message text
+        if isinstance(log_payload, str):
+            try:
+                log_payload = json.loads(log_payload)
+            except json.JSONDecodeError:
+                log_payload = {"message_info": {"message": log_payload}}
+
+        if isinstance(log_payload, Logs):
+            payload_dict = log_payload.model_dump(exclude_none=True)
 
+        elif isinstance(log_payload, dict):
+            payload_dict = {k: v for k, v in log_payload.items() if v is not None}
             payload_dict = self._normalize_payload_dict(payload_dict)
 
-            payload = json.dumps(payload_dict, ensure_ascii=False, default=str)
-            return self.redis_obj.redis_client.set(str(log_key), payload)
+            # If someone still sends legacy flat keys, map them
+            # (keeps backward compatibility with old callers)
+            if "message" in payload_dict or "description" in payload_dict:
+                mi = payload_dict.get("message_info") or {}
+                if "message" in payload_dict and "message" not in mi:
+                    mi["message"] = payload_dict.pop("message")
+                if "description" in payload_dict and "description" not in mi:
+                    mi["description"] = payload_dict.pop("description")
+                payload_dict["message_info"] = mi
+
+            if "diagnostics" in payload_dict or "source" in payload_dict:
+                # If "source" is already nested in your new model, leave it.
+                # If "diagnostics" is flat legacy, move into source.diagnostics
+                if isinstance(payload_dict.get("source"), dict):
+                    src_obj = payload_dict["source"]
+                    if "diagnostics" in payload_dict:
+                        diag = payload_dict.pop("diagnostics")
+                        if "diagnostics" not in src_obj:
+                            src_obj["diagnostics"] = diag
+                        payload_dict["source"] = src_obj
+                else:
+                    # source isn't a dict; create one
+                    diag = payload_dict.pop("diagnostics", None)
+                    src = payload_dict.pop("source", None)
+                    payload_dict["source"] = {
+                        "diagnostics": diag if diag is not None else {},
+                        "source": src if isinstance(src, dict) else ({} if src is None else {"value": src}),
+                    }
+
+        else:
+            payload_dict = {"message_info": {"message": str(log_payload)}}
+
+        return self._normalize_payload_dict(payload_dict)
+
+    def insert_object(self, log_pair: tuple[str, Any | Logs]):
+        # through the pipeline so the buffer counters stay in step
+        return self.insert_objects([log_pair])
+
+    def insert_objects(self, log_pairs: list[tuple[str, Any | Logs]]):
+        """
+        Write many logs with one non-transactional pipeline, then update the
+        buffer counters for the ones that were stored.
+        Returns the number of keys written, or None on failure.
+        """
+        try:
+            if not log_pairs:
+                return 0
+
+            return self._write_buffer(*self.encode_logs(log_pairs), mode="keys")
 
         except Exception as e:
-            logging.exception(f"Error inserting object into Redis: {e}")
+            logging.exception(f"Error inserting objects into Redis: {e}")
             return None
 
-    def get_object(self, key: str | None = None):
+    @staticmethod
+    def _decode_value(raw: Any):
         try:
-            def decode_value(raw: Any):
-                if raw is None:
-                    return None
-
-                if isinstance(raw, bytes):
-                    raw = raw.decode()
+            return decode_payload(raw)
+        except Exception as e:
+            logging.error(f"Failed to decode buffered payload: {e}")
+            return raw.decode(errors="replace") if isinstance(raw, bytes) else raw
 
-                try:
-                    return json.loads(raw)
-                except (json.JSONDecodeError, TypeError):
-                    return raw
+    @staticmethod
+    def _decode_key(raw_key: Any) -> str:
+        return raw_key.decode() if isinstance(raw_key, bytes) else raw_key
+
+    def _buffer_key(self, log_id: str) -> str:
+        return f"{self.buffer_key_prefix}{log_id}"
+
+    def _scan_log_keys(self, limit: int | None = None) -> list[str]:
+        """log_ids buffered in keys mode."""
+        # SCAN instead of KEYS so Redis is never blocked, and only string keys
+        # under the buffer prefix so nothing else in the database is touched
+        prefix_length = len(self.buffer_key_prefix)
+        log_ids: list[str] = []
+        for raw_key in self.redis_obj.redis_client.scan_iter(
+            match=f"{self.buffer_key_prefix}*", count=1000, _type="STRING"
+        ):
+            log_ids.append(self._decode_key(raw_key)[prefix_length:])
+            if limit is not None and len(log_ids) >= limit:
+                break
+        return log_ids
 
+    def get_object(self, key: str | None = None):
+        try:
             if key is not None:
-                raw_value = self.redis_obj.redis_client.get(key)
-                return [{key: decode_value(raw_value)}] if raw_value else []
+                raw_value = self.redis_obj.redis_client.get(self._buffer_key(key))
+                return [{key: self._decode_value(raw_value)}] if raw_value else []
+
+            if self.buffer_mode == "stream":
+                return [
+                    {log_id: payload}
+                    for _, log_id, payload, _ in self._stream_range()
+                ]
 
-            keys = self.redis_obj.redis_client.keys("*")
+            log_ids = self._scan_log_keys()
             response: list[dict[str, Any]] = []
 
-            for raw_key in keys:
-                decoded_key = raw_key.decode() if isinstance(raw_key, bytes) else raw_key
-                raw_value = self.redis_obj.redis_client.get(decoded_key)
-                response.append({decoded_key: decode_value(raw_value)})
+            for chunk_start in range(0, len(log_ids), 1000):
+                chunk = log_ids[chunk_start:chunk_start + 1000]
+                raw_values = self.redis_obj.redis_client.mget([self._buffer_key(log_id) for log_id in chunk])
+                for log_id, raw_value in zip(chunk, raw_values):
+                    if raw_value is not None:
+                        response.append({log_id: self._decode_value(raw_value)})
 
             return response
 
@@ -144,20 +267,486 @@ class RedisServices:
             logging.exception(f"Error retrieving object from Redis: {e}")
             return None
 
-    def delete_object(self, key: str | None = None):
+    def delete_object(self, key: str | list[str] | None = None):
+        """Delete buffered logs by log_id, or every buffered log when `key` is None."""
         try:
             if key is None:
-                keys = self.redis_obj.redis_client.keys("*")
-                if keys:
-                    return self.redis_obj.redis_client.delete(*keys)
-                return 0
+                key = self._scan_log_keys()
+                self.redis_obj.redis_client.mset({self.buffer_bytes_key: 0, self.buffer_count_key: 0})
 
-            return self.redis_obj.redis_client.delete(key)
+            if isinstance(key, list):
+                return self.redis_obj.redis_client.delete(*[self._buffer_key(k) for k in key]) if key else 0
+
+            return self.redis_obj.redis_client.delete(self._buffer_key(key))
 
         except Exception as e:
             logging.exception(f"Error deleting object from Redis: {str(e)}")
             return None
 
+    # ====================== STREAM BUFFER ======================
+
+    def _ensure_stream_group(self) -> None:
+        if self._stream_group_ready:
+            return
+
+        try:
+            self.redis_obj.redis_client.xgroup_create(
+                name=self.stream_key,
+                groupname=self.stream_group,
+                id="0",
+                mkstream=True,
+            )
+            logging.info(f"Redis stream consumer group created | stream={self.stream_key} | group={self.stream_group}")
+        except redis.exceptions.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+        self._stream_group_ready = True
+
+    def _decode_entry(self, entry_id: Any, fields: dict | None, raw: bool = False) -> tuple[str, str, Any, int] | None:
+        if not fields:
+            # entry was trimmed while it sat in the pending list
+            return None
+
+        fields = {self._decode_key(k): v for k, v in fields.items()}
+        log_id = self._decode_key(fields.get("log_id"))
+        raw_payload = fields.get("payload") or b""
+        size = len(raw_payload.encode() if isinstance(raw_payload, str) else raw_payload)
+        payload = payload_to_json_bytes(raw_payload) if raw else self._decode_value(raw_payload)
+        return self._decode_key(entry_id), log_id, payload, size
+
+    def _stream_range(self) -> list[tuple[str, str, Any, int]]:
+        entries = self.redis_obj.redis_client.xrange(self.stream_key, min="-", max="+")
+        return [e for e in (self._decode_entry(i, f) for i, f in entries) if e is not None]
+
+    def stream_add(self, log_pairs: list[tuple[str, Any | Logs]]):
+        """
+        XADD every log onto the buffer stream in one pipeline.
+        Cost is O(1) per log regardless of how large the backlog is.
+        """
+        try:
+            if not log_pairs:
+                return 0
+
+            self._ensure_stream_group()
+
+            return self._write_buffer(*self.encode_logs(log_pairs), mode="stream")
+
+        except Exception as e:
+            logging.exception(f"Error adding objects to Redis stream: {e}")
+            return None
+
+    def stream_read_batch(self, consumer: str, count: int, raw: bool = False) -> list[tuple[str, str, Any, int]]:
+        """
+        Claim up to `count` entries for this consumer.
+
+        Entries left pending by a drainer that died (idle longer than
+        `stream_claim_idle_ms`) are reclaimed first, then new entries are read
+        with XREADGROUP so each entry is only handed to one drainer at a time.
+        """
+        self._ensure_stream_group()
+        client = self.redis_obj.redis_client
+        entries: list[tuple[str, str, Any, int]] = []
+
+        claimed = client.xautoclaim(
+            name=self.stream_key,
+            groupname=self.stream_group,
+            consumername=consumer,
+            min_idle_time=self.stream_claim_idle_ms,
+            start_id="0-0",
+            count=count,
+        )
+        for entry_id, fields in (claimed[1] if claimed else []):
+            decoded = self._decode_entry(entry_id, fields, raw=raw)
+            if decoded is not None:
+                entries.append(decoded)
+
+        remaining = count - len(entries)
+        if remaining > 0:
+            response = client.xreadgroup(
+                groupname=self.stream_group,
+                consumername=consumer,
+                streams={self.stream_key: ">"},
+                count=remaining,
+            )
+            for _, stream_entries in response or []:
+                for entry_id, fields in stream_entries:
+                    decoded = self._decode_entry(entry_id, fields, raw=raw)
+                    if decoded is not None:
+                        entries.append(decoded)
+
+        return entries
+
+    def buffer_raw(self, raw_pairs: list[tuple[str, bytes]]):
+        """
+        Buffer logs that are already serialized JSON (the raw ingest lane).
+        The bytes are stored as-is, apart from optional compression.
+        """
+        try:
+            if not raw_pairs:
+                return 0
+
+            if self.buffer_mode == "stream":
+                self._ensure_stream_group()
+
+            return self._write_buffer(*self.encode_raw(raw_pairs))
+
+        except Exception as e:
+            logging.exception(f"Error buffering raw objects in Redis: {e}")
+            return None
+
+    def stream_ack(self, entry_ids: list[str]) -> list[bool]:
+        """
+        XACK entries after a confirmed warehouse insert, then trim everything
+        that every drainer has acknowledged. Returns, per entry, whether this
+        call acknowledged it.
+        """
+        if not entry_ids:
+            return []
+
+        pipe = self.redis_obj.redis_client.pipeline(transaction=False)
+        for entry_id in entry_ids:
+            pipe.xack(self.stream_key, self.stream_group, entry_id)
+        acked = [bool(resp) for resp in pipe.execute()]
+
+        try:
+            self._trim_acknowledged()
+        except Exception as e:
+            # the entries are acked; the next trim drops them
+            logging.warning(f"Redis stream trim failed | error={e}")
+        return acked
+
+    def _trim_acknowledged(self) -> None:
+        client = self.redis_obj.redis_client
+
+        pending = client.xpending(self.stream_key, self.stream_group)
+        if pending and pending.get("pending"):
+            # keep the oldest entry still being worked on by any drainer
+            min_id = self._decode_key(pending["min"])
+        else:
+            groups = client.xinfo_groups(self.stream_key)
+            group = next(
+                (g for g in groups if self._decode_key(g.get("name")) == self.stream_group),
+                None,
+            )
+            if not group:
+                return
+            last_delivered = self._decode_key(group.get("last-delivered-id"))
+            if not last_delivered or last_delivered == "0-0":
+                return
+            # everything up to and including the last delivered entry is acked
+            ms, seq = last_delivered.split("-")
+            min_id = f"{ms}-{int(seq) + 1}"
+
+        client.xtrim(self.stream_key, minid=min_id, approximate=False)
+
+    # ====================== BUFFER (mode-agnostic) ======================
+
+    def encode_for_buffer(self, log_id: str, log_payload: Any | Logs) -> bytes:
+        return self.encode_logs([(log_id, log_payload)])[0][0][1]
+
+    def encode_logs(
+        self,
+        log_pairs: list[tuple[str, Any | Logs]],
+    ) -> tuple[list[tuple[str, bytes]], list[tuple[str | None, int]]]:
+        """
+        (encoded pairs, hot index refs) for `log_pairs`; a ref is the
+        (app_id, timestamp ms) the log is indexed under.
+        """
+        encoded_pairs, refs = [], []
+        for log_id, log_payload in log_pairs:
+            payload_dict = self._build_payload(log_payload)
+            # the buffer's log_id is the ClickHouse row's log_id, so readers can
+            # match a flushed row with its still-indexed buffer entry
+            payload_dict["log_id"] = str(log_id)
+            encoded_pairs.append((log_id, self.codec.encode(payload_dict)))
+            refs.append((app_id_of(payload_dict), timestamp_ms_of(payload_dict)))
+        return encoded_pairs, refs
+
+    def encode_raw(self, raw_pairs: list[tuple[str, bytes]]) -> tuple[list[tuple[str, bytes]], list[tuple[str | None, int]]]:
+        """encode_logs() for already-serialized JSON bodies."""
+        encoded_pairs = [(log_id, self.codec.encode_json_bytes(body)) for log_id, body in raw_pairs]
+        refs = [(app_id_of(body), timestamp_ms_of(body)) for _, body in raw_pairs]
+        return encoded_pairs, refs
+
+    def _queue_buffer_writes(
+        self,
+        pipe,
+        encoded_pairs: list[tuple[str, bytes]],
+        mode: str | None = None,
+        refs: list[tuple[str | None, int]] | None = None,
+    ) -> int:
+        """
+        Queue the buffer writes for encoded payloads and (keys mode) the hot
+        index on `pipe`. Works for both redis-py and redis.asyncio pipelines;
+        the caller executes it with raise_on_error=False and then runs what
+        _queue_after_write() queues. Returns how many leading replies belong
+        to the buffer writes.
+        """
+        mode = mode or self.buffer_mode
+        for log_id, payload in encoded_pairs:
+            if mode == "stream":
+                pipe.xadd(self.stream_key, {"log_id": str(log_id), "payload": payload})
+            else:
+                pipe.set(self._buffer_key(log_id), payload)
+
+        if self.hot_index and refs and mode != "stream":
+            # a keys-mode log is addressable by its log_id, so it's indexed in the same round trip
+            self._queue_hot_writes(pipe, [log_id for log_id, _ in encoded_pairs], refs)
+        return len(encoded_pairs)
+
+    def _queue_after_write(
+        self,
+        pipe,
+        encoded_pairs: list[tuple[str, bytes]],
+        results: list,
+        refs: list[tuple[str | None, int]] | None,
+        mode: str | None = None,
+    ) -> bool:
+        """
+        Queue what depends on the buffer write replies in `results`: the byte
+        and count counters, for the writes that succeeded only, and the
+        stream-mode hot index, which needs the ids XADD returned. Returns
+        whether anything was queued on `pipe`.
+        """
+        stored = [payload for (_, payload), resp in zip(encoded_pairs, results) if _write_ok(resp)]
+        if not stored:
+            return False
+
+        pipe.incrby(self.buffer_bytes_key, sum(len(payload) for payload in stored))
+        pipe.incrby(self.buffer_count_key, len(stored))
+
+        if self.hot_index and refs and (mode or self.buffer_mode) == "stream":
+            members = [self._decode_key(entry_id) if _write_ok(entry_id) else None for entry_id in results]
+            self._queue_hot_writes(pipe, members, refs)
+        return True
+
+    def _write_buffer(
+        self,
+        encoded_pairs: list[tuple[str, bytes]],
+        refs: list[tuple[str | None, int]],
+        mode: str | None = None,
+    ) -> int:
+        """Write encoded logs and index them. Returns how many were buffered."""
+        pipe = self.redis_obj.redis_client.pipeline(transaction=False)
+        written = self._queue_buffer_writes(pipe, encoded_pairs, mode=mode, refs=refs)
+        # a failed index write must not make a buffered log look lost (and get spilled twice)
+        results = pipe.execute(raise_on_error=False)[:written]
+        try:
+            if self._queue_after_write(pipe, encoded_pairs, results, refs, mode=mode):
+                pipe.execute()
+        except Exception as e:
+            logging.warning(f"Buffer counter or hot index update failed | count={written} | error={e}")
+        return sum(1 for resp in results if _write_ok(resp))
+
+    # ====================== HOT INDEX ======================
+
+    @property
+    def _hot_tenants_key(self) -> str:
+        return f"{self.hot_prefix}:tenants"
+
+    def _hot_key(self, app_id: str) -> str:
+        return f"{self.hot_prefix}:{app_id}:z"
+
+    def _queue_hot_writes(self, pipe, members: list[str | None], refs: list[tuple[str | None, int]]) -> bool:
+        by_tenant: dict[str, dict[str, int]] = {}
+        for member, (app_id, timestamp_ms) in zip(members, refs):
+            if member:
+                by_tenant.setdefault(app_id or _NO_TENANT, {})[str(member)] = timestamp_ms
+
+        for app_id, scores in by_tenant.items():
+            zset_key = self._hot_key(app_id)
+            pipe.zadd(zset_key, scores)
+            pipe.expire(zset_key, self.hot_ttl)
+        if by_tenant:
+            pipe.sadd(self._hot_tenants_key, *by_tenant)
+            pipe.expire(self._hot_tenants_key, self.hot_ttl)
+        return bool(by_tenant)
+
+    def _remove_hot(self, refs: list[tuple[str | None, str]]) -> None:
+        """Drop flushed logs, given as (app_id, buffer handle), from the hot index."""
+        by_tenant: dict[str, list[str]] = {}
+        for app_id, member in refs:
+            if member:
+                by_tenant.setdefault(app_id or _NO_TENANT, []).append(str(member))
+        if not by_tenant:
+            return
+
+        pipe = self.redis_obj.redis_client.pipeline(transaction=False)
+        for app_id, members in by_tenant.items():
+            pipe.zrem(self._hot_key(app_id), *members)
+        pipe.execute()
+
+    def _read_buffered(self, members: list[str]) -> list[tuple[str, Any]]:
+        """(log_id, payload) for buffer handles that are still buffered."""
+        client = self.redis_obj.redis_client
+        found = []
+        if self.buffer_mode == "stream":
+            pipe = client.pipeline(transaction=False)
+            for entry_id in members:
+                pipe.xrange(self.stream_key, min=entry_id, max=entry_id, count=1)
+            for entries in pipe.execute():
+                for entry_id, fields in entries or []:
+                    decoded = self._decode_entry(entry_id, fields)
+                    if decoded is not None:
+                        found.append((decoded[1], decoded[2]))
+            return found
+
+        raw_values = client.mget([self._buffer_key(log_id) for log_id in members])
+        for log_id, raw_value in zip(members, raw_values):
+            if raw_value is not None:
+                found.append((log_id, self._decode_value(raw_value)))
+        return found
+
+    def hot_entries(
+        self,
+        app_id: str | None = None,
+        start_ms: int | None = None,
+        end_ms: int | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Buffered, not yet flushed logs as `{log_id: payload}` entries, newest
+        first, for one tenant (or every tenant with buffered logs) and an
+        optional [start_ms, end_ms) window. Costs a ZREVRANGEBYSCORE per
+        tenant plus one MGET (keys) or pipelined XRANGE (stream) instead of
+        a keyspace scan.
+        """
+        client = self.redis_obj.redis_client
+        if app_id is not None:
+            tenants = [str(app_id)]
+        else:
+            tenants = [self._decode_key(t) for t in client.smembers(self._hot_tenants_key)]
+
+        limit = min(limit or self.hot_read_max, self.hot_read_max)
+        high = f"({end_ms}" if end_ms is not None else "+inf"
+        low = start_ms if start_ms is not None else "-inf"
+
+        pipe = client.pipeline(transaction=False)
+        for tenant in tenants:
+            pipe.zrevrangebyscore(self._hot_key(tenant), high, low, start=0, num=limit)
+        members = [self._decode_key(m) for found in (pipe.execute() if tenants else []) for m in found]
+        if not members:
+            return []
+
+        entries = []
+        # a handle whose log was flushed between the two reads is simply not found
+        for log_id, payload in self._read_buffered(members):
+            if isinstance(payload, dict):
+                payload["log_id"] = log_id
+            entries.append({log_id: payload})
+        return entries
+
+    def buffer_logs(self, log_pairs: list[tuple[str, Any | Logs]]):
+        if self.buffer_mode == "stream":
+            return self.stream_add(log_pairs)
+        return self.insert_objects(log_pairs)
+
+    def buffered_count(self) -> int:
+        if self.buffer_mode == "stream":
+            return self.redis_obj.redis_client.xlen(self.stream_key)
+        # keys mode keeps a counter; counting keys would SCAN the whole keyspace
+        raw = self.redis_obj.redis_client.get(self.buffer_count_key)
+        return max(0, int(raw or 0))
+
+    def buffered_bytes(self) -> int:
+        raw = self.redis_obj.redis_client.get(self.buffer_bytes_key)
+        return max(0, int(raw or 0))
+
+    def backlog(self) -> tuple[int, int]:
+        """(buffered log count, buffered payload bytes) in one round trip."""
+        client = self.redis_obj.redis_client
+        if self.buffer_mode == "stream":
+            pipe = client.pipeline(transaction=False)
+            pipe.xlen(self.stream_key)
+            pipe.get(self.buffer_bytes_key)
+            count, raw_bytes = pipe.execute()
+        else:
+            count, raw_bytes = client.mget([self.buffer_count_key, self.buffer_bytes_key])
+        return max(0, int(count or 0)), max(0, int(raw_bytes or 0))
+
+    def oldest_buffered_age(self) -> float | None:
+        """
+        Seconds since the oldest buffered log was written. Stream entry ids are
+        millisecond timestamps, so this is one XRANGE call; the keys mode has no
+        ordering and returns None.
+        """
+        if self.buffer_mode != "stream":
+            return None
+
+        oldest = self.redis_obj.redis_client.xrange(self.stream_key, min="-", max="+", count=1)
+        if not oldest:
+            return None
+
+        oldest_ms = int(self._decode_key(oldest[0][0]).split("-")[0])
+        return max(0.0, time.time() - oldest_ms / 1000)
+
+    def drain_batch(
+        self,
+        consumer: str,
+        count: int,
+        raw: bool = False,
+    ) -> tuple[list[tuple[str, int]], list[dict[str, Any]]]:
+        """
+        Returns (handles, entries) where entries are `{log_id: payload}` dicts
+        ready for the warehouse insert and handles are passed back to
+        `acknowledge()` once that insert is confirmed. With `raw=True` each
+        payload is its JSON text as bytes instead of a decoded dict.
+        """
+        if self.buffer_mode == "stream":
+            stream_entries = self.stream_read_batch(consumer=consumer, count=count, raw=raw)
+            return (
+                [(entry_id, size, app_id_of(payload)) for entry_id, _, payload, size in stream_entries],
+                [{log_id: payload} for _, log_id, payload, _ in stream_entries],
+            )
+
+        log_ids = self._scan_log_keys(limit=count)
+        entries: list[dict[str, Any]] = []
+        handles: list[tuple[str, int, str | None]] = []
+        if log_ids:
+            raw_values = self.redis_obj.redis_client.mget([self._buffer_key(log_id) for log_id in log_ids])
+            for log_id, raw_value in zip(log_ids, raw_values):
+                if raw_value is not None:
+                    payload = payload_to_json_bytes(raw_value) if raw else self._decode_value(raw_value)
+                    handles.append((log_id, len(raw_value), app_id_of(payload)))
+                    entries.append({log_id: payload})
+        return handles, entries
+
+    def acknowledge(self, handles: list[tuple]) -> int:
+        """
+        Remove flushed entries from the buffer and the backlog counters.
+        Raises when the DEL/XACK fails, with the counters untouched, so the
+        caller never treats a batch that's still buffered as cleared.
+        """
+        if not handles:
+            return 0
+
+        ids = [handle[0] for handle in handles]
+        if self.buffer_mode == "stream":
+            removed = self.stream_ack(ids)
+        else:
+            # only delete the keys that were actually flushed, never the whole keyspace
+            pipe = self.redis_obj.redis_client.pipeline(transaction=False)
+            for log_id in ids:
+                pipe.delete(self._buffer_key(log_id))
+            removed = [bool(resp) for resp in pipe.execute()]
+
+        # an entry another drainer already removed was already taken off the counters
+        cleared = [handle for handle, done in zip(handles, removed) if done]
+        if cleared:
+            pipe = self.redis_obj.redis_client.pipeline(transaction=False)
+            pipe.decrby(self.buffer_bytes_key, sum(handle[1] for handle in cleared))
+            pipe.decrby(self.buffer_count_key, len(cleared))
+            pipe.execute()
+
+        if self.hot_index:
+            try:
+                self._remove_hot([(handle[2], handle[0]) for handle in handles if len(handle) > 2])
+            except Exception as e:
+                # the buffer entries are gone, so stale handles read as nothing and expire with the index
+                logging.warning(f"Hot index cleanup failed | count={len(handles)} | error={e}")
+        return len(cleared)
+
 
 if __name__ == "__main__":
     import uuid
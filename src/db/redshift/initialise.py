@@ -15,6 +15,9 @@ class Initialise:
             self.database = os.getenv("REDSHIFT_DATABASE")
             self.username = os.getenv("REDSHIFT_USERNAME")
             self.password = os.getenv("REDSHIFT_PASSWORD")
+            # "postgres" lets the same code run against a local Postgres stand-in
+            self.dialect = os.getenv("REDSHIFT_DIALECT", "redshift").lower()
+            self.sslmode = os.getenv("REDSHIFT_SSLMODE", "require")
 
             if not all([self.host, self.database, self.username, self.password]):
                 raise ValueError("Missing required environment variables for Redshift connection.")
@@ -26,7 +29,7 @@ class Initialise:
                 user=self.username,
                 password=self.password,
                 connect_timeout=5,
-                sslmode="require",
+                sslmode=self.sslmode,
             )
             self.connection.autocommit = True
 
@@ -53,6 +56,11 @@ class Initialise:
 
     def create_logs_table(self):
         try:
+            if self.dialect == "postgres":
+                self._execute(self._postgres_logs_table_query())
+                logging.info("Logs table created or already exists (postgres stand-in).")
+                return
+
             create_table_query = """
                 CREATE TABLE IF NOT EXISTS logs
                 (
@@ -86,6 +94,27 @@ class Initialise:
             logging.error(f"Unexpected error while creating logs table: {e}")
 
 
+    @staticmethod
+    def _postgres_logs_table_query() -> str:
+        # same columns as the Redshift table, JSONB standing in for SUPER
+        return """
+            CREATE TABLE IF NOT EXISTS logs
+            (
+                log_id      VARCHAR(36)         DEFAULT REPLACE(CAST(NOW() AS VARCHAR), ' ', '-'),
+
+                timestamp   TIMESTAMP           DEFAULT NOW(),
+                event_type  VARCHAR(255),
+                event_name  VARCHAR(255),
+                event_category VARCHAR(255),
+
+                server_info  JSONB,
+                request_info JSONB,
+                message_info JSONB,
+                source_info  JSONB
+            );
+        """
+
+
     def delete_table(self, table_name: str):
         try:
             if not table_name:
@@ -1,5 +1,8 @@
+from datetime import datetime, timezone
 from typing import Any
 import json
+import os
+import threading
 import uuid
 import psycopg2
 from psycopg2 import OperationalError, ProgrammingError
@@ -14,6 +17,24 @@ class RedshiftServices:
     def __init__(self):
         self.init = Initialise()
 
+        # rows per multi-row INSERT statement in the bulk path
+        self.bulk_batch_size = int(os.getenv("REDSHIFT_BULK_BATCH_SIZE", "1000"))
+        self._columns_cache: list[tuple[str, str]] | None = None
+        # the bulk path flips autocommit off on the shared connection
+        self._lock = threading.Lock()
+
+    def ping(self) -> bool:
+        try:
+            with self.init.connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                return cursor.fetchone() is not None
+        except Exception as e:
+            logging.error(f"Redshift health check failed: {e}")
+            return False
+
+    def close(self) -> None:
+        self.init.close()
+
     def run_query(self, query: str, params=None, fetch: bool = True):
         try:
             with self.init.connection.cursor() as cursor:
@@ -136,6 +157,152 @@ class RedshiftServices:
             return None
 
 
+    # ====================== BULK LOAD ======================
+
+    JSON_COLUMNS = {"server_info", "request_info", "message_info", "source_info"}
+
+    def _table_columns(self) -> list[tuple[str, str]]:
+        """(column, SQL type) pairs of `logs`, read once from information_schema."""
+        if not self._columns_cache:
+            rows = self.run_query(
+                """
+                SELECT column_name, data_type, character_maximum_length
+                FROM information_schema.columns
+                WHERE table_name = 'logs'
+                ORDER BY ordinal_position
+                """
+            ) or []
+            columns = []
+            for name, data_type, max_length in rows:
+                if data_type == "character varying" and max_length:
+                    data_type = f"VARCHAR({max_length})"
+                columns.append((name, data_type))
+            self._columns_cache = columns
+        return self._columns_cache
+
+    @staticmethod
+    def _to_timestamp_text(value: Any) -> Any:
+        if value is None:
+            return None
+        if not isinstance(value, datetime):
+            try:
+                value = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+            except ValueError:
+                return str(value)
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat(sep=" ")
+
+    def _merge_expression(self, column: str, data_type: str) -> str:
+        if column in self.JSON_COLUMNS:
+            if self.init.dialect == "postgres":
+                return f"CAST(s.{column} AS JSONB)"
+            return f"JSON_PARSE(s.{column})"
+        return f"CAST(s.{column} AS {data_type})"
+
+    def bulk_insert_logs(self, log_entry: dict[str, Any] | list[dict[str, Any]], batch_size: int | None = None):
+        """
+        Load a batch through a temp staging table inside one transaction.
+
+        Rows go into the staging table with multi-row INSERTs of `batch_size`
+        rows (Redshift only supports COPY from S3, not FROM STDIN), then one
+        set-based INSERT ... SELECT merges them into `logs`, parsing the SUPER
+        columns once and skipping log_ids that are already present so a retried
+        batch does not duplicate rows.
+        """
+        entries = log_entry if isinstance(log_entry, list) else [log_entry]
+        if not entries:
+            return None
+
+        batch_size = batch_size or self.bulk_batch_size
+        staging = "logs_staging"
+
+        with self._lock:
+            connection = self.init.connection
+            try:
+                row_dicts: list[dict[str, Any]] = []
+                for item in entries:
+                    if not isinstance(item, dict) or len(item) != 1:
+                        raise ValueError(
+                            "Each entry must be a dict with exactly one key-value pair: {redis_key: payload}"
+                        )
+                    _, payload = next(iter(item.items()))
+                    if isinstance(payload, (bytes, bytearray)):
+                        payload = payload.decode()
+                    if isinstance(payload, str):
+                        try:
+                            payload = json.loads(payload)
+                        except json.JSONDecodeError:
+                            payload = {"message_info": {"message": payload}}
+                    if isinstance(payload, Logs):
+                        payload = payload.model_dump(exclude_none=True)
+                    if not isinstance(payload, dict):
+                        payload = {"message_info": {"message": str(payload)}}
+
+                    row = self._normalize_row({k: v for k, v in payload.items() if v is not None})
+                    row.setdefault("log_id", str(uuid.uuid4()))
+                    row_dicts.append(row)
+
+                table_columns = self._table_columns()
+                if not table_columns:
+                    raise ValueError("Could not read the columns of table 'logs'.")
+
+                # the column set is fixed by the table, not by the keys in this batch
+                columns = [name for name, _ in table_columns]
+                text_type = "TEXT" if self.init.dialect == "postgres" else "VARCHAR(65535)"
+                staging_ddl = ", ".join(f"{name} {text_type}" for name in columns)
+
+                values = []
+                for row in row_dicts:
+                    values.append(tuple(
+                        self._to_timestamp_text(row.get(name)) if data_type.startswith("timestamp")
+                        else (None if row.get(name) is None else str(row.get(name)))
+                        for name, data_type in table_columns
+                    ))
+
+                merge_select = ", ".join(self._merge_expression(name, data_type) for name, data_type in table_columns)
+                column_list = ", ".join(columns)
+
+                connection.autocommit = False
+                with connection.cursor() as cursor:
+                    cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+                    cursor.execute(f"CREATE TEMP TABLE {staging} ({staging_ddl})")
+                    execute_values(
+                        cursor,
+                        f"INSERT INTO {staging} ({column_list}) VALUES %s",
+                        values,
+                        page_size=batch_size,
+                    )
+                    cursor.execute(
+                        f"""
+                        INSERT INTO logs ({column_list})
+                        SELECT {merge_select}
+                        FROM {staging} s
+                        WHERE NOT EXISTS (SELECT 1 FROM logs l WHERE l.log_id = s.log_id)
+                        """
+                    )
+                    merged = cursor.rowcount
+                    cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+                connection.commit()
+
+                logging.info(f"Bulk load completed | staged={len(values)} | merged={merged} | batch_size={batch_size}")
+                return len(values)
+
+            except Exception as e:
+                try:
+                    connection.rollback()
+                except Exception:
+                    pass
+                logging.error(f"Error bulk loading logs into Redshift. Error: {str(e)}")
+                return None
+
+            finally:
+                try:
+                    connection.autocommit = True
+                except Exception:
+                    pass
+
+
     def delete_logs(self, log_id: list[str] | str | None = None):
         try:
             if log_id is None:
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable
+
+from src.db.redis.codec import PayloadCodec, decode_payload, orjson, zstandard
+from src.utils.utils import logging
+
+
+class QueryResultCache:
+    """
+    Compressed, TTL-bound cache of fetch results in Redis, keyed on the
+    tenant, the kind of query and its normalized parameters.
+
+    Every tenant has a generation counter that the ingestion service bumps
+    whenever rows for that tenant are committed to ClickHouse. An entry
+    stores the generation it was computed under and only counts as a hit
+    while that is still current, so new logs show up on the next request
+    instead of after the TTL. The generation is read before the query runs,
+    so a result that races a flush is stored under the old generation and
+    never served.
+
+    Lookups cost one pipelined round trip. Hit/miss counters are kept in
+    process and pushed to a Redis hash every `metrics_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        redis_client: Callable[[], Any],
+        async_redis_client: Callable[[], Any] | None = None,
+        ttl: float | None = None,
+        max_entry_bytes: int | None = None,
+        key_prefix: str | None = None,
+    ):
+        self.redis_client = redis_client
+        self.async_redis_client = async_redis_client
+        self.ttl = ttl if ttl is not None else float(os.getenv("QUERY_CACHE_TTL_SECONDS", "30"))
+        self.max_entry_bytes = max_entry_bytes or int(os.getenv("QUERY_CACHE_MAX_ENTRY_BYTES", str(1024 * 1024)))
+        self.key_prefix = key_prefix or os.getenv("QUERY_CACHE_PREFIX", "querycache")
+        self.metrics_interval = float(os.getenv("QUERY_CACHE_METRICS_INTERVAL_SECONDS", "10"))
+
+        self.codec = PayloadCodec(
+            serializer="orjson" if orjson is not None else "json",
+            compression=os.getenv("QUERY_CACHE_COMPRESSION", "zstd" if zstandard is not None else "none").lower(),
+        )
+
+        self._lock = threading.Lock()
+        self._counters = {"hit": 0, "miss": 0, "bypass": 0, "store": 0, "too_large": 0, "error": 0}
+        self._unreported = dict.fromkeys(self._counters, 0)
+        self._last_report = time.monotonic()
+
+    # ====================== KEYS ======================
+
+    def _generation_key(self, app_id: str) -> str:
+        return f"{self.key_prefix}:gen:{app_id}"
+
+    @property
+    def _metrics_key(self) -> str:
+        return f"{self.key_prefix}:metrics"
+
+    def key(self, app_id: str, kind: str, params: Any) -> str:
+        """Entry key; `params` is a pydantic model or a dict, unset fields don't change the key."""
+        if hasattr(params, "model_dump"):
+            params = params.model_dump(mode="json", exclude_none=True)
+        normalized = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+        digest = hashlib.sha256(normalized.encode()).hexdigest()
+        return f"{self.key_prefix}:{app_id}:{kind}:{digest}"
+
+    # ====================== METRICS ======================
+
+    def record(self, event: str) -> None:
+        with self._lock:
+            self._counters[event] += 1
+            self._unreported[event] += 1
+
+    def _queue_metrics(self, pipe) -> None:
+        """Add the counters gathered since the last report to `pipe`, at most every `metrics_interval`."""
+        with self._lock:
+            if time.monotonic() - self._last_report < self.metrics_interval:
+                return
+            pending = {event: count for event, count in self._unreported.items() if count}
+            self._unreported = dict.fromkeys(self._counters, 0)
+            self._last_report = time.monotonic()
+        for event, count in pending.items():
+            pipe.hincrby(self._metrics_key, event, count)
+
+    def metrics(self) -> dict[str, Any]:
+        """Counters for this process plus the totals reported by every instance."""
+        with self._lock:
+            local = dict(self._counters)
+        lookups = local["hit"] + local["miss"]
+        result: dict[str, Any] = {"process": local, "hit_ratio": round(local["hit"] / lookups, 4) if lookups else None}
+        try:
+            raw = self.redis_client().hgetall(self._metrics_key)
+            result["all_instances"] = {
+                (k.decode() if isinstance(k, bytes) else k): int(v) for k, v in raw.items()
+            }
+        except Exception as e:
+            logging.warning(f"Query cache metrics read failed | error={e}")
+        return result
+
+    # ====================== READ / WRITE ======================
+
+    def _encode(self, generation: int, value: Any) -> bytes | None:
+        blob = f"{generation}:".encode() + self.codec.encode(value)
+        if len(blob) > self.max_entry_bytes:
+            self.record("too_large")
+            return None
+        return blob
+
+    def _resolve(self, raw_generation: Any, raw_entry: Any, bypass: bool) -> tuple[Any | None, int]:
+        generation = int(raw_generation or 0)
+        if bypass:
+            self.record("bypass")
+            return None, generation
+        if raw_entry is not None:
+            stored_generation, _, body = bytes(raw_entry).partition(b":")
+            if int(stored_generation) == generation:
+                self.record("hit")
+                return decode_payload(body), generation
+        self.record("miss")
+        return None, generation
+
+    def lookup(self, app_id: str, key: str, bypass: bool = False) -> tuple[Any | None, int | None]:
+        """
+        (cached value or None, current generation). The generation is None
+        when Redis is unavailable, and the result must not be stored then.
+        """
+        try:
+            pipe = self.redis_client().pipeline(transaction=False)
+            pipe.get(self._generation_key(app_id))
+            pipe.get(key)
+            self._queue_metrics(pipe)
+            raw_generation, raw_entry = pipe.execute()[:2]
+            return self._resolve(raw_generation, raw_entry, bypass)
+        except Exception as e:
+            self.record("error")
+            logging.warning(f"Query cache lookup failed | error={e}")
+            return None, None
+
+    def store(self, key: str, generation: int | None, value: Any) -> None:
+        if generation is None:
+            return
+        blob = self._encode(generation, value)
+        if blob is None:
+            return
+        try:
+            self.redis_client().set(key, blob, px=int(self.ttl * 1000))
+            self.record("store")
+        except Exception as e:
+            self.record("error")
+            logging.warning(f"Query cache store failed | error={e}")
+
+    async def lookup_async(self, app_id: str, key: str, bypass: bool = False) -> tuple[Any | None, int | None]:
+        if self.async_redis_client is None:
+            return self.lookup(app_id, key, bypass)
+        try:
+            pipe = self.async_redis_client().pipeline(transaction=False)
+            pipe.get(self._generation_key(app_id))
+            pipe.get(key)
+            self._queue_metrics(pipe)
+            raw_generation, raw_entry = (await pipe.execute())[:2]
+            return self._resolve(raw_generation, raw_entry, bypass)
+        except Exception as e:
+            self.record("error")
+            logging.warning(f"Query cache lookup failed | error={e}")
+            return None, None
+
+    async def store_async(self, key: str, generation: int | None, value: Any) -> None:
+        if self.async_redis_client is None:
+            return self.store(key, generation, value)
+        if generation is None:
+            return
+        blob = self._encode(generation, value)
+        if blob is None:
+            return
+        try:
+            await self.async_redis_client().set(key, blob, px=int(self.ttl * 1000))
+            self.record("store")
+        except Exception as e:
+            self.record("error")
+            logging.warning(f"Query cache store failed | error={e}")
+
+    # ====================== INVALIDATION ======================
+
+    def bump(self, app_ids) -> None:
+        """Move each tenant to a new generation; called after their rows are committed."""
+        app_ids = [str(app_id) for app_id in app_ids if app_id]
+        if not app_ids:
+            return
+        try:
+            pipe = self.redis_client().pipeline(transaction=False)
+            for app_id in app_ids:
+                pipe.incr(self._generation_key(app_id))
+            pipe.execute()
+        except Exception as e:
+            # entries still expire after `ttl`
+            logging.warning(f"Query cache invalidation failed | tenants={len(app_ids)} | error={e}")
@@ -1,17 +1,31 @@
-import pandas as pd
+from __future__ import annotations
+
 from typing import Any, Dict, List
 
+try:
+    import pandas as pd
+except ImportError:  # optional: only the DataFrame helpers need it; shaped_logs() does not
+    pd = None
+
 from src.db.clickhouse.services import ClickHouseServices
 from src.db.redis.services import RedisServices
+from src.fetch.shaping import shape_logs
+from src.utils.utils import logging
 
 
 class FetchLogs:
-    def __init__(self, start_duration: str = None, end_duration: str = None):
+    def __init__(
+        self,
+        start_duration: str = None,
+        end_duration: str = None,
+        redis_services: RedisServices | None = None,
+        clickhouse_services: ClickHouseServices | None = None,
+    ):
         self.start_duration = start_duration
         self.end_duration = end_duration
 
-        self.redis_services = RedisServices()
-        self.clickhouse_services = ClickHouseServices()
+        self.redis_services = redis_services or RedisServices()
+        self.clickhouse_services = clickhouse_services or ClickHouseServices()
 
     def _flatten_column(self, data: Dict[str, Any]) -> Dict[str, Any]:
         flat = {}
@@ -45,20 +59,28 @@ class FetchLogs:
         return normalized
 
     def _build_dataframe(self, records: List[Dict]) -> pd.DataFrame:
+        if pd is None:
+            raise ImportError("The FetchLogs DataFrame helpers need pandas, which is not a service dependency")
         df = pd.DataFrame(records)
         df = self._flatten_columns(df, "source_info")
         df = self._flatten_columns(df, "message_info")
         return df
 
+    def _redis_logs(self) -> List[Dict]:
+        # the hot index reads per tenant instead of walking the whole keyspace
+        if self.redis_services.hot_index:
+            return self.redis_services.hot_entries()
+        return self.redis_services.get_object() or []
+
     def fetch_format_redis(self) -> pd.DataFrame:
-        raw_logs = self.redis_services.get_object()
+        raw_logs = self._redis_logs()
         normalized = self._normalize_redis_record(raw_logs)
-        print("Fetch redis raw logs:", len(raw_logs))
+        logging.info(f"Fetched Redis logs | count={len(raw_logs)}")
         return self._build_dataframe(normalized)
 
     def fetch_format_clickhouse(self) -> pd.DataFrame:
         raw_logs = self.clickhouse_services.fetch_logs()
-        print("Fetch clickhouse raw logs:", len(raw_logs))
+        logging.info(f"Fetched ClickHouse logs | count={len(raw_logs)}")
         return self._build_dataframe(raw_logs)
 
     def merge_format_logs(self) -> pd.DataFrame:
@@ -73,6 +95,13 @@ class FetchLogs:
 
         return merged_df
 
+    def shaped_logs(self) -> List[Dict[str, Any]]:
+        """merge_format_logs() as JSON-ready records, built without pandas."""
+        redis_records = self._normalize_redis_record(self._redis_logs())
+        clickhouse_records = self.clickhouse_services.fetch_logs() or []
+        logging.info(f"Fetched logs | redis={len(redis_records)} | clickhouse={len(clickhouse_records)}")
+        return shape_logs(redis_records, clickhouse_records)
+
 
 if __name__ == "__main__":
     fetch_logs = FetchLogs()
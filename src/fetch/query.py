@@ -0,0 +1,342 @@
+import base64
+import heapq
+import json
+import os
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from src.db.clickhouse.services import ClickHouseServices
+from src.db.redis.services import RedisServices
+from src.models.query import EXPORT_MAX_ROWS, LogExportQuery, LogFilters, LogQuery, QUERY_MAX_PAGE_SIZE
+from src.utils.utils import logging
+
+
+# filter -> (top-level column, JSON parent column, path inside it, ClickHouse type)
+_FILTERS: dict[str, tuple[str, str | None, str | None, str]] = {
+    "event_type": ("event_type", None, None, "String"),
+    "event_name": ("event_name", None, None, "String"),
+    "event_category": ("event_category", None, None, "String"),
+    "severity_level": ("severity_level", "request_info", "severity_level", "String"),
+    "status_code": ("status_code", "request_info", "status_code", "Int32"),
+    "session_id": ("session_id", "request_info", "session_id", "String"),
+}
+# columns that are read but aren't equality filters
+_COLUMNS = {**_FILTERS, "message": ("message", "message_info", "message", "String")}
+
+
+# export format -> (ClickHouse output format, media type, file extension)
+EXPORT_FORMATS: dict[str, tuple[str, str, str]] = {
+    "ndjson": ("JSONEachRow", "application/x-ndjson", "ndjson"),
+    "arrow": ("ArrowStream", "application/vnd.apache.arrow.stream", "arrow"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _to_micros(value: datetime) -> int:
+    # naive datetimes are taken as UTC, same as the ClickHouse server default
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1_000_000)
+
+
+def _tick_us(ch_type: str) -> int:
+    """Microseconds per tick of a DateTime / DateTime64(p) column."""
+    match = re.match(r"DateTime64\((\d+)", ClickHouseServices._base_type(ch_type)[0])
+    return 10 ** (6 - min(int(match.group(1)), 6)) if match else 1_000_000
+
+
+def _order_key(cursor_us: int, log_id: Any) -> tuple[int, uuid.UUID]:
+    # ClickHouse orders pages by (timestamp, toString(log_id)); canonical
+    # lowercase hex sorts like the UUID's integer value, which is how
+    # uuid.UUID compares, so both sides page in exactly the same order
+    return cursor_us, uuid.UUID(str(log_id))
+
+
+def encode_cursor(timestamp_us: int, log_id: str) -> str:
+    raw = json.dumps({"t": timestamp_us, "id": str(log_id)}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, str]:
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return int(decoded["t"]), str(uuid.UUID(str(decoded["id"])))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class LogQueryService:
+    """
+    Tenant-scoped log queries pushed down to ClickHouse.
+
+    Every filter is a bound `{name:Type}` parameter, never interpolated SQL.
+    Filters use a top-level column when the table has one (e.g. a
+    MATERIALIZED severity_level), otherwise the path inside the JSON column.
+    Pages are ordered by (timestamp, log_id as text) descending and continued with
+    an opaque keyset cursor, so the cost of a page does not grow with its
+    depth.
+
+    Given `redis_services`, pages also include logs still waiting in the
+    Redis buffer, read from its per-tenant hot index.
+    """
+
+    def __init__(
+        self,
+        clickhouse_services: ClickHouseServices | None = None,
+        table: str = "logs",
+        redis_services: RedisServices | None = None,
+    ):
+        self.clickhouse_services = clickhouse_services or ClickHouseServices()
+        self.table = table
+        self.redis_services = redis_services
+        self.max_execution_time = int(os.getenv("QUERY_MAX_EXECUTION_SECONDS", "10"))
+        self.export_max_execution_time = int(os.getenv("EXPORT_MAX_EXECUTION_SECONDS", "300"))
+        self.export_compression = os.getenv("EXPORT_COMPRESSION", "zstd")
+
+    def _filter_expression(self, name: str, columns: dict[str, str]) -> str:
+        column, parent, path, ch_type = _COLUMNS[name]
+        if column in columns:
+            return column
+
+        parent_type = ClickHouseServices._base_type(columns.get(parent, ""))[0] if parent else ""
+        if parent_type.startswith(("JSON", "Object")):
+            # dynamic JSON subcolumn; compare through a string so any stored type matches
+            if ch_type == "String":
+                return f"toString({parent}.{path})"
+            return f"to{ch_type}OrNull(toString({parent}.{path}))"
+
+        if parent_type.startswith("String"):
+            if ch_type == "String":
+                return f"JSONExtractString({parent}, '{path}')"
+            return f"JSONExtract({parent}, '{path}', 'Nullable({ch_type})')"
+
+        raise ValueError(f"Filter '{name}' is not supported by table {self.table}")
+
+    def _where(self, app_id: str, params: LogFilters) -> tuple[list[str], dict[str, Any]]:
+        columns = {name: ch_type for name, ch_type, _ in self.clickhouse_services.describe_table(self.table)}
+
+        conditions = ["app_id = {app_id:UUID}"]
+        parameters: dict[str, Any] = {"app_id": app_id}
+
+        if params.start is not None:
+            conditions.append("timestamp >= fromUnixTimestamp64Micro({start_us:Int64})")
+            parameters["start_us"] = _to_micros(params.start)
+        if params.end is not None:
+            conditions.append("timestamp < fromUnixTimestamp64Micro({end_us:Int64})")
+            parameters["end_us"] = _to_micros(params.end)
+
+        for name, (_, _, _, ch_type) in _FILTERS.items():
+            value = getattr(params, name)
+            if value is None:
+                continue
+            conditions.append(f"{self._filter_expression(name, columns)} = {{{name}:{ch_type}}}")
+            parameters[name] = value
+
+        if getattr(params, "cursor", None):
+            cursor_us, cursor_id = decode_cursor(params.cursor)
+            # the plain bound lets the primary key prune parts, the tuple breaks timestamp ties
+            conditions.append("timestamp <= fromUnixTimestamp64Micro({cursor_us:Int64})")
+            conditions.append("(toUnixTimestamp64Micro(toDateTime64(timestamp, 6)), toString(log_id)) < ({cursor_us:Int64}, {cursor_id:String})")
+            parameters["cursor_us"] = cursor_us
+            parameters["cursor_id"] = cursor_id
+
+        return conditions, parameters
+
+    def build_query(self, app_id: str, params: LogQuery) -> tuple[str, dict[str, Any]]:
+        select_columns = [name for name, _ in self.clickhouse_services.table_schema(self.table)]
+        conditions, parameters = self._where(app_id, params)
+        parameters["limit"] = min(params.limit, QUERY_MAX_PAGE_SIZE) + 1
+
+        query = f"""
+            SELECT {", ".join(select_columns)},
+                   toUnixTimestamp64Micro(toDateTime64(timestamp, 6)) AS _cursor_us
+            FROM {self.table}
+            WHERE {" AND ".join(conditions)}
+            ORDER BY timestamp DESC, toString(log_id) DESC
+            LIMIT {{limit:UInt32}}
+        """
+        return query, parameters
+
+    # ====================== UNFLUSHED LOGS ======================
+
+    @staticmethod
+    def _payload_value(payload: dict[str, Any], name: str) -> Any:
+        column, parent, path, _ = _COLUMNS[name]
+        if column in payload:
+            return payload[column]
+        section = payload.get(parent) if parent else None
+        return section.get(path) if isinstance(section, dict) else None
+
+    def _hot_rows(self, app_id: str, params: LogQuery, limit: int) -> list[dict[str, Any]]:
+        """
+        Buffered logs that match `params`, shaped like ClickHouse rows with
+        their `_cursor_us`. Timestamps are cut to the precision of the
+        timestamp column, as ClickHouse stores them, so both sides page with
+        the same keys.
+        """
+        if self.redis_services is None or not self.redis_services.hot_index:
+            return []
+
+        columns = {name: ch_type for name, ch_type, _ in self.clickhouse_services.describe_table(self.table)}
+        tick_us = _tick_us(columns.get("timestamp", "DateTime"))
+
+        filters = {name: getattr(params, name) for name in _FILTERS if getattr(params, name) is not None}
+        start_us = _to_micros(params.start) if params.start is not None else None
+        end_us = _to_micros(params.end) if params.end is not None else None
+        cursor = _order_key(*decode_cursor(params.cursor)) if params.cursor else None
+        upper_bounds = [bound for bound in (end_us, cursor[0] if cursor else None) if bound is not None]
+        upper_us = min(upper_bounds) if upper_bounds else None
+
+        entries = self.redis_services.hot_entries(
+            app_id,
+            # a second of slack either way; the exact bounds are applied below
+            start_ms=start_us // 1000 - 1000 if start_us is not None else None,
+            end_ms=upper_us // 1000 + 1000 if upper_us is not None else None,
+            # filtered pages can't stop at `limit` buffered logs
+            limit=None if filters else limit,
+        )
+
+        rows = []
+        for entry in entries:
+            for log_id, payload in entry.items():
+                if not isinstance(payload, dict):
+                    continue
+                if any(str(self._payload_value(payload, name)) != str(value) for name, value in filters.items()):
+                    continue
+
+                timestamp = payload.get("timestamp")
+                if isinstance(timestamp, str):
+                    timestamp = datetime.fromisoformat(timestamp)
+                if not isinstance(timestamp, datetime):
+                    continue
+                timestamp -= timedelta(microseconds=_to_micros(timestamp) % tick_us)
+                cursor_us = _to_micros(timestamp)
+                try:
+                    key = _order_key(cursor_us, log_id)
+                except ValueError:
+                    continue
+
+                if start_us is not None and cursor_us < start_us:
+                    continue
+                if end_us is not None and cursor_us >= end_us:
+                    continue
+                if cursor and key >= cursor:
+                    continue
+                rows.append({**payload, "log_id": log_id, "timestamp": timestamp, "_cursor_us": cursor_us})
+        rows.sort(key=lambda row: _order_key(row["_cursor_us"], row["log_id"]), reverse=True)
+        return rows
+
+    def query(self, app_id: str, params: LogQuery) -> dict[str, Any]:
+        query, parameters = self.build_query(app_id, params)
+        page_size = parameters["limit"] - 1
+
+        # the buffer is read first: a log leaves it only after its ClickHouse
+        # insert has committed, so it shows up in at least one of the two reads
+        hot_rows = self._hot_rows(app_id, params, parameters["limit"])
+
+        result = self.clickhouse_services.init.client.query(
+            query,
+            parameters=parameters,
+            settings={"max_execution_time": self.max_execution_time},
+        )
+        rows = list(result.named_results())
+
+        if hot_rows:
+            flushed = {str(row["log_id"]) for row in rows}
+            # both inputs are sorted by the same (timestamp, log_id) key ClickHouse pages on
+            rows = list(heapq.merge(
+                rows,
+                (row for row in hot_rows if str(row["log_id"]) not in flushed),
+                key=lambda row: _order_key(row["_cursor_us"], row["log_id"]),
+                reverse=True,
+            ))[:parameters["limit"]]
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            next_cursor = encode_cursor(last["_cursor_us"], last["log_id"])
+
+        for row in rows:
+            row.pop("_cursor_us", None)
+
+        logging.info(
+            f"Log query served | app_id={app_id} | rows={len(rows)} | buffered={len(hot_rows)} | has_more={next_cursor is not None}"
+        )
+        return {"count": len(rows), "logs": rows, "next_cursor": next_cursor}
+
+    # ====================== EXPORT ======================
+
+    def _export_columns(self, params: LogExportQuery, export_format: str) -> list[str]:
+        described = {name: ch_type for name, ch_type, _ in self.clickhouse_services.describe_table(self.table)}
+        if params.columns:
+            names = [name.strip() for name in params.columns.split(",") if name.strip()]
+            unknown = [name for name in names if name not in described]
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+        else:
+            names = [name for name, _ in self.clickhouse_services.table_schema(self.table)]
+
+        if export_format == "ndjson":
+            return names
+
+        # Arrow/Parquet have no UUID or JSON logical type; ship them as strings
+        expressions = []
+        for name in names:
+            base_type = ClickHouseServices._base_type(described[name])[0]
+            if base_type == "UUID":
+                expressions.append(f"toString({name}) AS {name}")
+            elif base_type.startswith(("JSON", "Object", "Map")):
+                expressions.append(f"toJSONString({name}) AS {name}")
+            else:
+                expressions.append(name)
+        return expressions
+
+    def _export_settings(self, export_format: str) -> dict[str, Any]:
+        settings: dict[str, Any] = {
+            "max_execution_time": self.export_max_execution_time,
+            "cancel_http_readonly_queries_on_client_close": 1,
+        }
+        if export_format == "ndjson":
+            settings["date_time_output_format"] = "iso"
+        elif export_format == "arrow":
+            settings["output_format_arrow_compression_method"] = self.export_compression
+            settings["output_format_arrow_string_as_string"] = 1
+        elif export_format == "parquet":
+            settings["output_format_parquet_compression_method"] = self.export_compression
+            settings["output_format_parquet_string_as_string"] = 1
+        return settings
+
+    def build_export_query(self, app_id: str, params: LogExportQuery, export_format: str = "ndjson") -> tuple[str, dict[str, Any]]:
+        select_columns = self._export_columns(params, export_format)
+        conditions, parameters = self._where(app_id, params)
+        parameters["limit"] = min(params.limit or EXPORT_MAX_ROWS, EXPORT_MAX_ROWS)
+
+        query = f"""
+            SELECT {", ".join(select_columns)}
+            FROM {self.table}
+            WHERE {" AND ".join(conditions)}
+            ORDER BY timestamp DESC, log_id DESC
+            LIMIT {{limit:UInt64}}
+        """
+        return query, parameters
+
+    def export_stream(self, app_id: str, params: LogExportQuery, export_format: str = "ndjson"):
+        """
+        Raw HTTP body of the export query, already encoded by ClickHouse in
+        one of EXPORT_FORMATS and read incrementally by the caller. Closing
+        it drops the connection, which cancels the query.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format '{export_format}'")
+
+        query, parameters = self.build_export_query(app_id, params, export_format)
+        logging.info(f"Log export started | app_id={app_id} | format={export_format}")
+        return self.clickhouse_services.init.client.raw_stream(
+            query,
+            parameters=parameters,
+            settings=self._export_settings(export_format),
+            fmt=EXPORT_FORMATS[export_format][0],
+        )
@@ -0,0 +1,110 @@
+import os
+import re
+from typing import Any
+
+from src.db.clickhouse.services import ClickHouseServices
+from src.fetch.query import LogQueryService
+from src.models.query import LogSearchQuery
+from src.utils.utils import logging
+
+
+# ClickHouse splits tokens on ASCII non-alphanumerics; bytes >= 0x80 are token characters
+_TOKEN = re.compile(r"[A-Za-z0-9\u0080-\U0010FFFF]+")
+
+
+def _ascii_lower(text: str) -> str:
+    # lower() in ClickHouse only folds ASCII, so fold the same way here
+    return text.translate(str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"))
+
+
+def _like_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class LogSearchService(LogQueryService):
+    """
+    Message search on top of the /logs/query filters and pagination.
+
+    Conditions are written against lower(message) so ClickHouse can skip
+    granules with the tokenbf (hasToken) and ngrambf (LIKE) indexes from
+    migration 4; on a table without the column they still work, just by
+    scanning message_info.
+    """
+
+    def __init__(self, clickhouse_services: ClickHouseServices | None = None, table: str = "logs"):
+        super().__init__(clickhouse_services, table)
+        self.count_cap = int(os.getenv("SEARCH_COUNT_CAP", "10000"))
+
+    def _search_conditions(self, params: LogSearchQuery) -> tuple[list[str], dict[str, Any]]:
+        columns = {name: ch_type for name, ch_type, _ in self.clickhouse_services.describe_table(self.table)}
+        text = f"lower({self._filter_expression('message', columns)})"
+        query = _ascii_lower(params.q)
+        tokens = list(_TOKEN.finditer(query))
+
+        conditions: list[str] = []
+        parameters: dict[str, Any] = {}
+
+        def has_token(index: int, token: str) -> None:
+            conditions.append(f"hasToken({text}, {{search_token_{index}:String}})")
+            parameters[f"search_token_{index}"] = token
+
+        if params.mode == "tokens" and tokens:
+            for i, token in enumerate(tokens):
+                has_token(i, token.group())
+
+        elif params.mode == "prefix" and tokens:
+            *whole, last = tokens
+            for i, token in enumerate(whole):
+                has_token(i, token.group())
+            # LIKE lets the ngram index prune, the regex pins the match to a word start
+            conditions.append(f"{text} LIKE {{search_like:String}}")
+            conditions.append(f"match({text}, {{search_prefix:String}})")
+            parameters["search_like"] = f"%{_like_escape(last.group())}%"
+            parameters["search_prefix"] = r"(?:^|[^\p{L}\p{N}])" + re.escape(last.group())
+
+        else:
+            # phrase: only tokens bounded on both sides inside the phrase are whole words
+            for i, token in enumerate(tokens):
+                if token.start() > 0 and token.end() < len(query):
+                    has_token(i, token.group())
+            conditions.append(f"{text} LIKE {{search_like:String}}")
+            parameters["search_like"] = f"%{_like_escape(query)}%"
+
+        return conditions, parameters
+
+    def _where(self, app_id: str, params) -> tuple[list[str], dict[str, Any]]:
+        conditions, parameters = super()._where(app_id, params)
+        if isinstance(params, LogSearchQuery):
+            search_conditions, search_parameters = self._search_conditions(params)
+            conditions.extend(search_conditions)
+            parameters.update(search_parameters)
+        return conditions, parameters
+
+    def count(self, app_id: str, params: LogSearchQuery) -> tuple[int, bool]:
+        """(matches, capped) over the whole result set, stopping at `count_cap`."""
+        conditions, parameters = self._where(app_id, params.model_copy(update={"cursor": None}))
+        parameters["count_cap"] = self.count_cap + 1
+        total = int(self.clickhouse_services.init.client.command(
+            f"""
+            SELECT count() FROM (
+                SELECT 1 FROM {self.table}
+                WHERE {" AND ".join(conditions)}
+                LIMIT {{count_cap:UInt32}}
+            )
+            """,
+            parameters=parameters,
+            settings={"max_execution_time": self.max_execution_time},
+        ))
+        if total > self.count_cap:
+            return self.count_cap, True
+        return total, False
+
+    def search(self, app_id: str, params: LogSearchQuery) -> dict[str, Any]:
+        page = self.query(app_id, params)
+        if params.cursor is None and page["next_cursor"] is None:
+            # the first page already holds every match
+            total, capped = page["count"], False
+        else:
+            total, capped = self.count(app_id, params)
+        logging.info(f"Log search served | app_id={app_id} | mode={params.mode} | rows={page['count']} | total={total}")
+        return {**page, "total": total, "total_is_estimate": capped}
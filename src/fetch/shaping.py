@@ -0,0 +1,108 @@
+"""
+Response shaping for the fetch path, without pandas.
+
+Builds the same records `/logs/get` used to build through a DataFrame:
+source_info/message_info flattened into top-level keys, every row carrying
+the union of keys (missing -> None), rows sorted by timestamp and
+timestamps rendered in IST. Each record is visited once.
+"""
+import math
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterable
+
+IST = timezone(timedelta(hours=5, minutes=30))
+FLATTEN_COLUMNS = ("source_info", "message_info")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_PLAIN = frozenset({str, int, bool, type(None)})
+
+
+def flatten_section(data: dict[str, Any]) -> dict[str, Any]:
+    """One level of nesting lifted to the top; deeper dicts are kept as str(), like FetchLogs._flatten_column."""
+    flat = {}
+    for section, content in data.items():
+        if isinstance(content, dict):
+            for key, value in content.items():
+                flat[key] = str(value) if isinstance(value, dict) else value
+        else:
+            flat[section] = content
+    return flat
+
+
+def parse_timestamp(value: Any) -> datetime | None:
+    """Aware UTC datetime from a datetime or ISO string; naive values are taken as UTC."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def format_ist(value: datetime) -> str:
+    # same text as strftime("%Y-%m-%dT%H:%M:%S+05:30") on an Asia/Kolkata timestamp
+    return value.astimezone(IST).isoformat(timespec="seconds")
+
+
+def sanitize(value: Any) -> Any:
+    """JSON-safe value: UUIDs and dates as strings, NaN/inf as None, numpy scalars and arrays as Python."""
+    if type(value) in _PLAIN:
+        return value
+    if isinstance(value, float):
+        return None if math.isnan(value) or math.isinf(value) else value
+    if isinstance(value, dict):
+        return {k: v if type(v) in _PLAIN else sanitize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [sanitize(v) for v in value]
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if type(value).__module__ == "numpy" and hasattr(value, "tolist"):
+        return sanitize(value.tolist())
+    return value
+
+
+def shape_record(record: dict[str, Any], flatten: tuple[str, ...] = FLATTEN_COLUMNS) -> tuple[datetime | None, dict[str, Any]]:
+    """(parsed timestamp, flat JSON-safe row) for one log."""
+    row = {
+        key: value if type(value) in _PLAIN else sanitize(value)
+        for key, value in record.items()
+        if key not in flatten
+    }
+    for column in flatten:
+        content = record.get(column)
+        if isinstance(content, dict):
+            row.update(sanitize(flatten_section(content)))
+
+    timestamp = parse_timestamp(record.get("timestamp"))
+    if "timestamp" in row:
+        row["timestamp"] = format_ist(timestamp) if timestamp is not None else None
+    return timestamp, row
+
+
+def shape_logs(*sources: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Flat rows from every source, oldest first. Rows without a parseable
+    timestamp go last, as NaT did in the DataFrame sort.
+    """
+    keyed: list[tuple[tuple[bool, datetime], dict[str, Any]]] = []
+    columns: dict[str, None] = {}
+
+    for source in sources:
+        for record in source:
+            timestamp, row = shape_record(record)
+            columns.update(dict.fromkeys(row))
+            keyed.append(((timestamp is None, timestamp or _EPOCH), row))
+
+    keyed.sort(key=lambda item: item[0])
+    names = list(columns)
+    return [
+        row if len(row) == len(names) else {name: row.get(name) for name in names}
+        for _, row in keyed
+    ]
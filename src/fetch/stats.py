@@ -0,0 +1,94 @@
+import math
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from src.db.clickhouse.migrations import ROLLUP_KEYS, ROLLUPS, rollup_table
+from src.db.clickhouse.services import ClickHouseServices
+from src.fetch.query import _to_micros
+from src.models.query import LogStatsQuery
+from src.utils.utils import logging
+
+
+# grain -> bucket width, finest first
+GRAIN_SECONDS: dict[str, int] = {"1m": 60, "1h": 3600, "1d": 86400}
+
+
+def choose_grain(start: datetime, end: datetime, max_points: int) -> str:
+    """Finest rollup that covers [start, end) in at most `max_points` buckets."""
+    span = (end - start).total_seconds()
+    for grain, seconds in GRAIN_SECONDS.items():
+        if span / seconds <= max_points:
+            return grain
+    return "1d"
+
+
+class LogStatsService:
+    """
+    Log counts per time bucket for one tenant, read from the
+    logs_stats_{1m,1h,1d} rollups that the materialized views keep up to
+    date, so a chart never touches raw rows.
+    """
+
+    def __init__(self, clickhouse_services: ClickHouseServices | None = None):
+        self.clickhouse_services = clickhouse_services or ClickHouseServices()
+        self.max_points = int(os.getenv("STATS_MAX_POINTS", "500"))
+        self.default_range = timedelta(hours=float(os.getenv("STATS_DEFAULT_RANGE_HOURS", "24")))
+        self.max_execution_time = int(os.getenv("QUERY_MAX_EXECUTION_SECONDS", "10"))
+
+    def build_query(self, app_id: str, params: LogStatsQuery) -> tuple[str, dict[str, Any], dict[str, Any]]:
+        end = params.end or datetime.now(timezone.utc)
+        start = params.start or end - self.default_range
+        if _to_micros(start) >= _to_micros(end):
+            raise ValueError("start must be before end")
+
+        grain = params.grain or choose_grain(start, end, self.max_points)
+        if grain not in ROLLUPS:
+            raise ValueError(f"Unsupported grain '{grain}'")
+
+        # an explicit grain (or a range too long even for 1d) must not return an unbounded series
+        points = math.ceil((_to_micros(end) - _to_micros(start)) / 1_000_000 / GRAIN_SECONDS[grain])
+        if points > self.max_points:
+            raise ValueError(
+                f"grain={grain} gives {points} buckets for this range, more than {self.max_points}; "
+                "use a coarser grain or a shorter range"
+            )
+
+        group_by = [name.strip() for name in (params.group_by or "").split(",") if name.strip()]
+        unknown = [name for name in group_by if name not in ROLLUP_KEYS]
+        if unknown:
+            raise ValueError(f"Cannot group by: {', '.join(unknown)}")
+
+        bucket_fn, _ = ROLLUPS[grain]
+        conditions = [
+            "app_id = {app_id:UUID}",
+            f"bucket >= {bucket_fn}(toDateTime(fromUnixTimestamp64Micro({{start_us:Int64}})))",
+            "bucket < toDateTime(fromUnixTimestamp64Micro({end_us:Int64}))",
+        ]
+        parameters: dict[str, Any] = {"app_id": app_id, "start_us": _to_micros(start), "end_us": _to_micros(end)}
+        for name, ch_type in (("event_type", "String"), ("severity_level", "String"), ("status_code", "Int32")):
+            value = getattr(params, name)
+            if value is not None:
+                conditions.append(f"{name} = {{{name}:{ch_type}}}")
+                parameters[name] = value
+
+        keys = ", ".join(["bucket", *group_by])
+        query = f"""
+            SELECT {keys}, sum(logs) AS logs
+            FROM {rollup_table(grain)}
+            WHERE {" AND ".join(conditions)}
+            GROUP BY {keys}
+            ORDER BY {keys}
+        """
+        return query, parameters, {"grain": grain, "start": start, "end": end}
+
+    def stats(self, app_id: str, params: LogStatsQuery) -> dict[str, Any]:
+        query, parameters, window = self.build_query(app_id, params)
+        result = self.clickhouse_services.init.client.query(
+            query,
+            parameters=parameters,
+            settings={"max_execution_time": self.max_execution_time},
+        )
+        series = list(result.named_results())
+        logging.info(f"Log stats served | app_id={app_id} | grain={window['grain']} | points={len(series)}")
+        return {**window, "series": series}
@@ -1,27 +1,25 @@
-import io
-import uuid
-from datetime import datetime, date
-import math
-import numpy as np
 from urllib.parse import unquote
 import os
-import pandas as pd
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 
-from src.api_key.authenticate import GenerateAPIKey
-from src.fetch.fetch_logs import FetchLogs
-from src.db.clickhouse.services import ClickHouseServices
-from src.db.redis.services import RedisServices
-
-from src.api_key.authenticate import GenerateAPIKey
+from src.api_key.dependency import require_api_key
 from src.fetch.fetch_logs import FetchLogs
+from src.fetch.query import EXPORT_FORMATS, LogQueryService
+from src.fetch.search import LogSearchService
+from src.fetch.stats import LogStatsService
+from src.logging.engine import IngestionEngine, get_engine
+from src.models.query import LogExportQuery, LogPage, LogQuery, LogSearchPage, LogSearchQuery, LogStats, LogStatsQuery
+from src.utils.utils import logging
 
 load_dotenv()
 
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", str(256 * 1024)))
+
 
 router = APIRouter(prefix="/logs", tags=["logs"])
 
@@ -34,58 +32,191 @@ def get_all_logs(
     raw_key = apiKey or apikey
     key = unquote(raw_key).replace(" ", "+") if raw_key else None
 
-    check_api_key = GenerateAPIKey().validate_api_key(api_key=key)[0]
+    engine = get_engine()
+    check_api_key = engine.api_key_manager.validate_api_key(api_key=key)[0]
     if not check_api_key:
         raise HTTPException(status_code=401, detail="Invalid API key.")
 
     try:
-        df = FetchLogs().merge_format_logs()
+        # flattened, IST-formatted and JSON-safe in one pass (src/fetch/shaping.py)
+        records = FetchLogs(
+            redis_services=engine.redis_services,
+            clickhouse_services=engine.click_house_services,
+        ).shaped_logs()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch logs: {str(e)}")
 
-    if df.empty:
+    if not records:
         raise HTTPException(status_code=404, detail="No logs found.")
 
-    # convert into
-    if "timestamp" in df.columns:
-        # If already tz-aware, convert directly; if naive, assume UTC first
-        if df["timestamp"].dt.tz is not None:
-            df["timestamp"] = df["timestamp"].dt.tz_convert("Asia/Kolkata")
-        else:
-            df["timestamp"] = df["timestamp"].dt.tz_localize("UTC").dt.tz_convert("Asia/Kolkata")
-        
-        df["timestamp"] = df["timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%S+05:30")
-        
-    records = df.to_dict(orient="records")
+    return JSONResponse(content={"count": len(records), "logs": records}, status_code=200)
 
-    def sanitize(obj):
-        if isinstance(obj, dict):
-            return {k: sanitize(v) for k, v in obj.items()}
-        if isinstance(obj, list):
-            return [sanitize(v) for v in obj]
 
-        if isinstance(obj, uuid.UUID):
-            return str(obj)
-        
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
+async def _run_cached(request: Request, response: Response, engine: IngestionEngine, tenant: dict, kind: str, params, func):
+    """
+    `func(app_id, params)` on the ClickHouse pool, through the query result
+    cache when it is enabled. `X-Cache-Bypass: 1` skips the lookup and
+    refreshes the entry; `X-Cache` on the response says which path ran.
+    """
+    cache = engine.query_cache
+    if cache is None:
+        return await engine.async_click_house_services.run(func, tenant["app_id"], params)
+
+    bypass = request.headers.get("X-Cache-Bypass", "").lower() in ("1", "true", "yes")
+    key = cache.key(tenant["app_id"], kind, params)
+    cached, generation = await cache.lookup_async(tenant["app_id"], key, bypass=bypass)
+    if cached is not None:
+        response.headers["X-Cache"] = "HIT"
+        return cached
+
+    # cache and response carry the same JSON-ready form, so a hit looks exactly like a miss
+    result = jsonable_encoder(await engine.async_click_house_services.run(func, tenant["app_id"], params))
+    await cache.store_async(key, generation, result)
+    response.headers["X-Cache"] = "BYPASS" if bypass else "MISS"
+    return result
+
+
+@router.get("/query", response_model=LogPage)
+async def query_logs(
+    request: Request,
+    response: Response,
+    params: LogQuery = Depends(),
+    tenant: dict = Depends(require_api_key),
+    engine: IngestionEngine = Depends(get_engine),
+):
+    """
+    Filtered, paginated logs for the caller's app. Pass `next_cursor` back as
+    `cursor` for the next page.
+    """
+    service = LogQueryService(engine.click_house_services, redis_services=engine.redis_services)
+    try:
+        return await _run_cached(request, response, engine, tenant, "query", params, service.query)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to query logs: {str(e)}")
+
+
+@router.get("/search", response_model=LogSearchPage)
+async def search_logs(
+    request: Request,
+    response: Response,
+    params: LogSearchQuery = Depends(),
+    tenant: dict = Depends(require_api_key),
+    engine: IngestionEngine = Depends(get_engine),
+):
+    """
+    Logs whose message matches `q`, newest first, with the /logs/query
+    filters and cursor. `total` counts every match up to SEARCH_COUNT_CAP.
+    """
+    service = LogSearchService(engine.click_house_services)
+    try:
+        return await _run_cached(request, response, engine, tenant, "search", params, service.search)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to search logs: {str(e)}")
+
+
+@router.get("/stats", response_model=LogStats)
+async def log_stats(
+    request: Request,
+    response: Response,
+    params: LogStatsQuery = Depends(),
+    tenant: dict = Depends(require_api_key),
+    engine: IngestionEngine = Depends(get_engine),
+):
+    """
+    Log counts per minute/hour/day bucket from the rollup tables, optionally
+    split by event_type, severity_level and status_code.
+    """
+    service = LogStatsService(engine.click_house_services)
+    try:
+        return await _run_cached(request, response, engine, tenant, "stats", params, service.stats)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to read log stats: {str(e)}")
+
+
+async def _stream_export(
+    request: Request,
+    params: LogExportQuery,
+    tenant: dict,
+    engine: IngestionEngine,
+    export_format: str,
+) -> StreamingResponse:
+    """
+    ClickHouse encodes the rows in the requested format and the bytes are
+    passed through chunk by chunk, so memory stays flat whatever the size
+    of the export.
+    """
+    service = LogQueryService(engine.click_house_services)
+    proxy = engine.async_click_house_services
+    try:
+        stream = await proxy.run(service.export_stream, tenant["app_id"], params, export_format)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to export logs: {str(e)}")
+
+    async def body():
+        sent = 0
+        try:
+            while True:
+                if await request.is_disconnected():
+                    logging.info(f"Log export cancelled by client | app_id={tenant['app_id']} | bytes={sent}")
+                    break
+                chunk = await proxy.run(stream.read, EXPORT_CHUNK_BYTES)
+                if not chunk:
+                    break
+                sent += len(chunk)
+                yield chunk
+        finally:
+            # closing mid-stream drops the HTTP connection and ClickHouse cancels the query
+            stream.close()
+            logging.info(f"Log export finished | app_id={tenant['app_id']} | bytes={sent}")
+
+    _, media_type, extension = EXPORT_FORMATS[export_format]
+    filename = f"logs_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
 
-        if isinstance(obj, float) and (math.isnan(obj) or math.isinf(obj)):
-            return None
 
-        if isinstance(obj, (np.integer,)):
-            return int(obj)
-        if isinstance(obj, (np.floating,)):
-            return None if math.isnan(obj) else float(obj)
+@router.get("/export.ndjson")
+async def export_logs_ndjson(
+    request: Request,
+    params: LogExportQuery = Depends(),
+    tenant: dict = Depends(require_api_key),
+    engine: IngestionEngine = Depends(get_engine),
+) -> StreamingResponse:
+    """The caller's logs as newline-delimited JSON."""
+    return await _stream_export(request, params, tenant, engine, "ndjson")
 
-        if isinstance(obj, np.ndarray):
-            return sanitize(obj.tolist())
 
-        return obj
+@router.get("/export.arrow")
+async def export_logs_arrow(
+    request: Request,
+    params: LogExportQuery = Depends(),
+    tenant: dict = Depends(require_api_key),
+    engine: IngestionEngine = Depends(get_engine),
+) -> StreamingResponse:
+    """The caller's logs as an Arrow IPC stream of compressed record batches."""
+    return await _stream_export(request, params, tenant, engine, "arrow")
 
-    payload = sanitize({"count": len(records), "logs": records})
-    return JSONResponse(content=payload, status_code=200)
 
+@router.get("/export.parquet")
+async def export_logs_parquet(
+    request: Request,
+    params: LogExportQuery = Depends(),
+    tenant: dict = Depends(require_api_key),
+    engine: IngestionEngine = Depends(get_engine),
+) -> StreamingResponse:
+    """The caller's logs as a compressed Parquet file."""
+    return await _stream_export(request, params, tenant, engine, "parquet")
 
 
 # @router.get("/export")
@@ -0,0 +1,134 @@
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from src.utils.utils import logging
+
+
+@dataclass
+class AdmissionDecision:
+    admitted: bool
+    backlog_count: int | None = None
+    backlog_bytes: int | None = None
+    retry_after: int | None = None
+
+    def headers(self) -> dict[str, str]:
+        headers = {}
+        if self.backlog_count is not None:
+            headers["X-Backlog-Count"] = str(self.backlog_count)
+        if self.backlog_bytes is not None:
+            headers["X-Backlog-Bytes"] = str(self.backlog_bytes)
+        if self.retry_after is not None:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+class AdmissionController:
+    """
+    Sheds ingest traffic while the Redis -> ClickHouse backlog is above a
+    high-water mark (log count or payload bytes).
+
+    Once shedding starts it continues until the backlog is back under
+    `resume_ratio` of both marks, so clients are not admitted and rejected on
+    alternate requests. The backlog is read from Redis at most once per
+    `cache_seconds` per process.
+    """
+
+    def __init__(
+        self,
+        backlog: Callable[[], tuple[int, int]],
+        drain_rate: Callable[[], float | None] | None = None,
+        max_count: int | None = None,
+        max_bytes: int | None = None,
+        resume_ratio: float | None = None,
+        cache_seconds: float | None = None,
+        min_retry_after: int | None = None,
+        max_retry_after: int | None = None,
+    ):
+        self.backlog = backlog
+        self.drain_rate = drain_rate
+
+        # 0 disables that mark
+        self.max_count = max_count if max_count is not None else int(os.getenv("ADMISSION_MAX_BACKLOG_COUNT", "500000"))
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            os.getenv("ADMISSION_MAX_BACKLOG_BYTES", str(512 * 1024 * 1024))
+        )
+        self.resume_ratio = resume_ratio or float(os.getenv("ADMISSION_RESUME_RATIO", "0.8"))
+        self.cache_seconds = cache_seconds if cache_seconds is not None else float(
+            os.getenv("ADMISSION_CACHE_SECONDS", "0.5")
+        )
+        self.min_retry_after = min_retry_after or int(os.getenv("ADMISSION_MIN_RETRY_AFTER_SECONDS", "1"))
+        self.max_retry_after = max_retry_after or int(os.getenv("ADMISSION_MAX_RETRY_AFTER_SECONDS", "60"))
+
+        self._lock = threading.Lock()
+        self._sampled_at = 0.0
+        self._count: int | None = None
+        self._bytes: int | None = None
+        self._shedding = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_count > 0 or self.max_bytes > 0
+
+    def _sample(self) -> None:
+        now = time.monotonic()
+        if now - self._sampled_at < self.cache_seconds:
+            return
+
+        with self._lock:
+            if now - self._sampled_at < self.cache_seconds:
+                return
+            try:
+                self._count, self._bytes = self.backlog()
+            except Exception as e:
+                # can't see the backlog (Redis down): admit and let the WAL absorb it
+                logging.warning(f"Admission backlog read failed | admitting | error={e}")
+                self._count, self._bytes = None, None
+            self._sampled_at = now
+
+    def _over(self, ratio: float) -> bool:
+        over_count = self.max_count > 0 and self._count is not None and self._count >= self.max_count * ratio
+        over_bytes = self.max_bytes > 0 and self._bytes is not None and self._bytes >= self.max_bytes * ratio
+        return over_count or over_bytes
+
+    def _retry_after(self) -> int:
+        rate = self.drain_rate() if self.drain_rate is not None else None
+        if not rate or self._count is None:
+            # nothing is draining, back off as far as we allow
+            return self.max_retry_after
+
+        # time to drain down to the resume mark at the recent flush rate
+        target = self.max_count * self.resume_ratio if self.max_count > 0 else 0
+        excess = max(self._count - target, 0)
+        if self.max_bytes > 0 and self._bytes:
+            bytes_per_log = self._bytes / max(self._count, 1)
+            excess = max(excess, (self._bytes - self.max_bytes * self.resume_ratio) / max(bytes_per_log, 1))
+
+        return min(self.max_retry_after, max(self.min_retry_after, math.ceil(excess / rate)))
+
+    def check(self) -> AdmissionDecision:
+        if not self.enabled:
+            return AdmissionDecision(admitted=True)
+
+        self._sample()
+
+        # hysteresis: stop shedding only once under the resume mark
+        shedding = self._over(self.resume_ratio) if self._shedding else self._over(1.0)
+        if shedding != self._shedding:
+            logging.warning(
+                f"Ingest admission {'shedding' if shedding else 'resumed'} | backlog_count={self._count} | "
+                f"backlog_bytes={self._bytes} | max_count={self.max_count} | max_bytes={self.max_bytes}"
+            )
+            self._shedding = shedding
+
+        if shedding:
+            return AdmissionDecision(
+                admitted=False,
+                backlog_count=self._count,
+                backlog_bytes=self._bytes,
+                retry_after=self._retry_after(),
+            )
+        return AdmissionDecision(admitted=True, backlog_count=self._count, backlog_bytes=self._bytes)
@@ -12,6 +12,11 @@ class BatchCaching:
         
     def flush_cache(self):
         self.cache.clear()
+
+    def discard(self, log_entries: list[Logs]):
+        # identity, not equality: two identical logs are still two logs
+        dropped = {id(log_entry) for log_entry in log_entries}
+        self.cache[:] = [log_entry for log_entry in self.cache if id(log_entry) not in dropped]
         
         
 if __name__ == "__main__":
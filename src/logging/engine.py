@@ -0,0 +1,225 @@
+import os
+import threading
+import time
+
+from src.utils.utils import logging
+from src.db.clickhouse.async_services import AsyncClickHouseServices
+from src.db.clickhouse.services import ClickHouseServices
+from src.db.postgres.async_services import AsyncPostgresServices
+from src.db.postgres.initialise import close_pool
+from src.db.postgres.services import PostgresServices
+from src.db.redis.async_services import AsyncRedisServices
+from src.db.redis.services import RedisServices
+from src.db.redshift.services import RedshiftServices
+from src.api_key.authenticate import GenerateAPIKey
+from src.api_key.cache import APIKeyCache
+from src.logging.admission import AdmissionController
+from src.logging.ingestion import LogIngestionService
+from src.logging.rate_limit import RateLimiter
+from src.fetch.cache import QueryResultCache
+from src.logging.flusher import BackgroundFlusher
+from src.logging.wal import WALReplayer, WriteAheadLog
+
+
+class IngestionEngine:
+    """
+    Process-lifetime owner of every backend client used by the API.
+
+    Built once (FastAPI lifespan under uvicorn, first request under Lambda) and
+    reused by every request, so a warm invocation pays no connection setup.
+    """
+
+    def __init__(self):
+        self.internal_batch_size = int(os.getenv("INGEST_INTERNAL_BATCH_SIZE", "1"))
+        self.redis_flush_count = int(os.getenv("REDIS_FLUSH_COUNT", "10"))
+        self.health_check_interval = float(os.getenv("ENGINE_HEALTH_CHECK_INTERVAL", "30"))
+
+        self._lock = threading.RLock()
+        self._last_health_check = 0.0
+
+        self.redis_services = RedisServices()
+        self.click_house_services = ClickHouseServices()
+        self.postgres_services = PostgresServices()
+        # Redshift is an optional sink, only connect when it is configured
+        self.redshift_services = RedshiftServices() if os.getenv("REDSHIFT_HOST") else None
+
+        # awaitable clients for async endpoints; lambdas follow _reconnect()
+        self.async_io = os.getenv("INGEST_ASYNC_IO", "true").lower() == "true"
+        self.async_redis_services = AsyncRedisServices(lambda: self.redis_services)
+        self.async_click_house_services = AsyncClickHouseServices(lambda: self.click_house_services)
+        self.async_postgres_services = AsyncPostgresServices(lambda: self.postgres_services)
+
+        use_redis_key_cache = os.getenv("API_KEY_CACHE_REDIS", "true").lower() == "true"
+        self.api_key_manager = GenerateAPIKey(
+            db_pgs=self.postgres_services,
+            cache=APIKeyCache(
+                redis_client=(lambda: self.redis_services.redis_obj.redis_client) if use_redis_key_cache else None,
+            ),
+        )
+        self.ingestion_service = LogIngestionService(
+            internal_batch_size=self.internal_batch_size,
+            redis_flush_count=self.redis_flush_count,
+            redis_services=self.redis_services,
+            click_house_services=self.click_house_services,
+        )
+        self.ingestion_service.async_redis_services = self.async_redis_services
+        self.ingestion_service.async_click_house_services = self.async_click_house_services
+
+        self.wal: WriteAheadLog | None = None
+        self.wal_replayer: WALReplayer | None = None
+        if os.getenv("WAL_ENABLED", "true").lower() == "true":
+            self.wal = WriteAheadLog()
+            self.ingestion_service.wal = self.wal
+            self.wal_replayer = WALReplayer(self.wal, sink=self.ingestion_service.replay_wal_records)
+            self.wal_replayer.start()
+
+        self.flusher: BackgroundFlusher | None = None
+        if os.getenv("FLUSHER_ENABLED", "true").lower() == "true":
+            self.flusher = BackgroundFlusher(self.ingestion_service)
+            self.flusher.start()
+
+        # lambdas so a reconnected Redis client is picked up
+        self.admission = AdmissionController(
+            backlog=lambda: self.redis_services.backlog(),
+            drain_rate=self.flusher.drain_rate if self.flusher is not None else None,
+        )
+        self.rate_limiter = RateLimiter(
+            redis_client=lambda: self.redis_services.redis_obj.redis_client,
+            load_limits=lambda app_id: self.postgres_services.get_app_rate_limits(app_id),
+            async_redis_client=lambda: self.async_redis_services.redis_client,
+            run_blocking=self.async_postgres_services.run,
+        )
+
+        self.query_cache: QueryResultCache | None = None
+        if os.getenv("QUERY_CACHE_ENABLED", "true").lower() == "true":
+            self.query_cache = QueryResultCache(
+                redis_client=lambda: self.redis_services.redis_obj.redis_client,
+                async_redis_client=lambda: self.async_redis_services.redis_client,
+            )
+            self.ingestion_service.on_committed = self.query_cache.bump
+
+        self._last_health_check = time.monotonic()
+        logging.info("IngestionEngine started")
+
+    def health_check(self) -> dict[str, bool]:
+        status = {
+            "redis": self.redis_services.ping(),
+            "clickhouse": self.click_house_services.ping(),
+            "postgres": self.postgres_services.ping(),
+        }
+        if self.redshift_services is not None:
+            status["redshift"] = self.redshift_services.ping()
+        return status
+
+    def ensure_healthy(self, force: bool = False) -> dict[str, bool] | None:
+        """
+        Re-check the shared clients at most once per `health_check_interval`
+        and rebuild any client whose connection has gone bad.
+        """
+        if not force and time.monotonic() - self._last_health_check < self.health_check_interval:
+            return None
+
+        with self._lock:
+            status = self.health_check()
+            self._last_health_check = time.monotonic()
+
+            for backend, healthy in status.items():
+                if not healthy:
+                    self._reconnect(backend)
+
+            return status
+
+    def _reconnect(self, backend: str) -> None:
+        try:
+            logging.warning(f"Reconnecting unhealthy backend | backend={backend}")
+
+            if backend == "redis":
+                self.redis_services.close()
+                self.redis_services = RedisServices()
+                self.ingestion_service.redis_services = self.redis_services
+
+            elif backend == "clickhouse":
+                self.click_house_services.close()
+                self.click_house_services = ClickHouseServices()
+                self.ingestion_service.click_house_services = self.click_house_services
+
+            elif backend == "postgres":
+                self.postgres_services.close()
+                self.postgres_services = PostgresServices()
+                self.api_key_manager.db_pgs = self.postgres_services
+
+            elif backend == "redshift" and self.redshift_services is not None:
+                self.redshift_services.close()
+                self.redshift_services = RedshiftServices()
+
+        except Exception as e:
+            logging.error(f"Failed to reconnect backend | backend={backend} | error={e}")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            # writers first: the final flush and the replayer may still spill into the WAL
+            if self.flusher is not None:
+                self.flusher.stop(final_flush=True)
+            if self.wal_replayer is not None:
+                self.wal_replayer.stop()
+            if self.wal is not None:
+                self.wal.close()
+            self.async_click_house_services.shutdown()
+            self.async_postgres_services.shutdown()
+
+            for services in (
+                self.redis_services,
+                self.click_house_services,
+                self.postgres_services,
+                self.redshift_services,
+            ):
+                if services is None:
+                    continue
+                try:
+                    services.close()
+                except Exception as e:
+                    logging.error(f"Error during engine shutdown: {e}")
+            close_pool()
+
+            logging.info("IngestionEngine shut down")
+
+
+_engine: IngestionEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> IngestionEngine:
+    """
+    Return the process-wide engine, building it on first use.
+
+    Module globals survive warm Lambda invocations, so this is also what keeps
+    the clients alive between invocations when the ASGI lifespan is off.
+    """
+    global _engine
+
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = IngestionEngine()
+    else:
+        _engine.ensure_healthy()
+
+    return _engine
+
+
+def start_engine() -> IngestionEngine | None:
+    try:
+        return get_engine()
+    except Exception as e:
+        # don't block startup, get_engine() retries on the first request
+        logging.error(f"IngestionEngine startup failed | error={e}")
+        return None
+
+
+def shutdown_engine() -> None:
+    global _engine
+
+    with _engine_lock:
+        if _engine is not None:
+            _engine.shutdown()
+            _engine = None
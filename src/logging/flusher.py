@@ -0,0 +1,171 @@
+import os
+import random
+import threading
+import time
+
+from src.utils.utils import logging
+from src.logging.ingestion import LogIngestionService
+
+
+class BackgroundFlusher:
+    """
+    Drains the Redis buffer into ClickHouse from dedicated worker threads.
+
+    A drain starts on whichever trigger fires first: the buffer holds
+    `max_batch_size` logs, `max_bytes` of payload, or its oldest log is older
+    than `max_age_seconds`. The ingest request path only calls `notify()`.
+    """
+
+    def __init__(
+        self,
+        ingestion_service: LogIngestionService,
+        max_batch_size: int | None = None,
+        max_age_seconds: float | None = None,
+        max_bytes: int | None = None,
+        concurrency: int | None = None,
+        poll_interval: float | None = None,
+        jitter: float | None = None,
+    ):
+        self.ingestion_service = ingestion_service
+
+        self.max_batch_size = max_batch_size or int(os.getenv("FLUSH_MAX_BATCH_SIZE", "1000"))
+        self.max_age_seconds = max_age_seconds or float(os.getenv("FLUSH_MAX_AGE_SECONDS", "300"))
+        self.max_bytes = max_bytes or int(os.getenv("FLUSH_MAX_BYTES", str(8 * 1024 * 1024)))
+        self.concurrency = concurrency or int(os.getenv("FLUSH_CONCURRENCY", "1"))
+        self.poll_interval = poll_interval or float(os.getenv("FLUSH_POLL_INTERVAL_SECONDS", "1"))
+        self.jitter = jitter if jitter is not None else float(os.getenv("FLUSH_JITTER_SECONDS", "0.5"))
+
+        if self.redis_services.buffer_mode != "stream" and self.concurrency > 1:
+            # without a consumer group several drainers would read the same keys
+            logging.warning("Flush concurrency > 1 requires REDIS_BUFFER_MODE=stream | falling back to 1")
+            self.concurrency = 1
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._last_flush = time.monotonic()
+        # EWMA of logs/sec while draining, read by admission control for Retry-After
+        self._drain_rate: float | None = None
+        self._last_success = 0.0
+
+    @property
+    def redis_services(self):
+        # follow the ingestion service so a reconnected client is picked up
+        return self.ingestion_service.redis_services
+
+    def start(self) -> None:
+        if self._threads:
+            return
+
+        self._stop.clear()
+        for worker in range(self.concurrency):
+            thread = threading.Thread(
+                target=self._run,
+                args=(f"{self.ingestion_service.consumer_name}-{worker}",),
+                name=f"log-flusher-{worker}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+        self.ingestion_service.on_buffered = self.notify
+        logging.info(
+            f"BackgroundFlusher started | concurrency={self.concurrency} | max_batch_size={self.max_batch_size} | "
+            f"max_age={self.max_age_seconds}s | max_bytes={self.max_bytes}"
+        )
+
+    def notify(self) -> None:
+        """Called after every Redis write; wakes a worker for an early trigger check."""
+        self._wake.set()
+
+    def stop(self, timeout: float = 10.0, final_flush: bool = True) -> None:
+        self.ingestion_service.on_buffered = None
+        self._stop.set()
+        self._wake.set()
+
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        alive = [thread.name for thread in self._threads if thread.is_alive()]
+        self._threads = []
+
+        if alive:
+            # a worker still mid-drain would read the same keys as a final flush
+            logging.warning(f"BackgroundFlusher workers still running | workers={','.join(alive)} | skipping final flush")
+        elif final_flush:
+            self.flush_now()
+        logging.info("BackgroundFlusher stopped")
+
+    def drain_rate(self) -> float | None:
+        """
+        Recent drain throughput in logs/sec, or None when nothing has been
+        flushed successfully within `max_age_seconds` (e.g. ClickHouse is down).
+        """
+        if self._drain_rate is None or time.monotonic() - self._last_success > self.max_age_seconds:
+            return None
+        return self._drain_rate
+
+    def _record_drain(self, flushed: int, duration: float) -> None:
+        rate = flushed / max(duration, 1e-3)
+        self._drain_rate = rate if self._drain_rate is None else 0.7 * self._drain_rate + 0.3 * rate
+        self._last_success = time.monotonic()
+
+    def flush_now(self, consumer: str | None = None) -> int:
+        """Drain until the buffer is empty or a batch fails. Returns logs flushed."""
+        total = 0
+        start = time.monotonic()
+        while True:
+            flushed = self.ingestion_service.drain_redis_to_clickhouse(consumer=consumer)
+            if not flushed:
+                break
+            total += flushed
+            if flushed < self.ingestion_service.drain_batch_size:
+                break
+
+        if total:
+            self._last_flush = time.monotonic()
+            self._record_drain(total, self._last_flush - start)
+        return total
+
+    def _trigger(self) -> str | None:
+        count, buffered_bytes = self.redis_services.backlog()
+        if count == 0:
+            self._last_flush = time.monotonic()
+            return None
+
+        if count >= self.max_batch_size:
+            return "size"
+
+        if buffered_bytes >= self.max_bytes:
+            return "bytes"
+
+        age = self.redis_services.oldest_buffered_age()
+        if age is None:
+            # keys mode has no ordering, age the buffer from our last drain
+            age = time.monotonic() - self._last_flush
+        if age >= self.max_age_seconds:
+            return "age"
+
+        return None
+
+    def _run(self, consumer: str) -> None:
+        while not self._stop.is_set():
+            # jitter keeps several workers/instances from hitting ClickHouse in lockstep
+            self._wake.wait(timeout=self.poll_interval + random.uniform(0, self.jitter))
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+
+            try:
+                reason = self._trigger()
+                if reason is None:
+                    continue
+
+                start = time.time()
+                flushed = self.flush_now(consumer=consumer)
+                duration = round(time.time() - start, 3)
+                logging.info(f"Background flush completed | trigger={reason} | flushed={flushed} | duration={duration}s")
+
+            except Exception as e:
+                logging.exception(f"Background flush failed | error={e}")
+                # back off before the next attempt
+                self._stop.wait(timeout=self.poll_interval + random.uniform(0, self.jitter))
@@ -1,28 +1,60 @@
 from datetime import datetime, timezone, timedelta
+import asyncio
+import json
 import os
+import socket
 import time
 import uuid
 
 from src.models.logs import Logs, ServerInfo, RequestInfo, MessageInfo, SourceInfo
 from src.utils.utils import logging
 from src.db.clickhouse.services import ClickHouseServices
-from src.db.redis.services import RedisServices
+from src.db.clickhouse.async_services import AsyncClickHouseServices
+from src.db.redis.async_services import AsyncRedisServices
+from src.db.redis.services import RedisServices, app_id_of
 from src.logging.batch_caching import BatchCaching
+from src.logging.wal import WriteAheadLog
 
 
 class LogIngestionService:
-    def __init__(self, internal_batch_size: int = 1, redis_flush_count: int = 10):
+    def __init__(
+        self,
+        internal_batch_size: int = 1,
+        redis_flush_count: int = 10,
+        redis_services: RedisServices | None = None,
+        click_house_services: ClickHouseServices | None = None,
+    ):
         self.internal_batch_size = internal_batch_size
         self.redis_flush_count = redis_flush_count
+        self.drain_batch_size = int(os.getenv("REDIS_DRAIN_BATCH_SIZE", "10000"))
+        # consumer name used when draining the Redis stream buffer
+        self.consumer_name = f"{socket.gethostname()}-{os.getpid()}"
         self.cache_batch = []
 
         self.batch_caching = BatchCaching(cache_batch=self.cache_batch)
-        self.redis_services = RedisServices()
-        self.click_house_services = ClickHouseServices()
+        self.redis_services = redis_services or RedisServices()
+        self.click_house_services = click_house_services or ClickHouseServices()
+        # set by BackgroundFlusher; when present the request path never flushes inline
+        self.on_buffered = None
+        # set by IngestionEngine; local spill target when Redis is unavailable
+        self.wal: WriteAheadLog | None = None
+        # set by IngestionEngine; called with the app_ids whose rows just reached ClickHouse
+        self.on_committed = None
+        # set by IngestionEngine; used by the *_async request-path methods
+        self.async_redis_services: AsyncRedisServices | None = None
+        self.async_click_house_services: AsyncClickHouseServices | None = None
+        # tenants whose logs skip Redis and go straight to a ClickHouse async insert
+        self.direct_app_ids = {
+            app_id.strip() for app_id in os.getenv("CLICKHOUSE_DIRECT_APP_IDS", "").split(",") if app_id.strip()
+        }
         logging.info(f"LogIngestionService initialized | batch_size={self.internal_batch_size}")
 
-    def ingest_log(self, log_object: Logs) -> Logs:
+    def ingest_log(self, log_object: Logs) -> Logs | None:
+        """Returns None when the log could be stored in neither Redis nor the WAL."""
         try:
+            if self._is_direct(log_object) and self.ingest_direct([log_object]):
+                return log_object
+
             # add to mini batch in memory
             self.batch_caching.add_log_to_cache(log_object)
             current_batch_size = len(self.batch_caching.cache)
@@ -35,48 +67,240 @@ class LogIngestionService:
                 flushed_cache = self.flush_cache_to_redis()
 
             if not flushed_cache:
-                logging.error("Failed to flush cache to Redis | log ingestion may be delayed")
-                return log_object
+                # the caller reports the log as failed, so don't resend it with the next batch
+                self.batch_caching.discard([log_object])
+                logging.error("Failed to buffer log in Redis or WAL | count=1")
+                return None
 
-            # check redis count
-            redis_log_cache = self.redis_services.get_object() or []
-            redis_count = len(redis_log_cache)
-            logging.info(f"Fetched logs from Redis | count={redis_count}")
+            self._maybe_flush_redis()
+            return log_object
+            
+        except Exception as e:
+            logging.exception(f"Error ingesting log | error={e}")
+            raise
 
-            if redis_count == 0:
-                logging.info("No logs found in Redis for ClickHouse flush")
-                return log_object
+    def ingest_logs(self, log_objects: list[Logs]) -> list[Logs] | None:
+        """
+        Ingest a whole batch as one unit: a single Redis write for every log
+        in the batch, followed by the usual ClickHouse flush check.
+        Returns None when the batch could be stored in neither Redis nor the WAL.
+        """
+        try:
+            if not log_objects:
+                return log_objects
+
+            direct_logs = [log_object for log_object in log_objects if self._is_direct(log_object)]
+            buffered_logs = [log_object for log_object in log_objects if not self._is_direct(log_object)]
+            if direct_logs and not self.ingest_direct(direct_logs):
+                # ClickHouse rejected the insert, keep the logs through the Redis path
+                buffered_logs = log_objects
+            if not buffered_logs:
+                return log_objects
+
+            for log_object in buffered_logs:
+                self.batch_caching.add_log_to_cache(log_object)
+            logging.info(f"Batch added to local cache | batch_size={len(log_objects)} | flushing_to_redis")
+
+            if not self.flush_cache_to_redis():
+                # the caller reports the batch as failed, so don't keep it for a later retry
+                self.batch_caching.discard(buffered_logs)
+                logging.error(f"Failed to buffer batch in Redis or WAL | count={len(buffered_logs)}")
+                return None
+
+            self._maybe_flush_redis()
+            return log_objects
 
-            # flush to clickhouse when threshold reached
-            if redis_count < self.redis_flush_count:
-                logging.info(
-                    f"Redis log count {redis_count} has not reached flush threshold {self.redis_flush_count} | "
-                    "deferring ClickHouse flush"
-                )
-                return log_object
+        except Exception as e:
+            logging.exception(f"Error ingesting log batch | error={e}")
+            raise
 
-            flushed_redis = self.flush_redis_to_clickhouse()
-            if not flushed_redis:
-                logging.error("Failed to flush Redis to ClickHouse | log ingestion may be delayed")
+    def ingest_raw(self, body: bytes, app_id: str | None = None) -> str | None:
+        """
+        Raw ingest lane: `body` is one log already serialized as JSON. It is
+        buffered (or sent to ClickHouse) as bytes and never parsed again.
+        Returns the assigned log_id, or None when it could not be stored.
+        """
+        try:
+            log_id = str(uuid.uuid4())
+            body = _with_log_id(log_id, body)
+
+            if self.direct_app_ids and str(app_id) in self.direct_app_ids:
+                inserted = self.click_house_services.insert_log([{log_id: body}], async_insert=True)
+                if inserted == 1:
+                    self._committed({app_id})
+                    return log_id
+                logging.error(f"Direct ClickHouse raw insert failed | log_id={log_id} | falling back to Redis")
+
+            try:
+                written = self.redis_services.buffer_raw([(log_id, body)])
+            except Exception as e:
+                logging.exception(f"Redis raw insert failed | log_id={log_id} | error={e}")
+                written = None
+
+            if not written:
+                return log_id if self._spill_raw_to_wal(log_id, body) else None
+
+            self._maybe_flush_redis()
+            return log_id
 
-            return log_object
-            
         except Exception as e:
-            logging.exception(f"Error ingesting log | error={e}")
+            logging.exception(f"Error ingesting raw log | error={e}")
+            raise
+
+    def _spill_raw_to_wal(self, log_id: str, body: bytes) -> bool:
+        record = b'{"log_id":"' + log_id.encode() + b'","payload":' + body + b"}"
+        if self.wal is None or not self.wal.append(record):
+            logging.error(f"Failed to store raw log | log_id={log_id}")
+            return False
+
+        logging.warning(f"Redis unavailable | spilled raw log to local WAL | log_id={log_id}")
+        return True
+
+    # ====================== ASYNC REQUEST PATH ======================
+    #
+    # Same semantics as the methods above, but Redis is written through
+    # redis.asyncio and every blocking ClickHouse call runs on the bounded
+    # ClickHouse worker pool. There is no in-memory mini batch here: each
+    # request's logs are one pipelined Redis write, so concurrent coroutines
+    # never share the local cache.
+
+    async def ingest_log_async(self, log_object: Logs) -> Logs | None:
+        if await self.ingest_logs_async([log_object]) is None:
+            return None
+        return log_object
+
+    async def ingest_logs_async(self, log_objects: list[Logs]) -> list[Logs] | None:
+        try:
+            if not log_objects:
+                return log_objects
+
+            direct_logs = [log_object for log_object in log_objects if self._is_direct(log_object)]
+            buffered_logs = [log_object for log_object in log_objects if not self._is_direct(log_object)]
+            if direct_logs and not await self.async_click_house_services.run(self.ingest_direct, direct_logs):
+                buffered_logs = log_objects
+            if not buffered_logs:
+                return log_objects
+
+            log_pairs = [(str(uuid.uuid4()), log) for log in buffered_logs]
+            written = await self.async_redis_services.buffer_logs(log_pairs)
+
+            if written is None or written < len(log_pairs):
+                logging.error(f"Redis insert incomplete | attempted={len(log_pairs)} | written={written}")
+                if not self._spill_to_wal(log_pairs):
+                    logging.error(f"Failed to buffer logs in Redis or WAL | count={len(log_pairs)}")
+                    return None
+                return log_objects
+
+            await self._maybe_flush_redis_async()
+            return log_objects
+
+        except Exception as e:
+            logging.exception(f"Error ingesting logs (async) | error={e}")
+            raise
+
+    async def ingest_raw_async(self, body: bytes, app_id: str | None = None) -> str | None:
+        try:
+            log_id = str(uuid.uuid4())
+            body = _with_log_id(log_id, body)
+
+            if self.direct_app_ids and str(app_id) in self.direct_app_ids:
+                inserted = await self.async_click_house_services.insert_log([{log_id: body}], async_insert=True)
+                if inserted == 1:
+                    if self.on_committed is not None:
+                        await asyncio.to_thread(self._committed, {app_id})
+                    return log_id
+                logging.error(f"Direct ClickHouse raw insert failed | log_id={log_id} | falling back to Redis")
+
+            written = await self.async_redis_services.buffer_raw([(log_id, body)])
+            if not written:
+                return log_id if self._spill_raw_to_wal(log_id, body) else None
+
+            await self._maybe_flush_redis_async()
+            return log_id
+
+        except Exception as e:
+            logging.exception(f"Error ingesting raw log (async) | error={e}")
             raise
 
+    async def _maybe_flush_redis_async(self) -> None:
+        if self.on_buffered is not None:
+            self.on_buffered()
+            return
+
+        # no background flusher: the inline threshold check and flush are blocking
+        await self.async_click_house_services.run(self._maybe_flush_redis)
+
+    def _is_direct(self, log_object: Logs) -> bool:
+        return bool(self.direct_app_ids) and str(log_object.app_id) in self.direct_app_ids
+
+    def ingest_direct(self, log_objects: list[Logs]) -> bool:
+        """
+        Send logs straight to ClickHouse as an async insert, letting the server
+        coalesce them instead of buffering in Redis. Returns False on failure so
+        the caller can fall back to the Redis path.
+        """
+        try:
+            start = time.time()
+            entries = [{str(uuid.uuid4()): log_object} for log_object in log_objects]
+            inserted = self.click_house_services.insert_log(entries, async_insert=True)
+
+            if inserted != len(entries):
+                logging.error(f"Direct ClickHouse insert failed | attempted={len(entries)} | inserted={inserted}")
+                return False
+
+            self._committed({str(log_object.app_id) for log_object in log_objects})
+            duration = round(time.time() - start, 3)
+            logging.info(f"Direct ClickHouse insert completed | count={inserted} | duration={duration}s")
+            return True
+
+        except Exception as e:
+            logging.exception(f"Direct ClickHouse insert failed | error={e}")
+            return False
+
+    def _maybe_flush_redis(self) -> None:
+        if self.on_buffered is not None:
+            # a background flusher owns the ClickHouse writes, just wake it up
+            self.on_buffered()
+            return
+
+        # check redis count
+        redis_count = self.redis_services.buffered_count()
+        logging.info(f"Fetched Redis buffer depth | count={redis_count}")
+
+        if redis_count == 0:
+            logging.info("No logs found in Redis for ClickHouse flush")
+            return
+
+        # flush to clickhouse when threshold reached
+        if redis_count < self.redis_flush_count:
+            logging.info(
+                f"Redis log count {redis_count} has not reached flush threshold {self.redis_flush_count} | "
+                "deferring ClickHouse flush"
+            )
+            return
+
+        flushed_redis = self.flush_redis_to_clickhouse()
+        if not flushed_redis:
+            logging.error("Failed to flush Redis to ClickHouse | log ingestion may be delayed")
+
     def flush_cache_to_redis(self) -> bool:
         try:
             start = time.time()
 
-            for log in self.batch_caching.cache:
-                log_id = str(uuid.uuid4())
-                try:
-                    redis_resp = self.redis_services.insert_object(log_pair=(log_id, log))
-                    logging.debug(f"Redis insert successful | log_id={log_id} | event={log.event_name} | resp={redis_resp}")
-                except Exception as e:
-                    logging.exception(f"Redis insert failed | log_id={log_id} | event={getattr(log, 'event_name', None)} | error={e}")
+            log_pairs = [(str(uuid.uuid4()), log) for log in self.batch_caching.cache]
+            try:
+                redis_resp = self.redis_services.buffer_logs(log_pairs)
+            except Exception as e:
+                logging.exception(f"Redis insert failed | count={len(log_pairs)} | error={e}")
+                redis_resp = None
+
+            if redis_resp is None or redis_resp < len(log_pairs):
+                logging.error(f"Redis insert incomplete | attempted={len(log_pairs)} | written={redis_resp}")
+                if not self._spill_to_wal(log_pairs):
                     return False
+                self.batch_caching.flush_cache()
+                return True
+            logging.debug(f"Redis insert successful | count={redis_resp}")
 
             self.batch_caching.flush_cache()
             duration = round(time.time() - start, 3)
@@ -87,15 +311,80 @@ class LogIngestionService:
             logging.exception(f"Failed to flush cache to Redis | error={e}")
             return False
 
-    def flush_redis_to_clickhouse(self) -> bool:
+    def _spill_to_wal(self, log_pairs: list[tuple[str, Logs]]) -> bool:
+        if self.wal is None:
+            return False
+
+        # one record for the whole batch, so it is either durable as a unit or not at all
+        record = json.dumps(
+            [{"log_id": log_id, "payload": self.redis_services._build_payload(log)} for log_id, log in log_pairs],
+            ensure_ascii=False,
+            default=str,
+        ).encode()
+        if not self.wal.append(record):
+            logging.error(f"WAL spill failed | count={len(log_pairs)}")
+            return False
+
+        logging.warning(f"Redis unavailable | spilled to local WAL | count={len(log_pairs)}")
+        return True
+
+    def replay_wal_records(self, records: list[bytes]) -> bool:
+        """
+        WALReplayer sink: put spilled logs back into Redis, or straight into
+        ClickHouse when Redis is still down.
+        """
+        log_pairs = []
+        for record in records:
+            decoded = json.loads(record)
+            # a batch spill is one record holding a list, a raw spill a single object
+            for item in decoded if isinstance(decoded, list) else [decoded]:
+                log_pairs.append((item["log_id"], item["payload"]))
+
+        try:
+            written = self.redis_services.buffer_logs(log_pairs)
+            if written is not None and written >= len(log_pairs):
+                if self.on_buffered is not None:
+                    self.on_buffered()
+                return True
+        except Exception as e:
+            logging.warning(f"WAL replay into Redis failed, trying ClickHouse | error={e}")
+
+        entries = [{log_id: payload} for log_id, payload in log_pairs]
+        inserted = self.click_house_services.insert_log(entries)
+        if inserted == len(log_pairs):
+            self._committed(_entry_app_ids(entries))
+            return True
+        return False
+
+    def _committed(self, app_ids: set[str]) -> None:
+        if self.on_committed is None or not app_ids:
+            return
+        try:
+            self.on_committed(app_ids)
+        except Exception as e:
+            logging.warning(f"Commit hook failed | tenants={len(app_ids)} | error={e}")
+
+    def flush_redis_to_clickhouse(self, consumer: str | None = None) -> bool:
+        return self.drain_redis_to_clickhouse(consumer=consumer) is not None
+
+    def drain_redis_to_clickhouse(self, consumer: str | None = None) -> int | None:
+        """
+        Move one batch from the Redis buffer into ClickHouse.
+        Returns the number of logs flushed (0 when Redis is empty) or None on failure.
+        """
         try:
-            # fetch redis cache inside this method
-            redis_log_cache = self.redis_services.get_object() or []
+            # claim a batch from the redis buffer inside this method
+            handles, redis_log_cache = self.redis_services.drain_batch(
+                consumer=consumer or self.consumer_name,
+                count=self.drain_batch_size,
+                # JSONEachRow inserts take the buffered JSON bytes without decoding them
+                raw=self.click_house_services.insert_mode == "jsoneachrow",
+            )
             redis_count = len(redis_log_cache)
 
             if redis_count == 0:
                 logging.info("Redis empty | skipping ClickHouse flush")
-                return True
+                return 0
 
             start = time.time()
 
@@ -104,28 +393,41 @@ class LogIngestionService:
                 success_count = inserted or 0
             except Exception as e:
                 logging.exception(f"ClickHouse insert failed | error={e}")
-                return False
+                return None
 
             duration = round(time.time() - start, 3)
             logging.info(f"ClickHouse flush completed | attempted={redis_count} | inserted={success_count} | duration={duration}s")
 
-            # clear redis only on full success
+            # clear redis only on full success, and only the entries that were flushed
             if success_count == redis_count:
                 try:
-                    self.redis_services.delete_object()
+                    self.redis_services.acknowledge(handles)
                     logging.info(f"Redis cleared after successful ClickHouse flush | cleared_count={redis_count}")
                 except Exception as e:
                     logging.exception(f"Failed to clear Redis after ClickHouse flush | error={e}")
-                    return False
-                return True
+                    return None
+                self._committed(_entry_app_ids(redis_log_cache))
+                return redis_count
 
             logging.warning("Partial ClickHouse insert detected | Redis NOT cleared to prevent data loss")
-            return False
+            return None
 
         except Exception as e:
             logging.exception(f"Failed to flush Redis to ClickHouse | error={e}")
-            return False
+            return None
+
+
+def _entry_app_ids(entries: list[dict]) -> set[str]:
+    """app_ids in `{log_id: payload}` entries; raw JSON payloads are scanned, not parsed."""
+    return {app_id for entry in entries for payload in entry.values() if (app_id := app_id_of(payload))}
+
 
+def _with_log_id(log_id: str, body: bytes) -> bytes:
+    """Prepend `"log_id"` to a serialized JSON object without parsing it."""
+    body = body.strip()
+    if body == b"{}":
+        return b'{"log_id":"' + log_id.encode() + b'"}'
+    return b'{"log_id":"' + log_id.encode() + b'",' + body[1:]
 
 
 def main():
@@ -1,5 +1,6 @@
 from datetime import datetime
 import os
+import socket
 import time
 import uuid
 
@@ -11,14 +12,23 @@ from src.logging.batch_caching import BatchCaching
 
 
 class LogIngestionService:
-    def __init__(self, internal_batch_size: int = 1, redis_flush_count: int = 10):
+    def __init__(
+        self,
+        internal_batch_size: int = 1,
+        redis_flush_count: int = 10,
+        redis_services: RedisServices | None = None,
+        redshift_services: RedshiftServices | None = None,
+    ):
         self.internal_batch_size = internal_batch_size
         self.redis_flush_count = redis_flush_count
+        self.drain_batch_size = int(os.getenv("REDIS_DRAIN_BATCH_SIZE", "10000"))
+        # consumer name used when draining the Redis stream buffer
+        self.consumer_name = f"{socket.gethostname()}-{os.getpid()}"
         self.cache_batch = []
 
         self.batch_caching = BatchCaching(cache_batch=self.cache_batch)
-        self.redis_services = RedisServices()
-        self.redshift_services = RedshiftServices()
+        self.redis_services = redis_services or RedisServices()
+        self.redshift_services = redshift_services or RedshiftServices()
         logging.info(f"LogIngestionService initialized | batch_size={self.internal_batch_size}")
 
     def ingest_log(self, log_object: Logs) -> Logs:
@@ -36,9 +46,8 @@ class LogIngestionService:
                 logging.error("Failed to flush cache to Redis | log ingestion may be delayed")
                 return log_object
 
-            redis_log_cache = self.redis_services.get_object() or []
-            redis_count = len(redis_log_cache)
-            logging.info(f"Fetched logs from Redis | count={redis_count}")
+            redis_count = self.redis_services.buffered_count()
+            logging.info(f"Fetched Redis buffer depth | count={redis_count}")
 
             if redis_count == 0:
                 logging.info("No logs found in Redis for Redshift flush")
@@ -65,14 +74,17 @@ class LogIngestionService:
         try:
             start = time.time()
 
-            for log in self.batch_caching.cache:
-                log_id = str(uuid.uuid4())
-                try:
-                    redis_resp = self.redis_services.insert_object(log_pair=(log_id, log))
-                    logging.debug(f"Redis insert successful | log_id={log_id} | event={log.event_name} | resp={redis_resp}")
-                except Exception as e:
-                    logging.exception(f"Redis insert failed | log_id={log_id} | event={getattr(log, 'event_name', None)} | error={e}")
-                    return False
+            log_pairs = [(str(uuid.uuid4()), log) for log in self.batch_caching.cache]
+            try:
+                redis_resp = self.redis_services.buffer_logs(log_pairs)
+            except Exception as e:
+                logging.exception(f"Redis insert failed | count={len(log_pairs)} | error={e}")
+                return False
+
+            if redis_resp is None or redis_resp < len(log_pairs):
+                logging.error(f"Redis insert incomplete | attempted={len(log_pairs)} | written={redis_resp}")
+                return False
+            logging.debug(f"Redis insert successful | count={redis_resp}")
 
             self.batch_caching.flush_cache()
             duration = round(time.time() - start, 3)
@@ -85,7 +97,10 @@ class LogIngestionService:
 
     def flush_redis_to_redshift(self) -> bool:
         try:
-            redis_log_cache = self.redis_services.get_object() or []
+            handles, redis_log_cache = self.redis_services.drain_batch(
+                consumer=self.consumer_name,
+                count=self.drain_batch_size,
+            )
             redis_count = len(redis_log_cache)
 
             if redis_count == 0:
@@ -95,7 +110,7 @@ class LogIngestionService:
             start = time.time()
 
             try:
-                inserted = self.redshift_services.insert_log(redis_log_cache)
+                inserted = self.redshift_services.bulk_insert_logs(redis_log_cache)
                 success_count = inserted or 0
             except Exception as e:
                 logging.exception(f"Redshift insert failed | error={e}")
@@ -106,7 +121,7 @@ class LogIngestionService:
 
             if success_count == redis_count:
                 try:
-                    self.redis_services.delete_object()
+                    self.redis_services.acknowledge(handles)
                     logging.info(f"Redis cleared after successful Redshift flush | cleared_count={redis_count}")
                 except Exception as e:
                     logging.exception(f"Failed to clear Redis after Redshift flush | error={e}")
@@ -0,0 +1,232 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable
+
+from src.utils.utils import logging
+
+
+# Two token buckets (logs, bytes) in one hash, refilled from the Redis clock so
+# every API instance agrees on time. A cost larger than the burst is admitted
+# when the bucket is full and drives it negative, so oversized batches are
+# throttled rather than rejected forever.
+#
+# KEYS[1] bucket hash
+# ARGV    logs_rate, logs_burst, bytes_rate, bytes_burst, logs_cost, bytes_cost  (rate <= 0: unlimited)
+# returns {allowed, retry_after_ms}
+_TOKEN_BUCKET_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'logs', 'bytes', 'ts')
+local last = tonumber(state[3]) or now
+local elapsed = math.max(now - last, 0) / 1000
+
+local rates = {tonumber(ARGV[1]), tonumber(ARGV[3])}
+local bursts = {tonumber(ARGV[2]), tonumber(ARGV[4])}
+local costs = {tonumber(ARGV[5]), tonumber(ARGV[6])}
+local tokens = {tonumber(state[1]) or bursts[1], tonumber(state[2]) or bursts[2]}
+
+local retry_ms = 0
+local ttl_ms = 1000
+for i = 1, 2 do
+    if rates[i] > 0 then
+        tokens[i] = math.min(bursts[i], tokens[i] + elapsed * rates[i])
+        local needed = math.min(costs[i], bursts[i])
+        if tokens[i] < needed then
+            retry_ms = math.max(retry_ms, math.ceil((needed - tokens[i]) / rates[i] * 1000))
+        end
+        ttl_ms = math.max(ttl_ms, math.ceil(bursts[i] / rates[i] * 1000) * 2)
+    end
+end
+
+if retry_ms == 0 then
+    for i = 1, 2 do
+        if rates[i] > 0 then
+            tokens[i] = tokens[i] - costs[i]
+        end
+    end
+end
+
+redis.call('HSET', KEYS[1], 'logs', tokens[1], 'bytes', tokens[2], 'ts', now)
+redis.call('PEXPIRE', KEYS[1], ttl_ms)
+
+if retry_ms == 0 then
+    return {1, 0}
+end
+return {0, retry_ms}
+"""
+
+
+class RateLimiter:
+    """
+    Per-tenant token buckets for logs/sec and bytes/sec, enforced in Redis.
+
+    Limits come from the tenant's `apps` row (NULL columns fall back to the
+    RATE_LIMIT_* defaults, 0 means unlimited) and are cached for
+    `config_ttl` seconds. A denial is remembered locally until its retry time,
+    so a throttled client costs no Redis calls and an admitted request or
+    batch costs exactly one.
+    """
+
+    def __init__(
+        self,
+        redis_client: Callable[[], Any],
+        load_limits: Callable[[str], dict | None],
+        async_redis_client: Callable[[], Any] | None = None,
+        run_blocking: Callable[..., Awaitable[Any]] | None = None,
+        scope: str | None = None,
+        config_ttl: float | None = None,
+        key_prefix: str | None = None,
+    ):
+        self.redis_client = redis_client
+        self.async_redis_client = async_redis_client
+        self.load_limits = load_limits
+        # how check_async() runs a limits reload; the default thread pool when unset
+        self.run_blocking = run_blocking or asyncio.to_thread
+
+        # "app": one bucket per app_id, "server": one per (app_id, server_id)
+        self.scope = (scope or os.getenv("RATE_LIMIT_SCOPE", "app")).lower()
+        self.config_ttl = config_ttl if config_ttl is not None else float(os.getenv("RATE_LIMIT_CONFIG_TTL_SECONDS", "60"))
+        self.key_prefix = key_prefix or os.getenv("RATE_LIMIT_KEY_PREFIX", "ratelimit")
+
+        self.defaults = {
+            "logs_per_sec": float(os.getenv("RATE_LIMIT_LOGS_PER_SEC", "0")),
+            "logs_burst": float(os.getenv("RATE_LIMIT_LOGS_BURST", "0")),
+            "bytes_per_sec": float(os.getenv("RATE_LIMIT_BYTES_PER_SEC", "0")),
+            "bytes_burst": float(os.getenv("RATE_LIMIT_BYTES_BURST", "0")),
+        }
+
+        self._lock = threading.Lock()
+        self._limits: dict[str, tuple[float, dict[str, float]]] = {}
+        self._denied_until: dict[str, float] = {}
+        self._script = None
+        self._async_script = None
+
+    def _bucket_key(self, tenant: dict) -> str:
+        if self.scope == "server" and tenant.get("server_id"):
+            return f"{self.key_prefix}:{tenant.get('app_id')}:{tenant.get('server_id')}"
+        return f"{self.key_prefix}:{tenant.get('app_id')}"
+
+    def limits_for(self, app_id: str) -> dict[str, float]:
+        cached = self._limits.get(app_id)
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
+
+        try:
+            overrides = self.load_limits(app_id) or {}
+        except Exception as e:
+            logging.error(f"Failed to load rate limits | app_id={app_id} | error={e}")
+            overrides = {}
+
+        limits = {}
+        for name, default in self.defaults.items():
+            value = overrides.get(name)
+            limits[name] = float(value) if value is not None else default
+        # no explicit burst: allow one second's worth
+        for kind in ("logs", "bytes"):
+            if limits[f"{kind}_burst"] <= 0:
+                limits[f"{kind}_burst"] = limits[f"{kind}_per_sec"]
+
+        with self._lock:
+            self._limits[app_id] = (time.monotonic() + self.config_ttl, limits)
+        return limits
+
+    def _args(self, limits: dict[str, float], logs: int, size: int) -> list:
+        return [
+            limits["logs_per_sec"],
+            limits["logs_burst"],
+            limits["bytes_per_sec"],
+            limits["bytes_burst"],
+            logs,
+            size,
+        ]
+
+    def _cached_denial(self, key: str) -> int | None:
+        denied_until = self._denied_until.get(key)
+        if denied_until is None:
+            return None
+
+        remaining = denied_until - time.monotonic()
+        if remaining > 0:
+            return max(1, math.ceil(remaining))
+        self._denied_until.pop(key, None)
+        return None
+
+    @staticmethod
+    def _unlimited(limits: dict[str, float]) -> bool:
+        return limits["logs_per_sec"] <= 0 and limits["bytes_per_sec"] <= 0
+
+    def _decide(self, key: str, logs: int, size: int, allowed: Any, retry_ms: Any) -> int | None:
+        if int(allowed):
+            return None
+
+        retry_seconds = int(retry_ms) / 1000
+        self._denied_until[key] = time.monotonic() + retry_seconds
+        logging.info(f"Tenant rate limited | key={key} | logs={logs} | bytes={size} | retry_after={retry_seconds}s")
+        return max(1, math.ceil(retry_seconds))
+
+    def check(self, tenant: dict, logs: int = 1, size: int = 0) -> int | None:
+        """
+        Take `logs` log tokens and `size` byte tokens from the tenant's buckets.
+        Returns None when admitted, otherwise the Retry-After in seconds.
+        """
+        key = self._bucket_key(tenant)
+
+        cached = self._cached_denial(key)
+        if cached is not None:
+            return cached
+
+        limits = self.limits_for(str(tenant.get("app_id")))
+        if self._unlimited(limits):
+            return None
+
+        try:
+            client = self.redis_client()
+            if self._script is None:
+                self._script = client.register_script(_TOKEN_BUCKET_LUA)
+
+            allowed, retry_ms = self._script(keys=[key], args=self._args(limits, logs, size), client=client)
+
+        except Exception as e:
+            # never drop logs because the limiter itself is unavailable
+            logging.warning(f"Rate limiter unavailable | admitting | key={key} | error={e}")
+            return None
+
+        return self._decide(key, logs, size, allowed, retry_ms)
+
+    async def check_async(self, tenant: dict, logs: int = 1, size: int = 0) -> int | None:
+        """`check()` over the asyncio Redis client; falls back to `check()` in a thread without one."""
+        if self.async_redis_client is None:
+            return await asyncio.to_thread(self.check, tenant, logs, size)
+
+        key = self._bucket_key(tenant)
+
+        cached = self._cached_denial(key)
+        if cached is not None:
+            return cached
+
+        app_id = str(tenant.get("app_id"))
+        cached_limits = self._limits.get(app_id)
+        if cached_limits and time.monotonic() < cached_limits[0]:
+            limits = cached_limits[1]
+        else:
+            # config reload hits Postgres, keep it off the event loop
+            limits = await self.run_blocking(self.limits_for, app_id)
+        if self._unlimited(limits):
+            return None
+
+        try:
+            client = self.async_redis_client()
+            if self._async_script is None:
+                self._async_script = client.register_script(_TOKEN_BUCKET_LUA)
+
+            allowed, retry_ms = await self._async_script(keys=[key], args=self._args(limits, logs, size), client=client)
+
+        except Exception as e:
+            logging.warning(f"Rate limiter unavailable | admitting | key={key} | error={e}")
+            return None
+
+        return self._decide(key, logs, size, allowed, retry_ms)
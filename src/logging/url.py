@@ -1,65 +1,245 @@
 # url.py
+import json
+import os
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
 
-from src.logging.ingestion import LogIngestionService
+from src.logging.engine import IngestionEngine, get_engine
 from src.models.logs import Logs, SourceInfo
 from src.api_key.dependency import require_api_key
 
 router = APIRouter(prefix="/logging", tags=["cloud", "logging", "ingestion"])
 
+INGEST_BATCH_MAX_ITEMS = int(os.getenv("INGEST_BATCH_MAX_ITEMS", "10000"))
+
+
+def require_admission(
+    response: Response,
+    tenant: dict = Depends(require_api_key),
+    engine: IngestionEngine = Depends(get_engine),
+) -> None:
+    """Reject ingest with 429 while the flush backlog is over its high-water mark."""
+    decision = engine.admission.check()
+    if not decision.admitted:
+        raise HTTPException(
+            status_code=429,
+            detail="Ingest backlog is over capacity, retry later.",
+            headers=decision.headers(),
+        )
+    response.headers.update(decision.headers())
+
+
+async def _enforce_rate_limit(engine: IngestionEngine, tenant: dict, logs: int, size: int) -> None:
+    if engine.async_io:
+        retry_after = await engine.rate_limiter.check_async(tenant, logs=logs, size=size)
+    else:
+        retry_after = await run_in_threadpool(engine.rate_limiter.check, tenant, logs=logs, size=size)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Tenant ingest rate limit exceeded.",
+            headers={"Retry-After": str(retry_after)},
+        )
 
-@router.post("/ingest")
-async def log(log_model: Logs, tenant: dict = Depends(require_api_key)):
-    try:
-        app_id = tenant.get("app_id")
 
-        if log_model.source_info is None:
-            log_model.source_info = SourceInfo(diagnostics={}, source={})
+def _stamp_tenant(log_model: Logs, tenant: dict) -> Logs:
+    app_id = tenant.get("app_id")
 
-        if log_model.source_info.source is None:
-            log_model.source_info.source = {}
+    if log_model.source_info is None:
+        log_model.source_info = SourceInfo(diagnostics={}, source={})
 
-        if not isinstance(log_model.source_info.source, dict):
-            log_model.source_info.source = {"_source": log_model.source_info.source}
+    if log_model.source_info.source is None:
+        log_model.source_info.source = {}
 
-        if log_model.source_info.diagnostics is None:
-            log_model.source_info.diagnostics = {}
+    if not isinstance(log_model.source_info.source, dict):
+        log_model.source_info.source = {"_source": log_model.source_info.source}
 
-        log_model.source_info.source["tenant"] = {
-            "app_id": app_id,
-            "server_id": tenant.get("server_id"),
-        }
+    if log_model.source_info.diagnostics is None:
+        log_model.source_info.diagnostics = {}
 
-        # Stamp app_id at the top level on the log model for direct DB querying
-        log_model.app_id = app_id
-
-        if log_model.server_info is not None:
-            log_model.source_info.source["server"] = {
-                "hostname": log_model.server_info.hostname,
-                "portnumber": log_model.server_info.portnumber,
-            }
-
-        if log_model.request_info is not None:
-            log_model.source_info.diagnostics["request"] = {
-                "request_id": str(log_model.request_info.request_id),
-                "request_type": log_model.request_info.request_type,
-                "session_id": log_model.request_info.session_id,
-            }
-
-        ingestion_service = LogIngestionService(
-            internal_batch_size=1,
-            redis_flush_count=10,
-        )
+    log_model.source_info.source["tenant"] = {
+        "app_id": app_id,
+        "server_id": tenant.get("server_id"),
+    }
 
-        log_object = ingestion_service.ingest_log(log_model)
+    # Stamp app_id at the top level on the log model for direct DB querying
+    log_model.app_id = app_id
 
-        return {
-            "message": "Log received successfully",
-            "tenant": tenant,
-            "log_object": log_object.model_dump(exclude_none=True),
+    if log_model.server_info is not None:
+        log_model.source_info.source["server"] = {
+            "hostname": log_model.server_info.hostname,
+            "portnumber": log_model.server_info.portnumber,
         }
 
+    if log_model.request_info is not None:
+        log_model.source_info.diagnostics["request"] = {
+            "request_id": str(log_model.request_info.request_id),
+            "request_type": log_model.request_info.request_type,
+            "session_id": log_model.request_info.session_id,
+        }
+
+    return log_model
+
+
+def _parse_batch_body(body: bytes, content_type: str | None) -> tuple[list[Any], list[dict[str, Any]]]:
+    """
+    Accept either a JSON array of logs or an NDJSON body (one log per line).
+    Returns the raw items plus per-index parse errors for unreadable NDJSON lines.
+    """
+    content_type = (content_type or "").lower()
+    is_ndjson = "ndjson" in content_type or "jsonlines" in content_type or "json-seq" in content_type
+
+    if not is_ndjson:
+        try:
+            parsed = json.loads(body)
+            if isinstance(parsed, list):
+                return parsed, []
+            if isinstance(parsed, dict):
+                return [parsed], []
+            raise HTTPException(status_code=400, detail="Batch body must be a JSON array or NDJSON.")
+        except json.JSONDecodeError:
+            # not a single JSON document, fall back to NDJSON
+            pass
+
+    items: list[Any] = []
+    errors: list[dict[str, Any]] = []
+    for line in body.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            items.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            errors.append({"index": len(items), "error": f"Invalid JSON: {e.msg}"})
+            items.append(None)
+
+    return items, errors
+
+
+@router.post("/ingest")
+async def log(
+    log_model: Logs,
+    request: Request,
+    tenant: dict = Depends(require_api_key),
+    engine: IngestionEngine = Depends(get_engine),
+    _: None = Depends(require_admission),
+):
+    await _enforce_rate_limit(engine, tenant, logs=1, size=int(request.headers.get("content-length") or 0))
+
+    try:
+        _stamp_tenant(log_model, tenant)
+
+        if engine.async_io:
+            log_object = await engine.ingestion_service.ingest_log_async(log_model)
+        else:
+            log_object = await run_in_threadpool(engine.ingestion_service.ingest_log, log_model)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if log_object is None:
+        raise HTTPException(status_code=503, detail="Log could not be buffered, retry later.")
+
+    return {
+        "message": "Log received successfully",
+        "tenant": tenant,
+        "log_object": log_object.model_dump(exclude_none=True),
+    }
+
+
+@router.post("/ingest/raw")
+async def log_raw(
+    request: Request,
+    tenant: dict = Depends(require_api_key),
+    engine: IngestionEngine = Depends(get_engine),
+    _: None = Depends(require_admission),
+):
+    """
+    Fast lane for a single log: the body is validated once straight from bytes,
+    stamped, serialized once, and those bytes are what Redis and ClickHouse see.
+    """
+    body = await request.body()
+    await _enforce_rate_limit(engine, tenant, logs=1, size=len(body))
+
+    try:
+        log_model = Logs.model_validate_json(body)
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=json.loads(ve.json(include_url=False)))
+
+    _stamp_tenant(log_model, tenant)
+
+    try:
+        body = log_model.model_dump_json(exclude_none=True).encode()
+        if engine.async_io:
+            log_id = await engine.ingestion_service.ingest_raw_async(body, app_id=log_model.app_id)
+        else:
+            log_id = await run_in_threadpool(engine.ingestion_service.ingest_raw, body, app_id=log_model.app_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if log_id is None:
+        raise HTTPException(status_code=503, detail="Log could not be buffered, retry later.")
+
+    return {
+        "message": "Log received successfully",
+        "tenant": tenant,
+        "log_id": log_id,
+    }
+
+
+@router.post("/ingest/batch")
+async def log_batch(
+    request: Request,
+    tenant: dict = Depends(require_api_key),
+    engine: IngestionEngine = Depends(get_engine),
+    _: None = Depends(require_admission),
+):
+    body = await request.body()
+    if not body.strip():
+        raise HTTPException(status_code=400, detail="Empty batch body.")
+
+    items, errors = _parse_batch_body(body, request.headers.get("content-type"))
+    if len(items) > INGEST_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(items)} logs exceeds the limit of {INGEST_BATCH_MAX_ITEMS}.",
+        )
+    # the whole batch is charged in one call
+    await _enforce_rate_limit(engine, tenant, logs=len(items), size=len(body))
+
+    failed_indexes = {err["index"] for err in errors}
+    valid_logs: list[Logs] = []
+    for index, item in enumerate(items):
+        if index in failed_indexes:
+            continue
+        try:
+            valid_logs.append(_stamp_tenant(Logs.model_validate(item), tenant))
+        except ValidationError as ve:
+            errors.append({"index": index, "error": json.loads(ve.json(include_url=False))})
+
+    errors.sort(key=lambda err: err["index"])
+
+    stored = valid_logs
+    try:
+        if valid_logs and engine.async_io:
+            stored = await engine.ingestion_service.ingest_logs_async(valid_logs)
+        elif valid_logs:
+            stored = await run_in_threadpool(engine.ingestion_service.ingest_logs, valid_logs)
+
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if stored is None:
+        raise HTTPException(status_code=503, detail="Batch could not be buffered, retry later.")
+
+    return {
+        "message": "Batch received",
+        "tenant": tenant,
+        "received": len(items),
+        "accepted": len(valid_logs),
+        "rejected": len(errors),
+        "errors": errors,
+    }
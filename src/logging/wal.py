@@ -0,0 +1,305 @@
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Callable, Iterator
+
+from src.utils.utils import logging
+
+# record frame: magic, payload length, crc32(payload)
+_HEADER = struct.Struct("<2sII")
+_MAGIC = b"WL"
+_SEGMENT_PREFIX = "wal-"
+_SEGMENT_SUFFIX = ".seg"
+_CURSOR_SUFFIX = ".cursor"
+
+
+class WriteAheadLog:
+    """
+    Append-only, segment-rotated log on local disk.
+
+    Each segment is a pre-allocated file mapped with mmap; records are framed as
+    `magic | length | crc32 | payload` so a torn write at the tail is detected
+    and ignored on recovery. Used as a spill target when Redis is unavailable.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        segment_bytes: int | None = None,
+        max_disk_bytes: int | None = None,
+        fsync_policy: str | None = None,
+        fsync_interval_ms: int | None = None,
+    ):
+        self.directory = directory or os.getenv("WAL_DIR", "/tmp/cloud-logging-wal")
+        self.segment_bytes = segment_bytes or int(os.getenv("WAL_SEGMENT_BYTES", str(16 * 1024 * 1024)))
+        self.max_disk_bytes = max_disk_bytes or int(os.getenv("WAL_MAX_DISK_BYTES", str(512 * 1024 * 1024)))
+        # "always": msync every append, "interval": at most every fsync_interval_ms, "never": leave it to the OS
+        self.fsync_policy = (fsync_policy or os.getenv("WAL_FSYNC", "interval")).lower()
+        self.fsync_interval = (fsync_interval_ms or int(os.getenv("WAL_FSYNC_INTERVAL_MS", "200"))) / 1000
+
+        self._lock = threading.RLock()
+        self._file = None
+        self._mmap: mmap.mmap | None = None
+        self._path: str | None = None
+        self._offset = 0
+        self._opened_at = time.monotonic()
+        self._last_sync = time.monotonic()
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._recover()
+
+    # ====================== SEGMENTS ======================
+
+    def _segment_paths(self) -> list[str]:
+        names = sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX)
+        )
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _next_segment_path(self) -> str:
+        paths = self._segment_paths()
+        last_seq = int(os.path.basename(paths[-1])[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)]) if paths else 0
+        return os.path.join(self.directory, f"{_SEGMENT_PREFIX}{last_seq + 1:012d}{_SEGMENT_SUFFIX}")
+
+    def disk_usage(self) -> int:
+        total = 0
+        for path in self._segment_paths():
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                continue
+        return total
+
+    def _open_segment(self, path: str, size: int | None = None) -> None:
+        exists = os.path.exists(path)
+        self._file = open(path, "r+b" if exists else "w+b")
+        if not exists:
+            self._file.truncate(size or self.segment_bytes)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._path = path
+        self._offset = 0
+        self._opened_at = time.monotonic()
+
+    def _close_segment(self) -> None:
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap.close()
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+            self._file.close()
+        self._mmap, self._file, self._path, self._offset = None, None, None, 0
+
+    def _recover(self) -> None:
+        # the newest segment becomes the active one, find where its records end
+        paths = self._segment_paths()
+        if not paths:
+            return
+
+        self._open_segment(paths[-1])
+        for _, end in self._scan(self._mmap, 0):
+            self._offset = end
+
+    @staticmethod
+    def _scan(buffer, start: int) -> Iterator[tuple[bytes, int]]:
+        """Yield (payload, end_offset) for every intact record from `start`."""
+        offset = start
+        size = len(buffer)
+        while offset + _HEADER.size <= size:
+            magic, length, crc = _HEADER.unpack_from(buffer, offset)
+            if magic != _MAGIC:
+                return
+
+            end = offset + _HEADER.size + length
+            if end > size:
+                return
+
+            payload = bytes(buffer[offset + _HEADER.size:end])
+            if zlib.crc32(payload) != crc:
+                logging.warning(f"WAL record failed CRC check, treating as end of segment | offset={offset}")
+                return
+
+            yield payload, end
+            offset = end
+
+    # ====================== WRITE ======================
+
+    def append(self, payload: bytes) -> bool:
+        """Append one record. Returns False when the disk limit would be exceeded."""
+        record_size = _HEADER.size + len(payload)
+
+        with self._lock:
+            try:
+                if self._mmap is None or self._offset + record_size > len(self._mmap):
+                    new_size = max(self.segment_bytes, record_size)
+                    if self.disk_usage() + new_size > self.max_disk_bytes:
+                        logging.error(
+                            f"WAL disk limit reached, record dropped | usage={self.disk_usage()} | limit={self.max_disk_bytes}"
+                        )
+                        return False
+                    self._rotate(new_size)
+
+                _HEADER.pack_into(self._mmap, self._offset, _MAGIC, len(payload), zlib.crc32(payload))
+                self._mmap[self._offset + _HEADER.size:self._offset + record_size] = payload
+                self._offset += record_size
+                self._maybe_sync()
+                return True
+
+            except Exception as e:
+                logging.exception(f"WAL append failed | error={e}")
+                return False
+
+    def _rotate(self, size: int | None = None) -> None:
+        self._close_segment()
+        self._open_segment(self._next_segment_path(), size=size)
+        logging.info(f"WAL segment opened | path={self._path}")
+
+    def _maybe_sync(self) -> None:
+        if self.fsync_policy == "always":
+            self._mmap.flush()
+            self._last_sync = time.monotonic()
+        elif self.fsync_policy == "interval" and time.monotonic() - self._last_sync >= self.fsync_interval:
+            self._mmap.flush()
+            self._last_sync = time.monotonic()
+
+    def seal(self, min_age: float = 0.0) -> None:
+        """
+        Close the active segment if it holds records and was opened at least
+        `min_age` seconds ago, so it can be replayed.
+        """
+        with self._lock:
+            if self._mmap is None or self._offset == 0:
+                return
+            if time.monotonic() - self._opened_at >= min_age:
+                self._close_segment()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_segment()
+
+    # ====================== READ ======================
+
+    def sealed_segments(self) -> list[str]:
+        with self._lock:
+            return [path for path in self._segment_paths() if path != self._path]
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            return bool(self.sealed_segments()) or self._offset > 0
+
+    def read_segment(self, path: str, start: int = 0) -> Iterator[tuple[bytes, int]]:
+        with open(path, "rb") as f:
+            if os.path.getsize(path) == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield from self._scan(buffer, start)
+
+    @staticmethod
+    def read_cursor(path: str) -> int:
+        try:
+            with open(path + _CURSOR_SUFFIX, "r") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    @staticmethod
+    def write_cursor(path: str, offset: int) -> None:
+        tmp_path = path + _CURSOR_SUFFIX + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path + _CURSOR_SUFFIX)
+
+    def remove_segment(self, path: str) -> None:
+        for target in (path, path + _CURSOR_SUFFIX):
+            try:
+                os.remove(target)
+            except FileNotFoundError:
+                pass
+
+
+class WALReplayer:
+    """
+    Drains sealed WAL segments back into the pipeline once a sink accepts them.
+
+    `sink` receives a list of record payloads and returns True when they are
+    safely stored. Progress within a segment is checkpointed after every batch
+    so a failure part-way through never replays already-delivered records.
+    """
+
+    def __init__(
+        self,
+        wal: WriteAheadLog,
+        sink: Callable[[list[bytes]], bool],
+        batch_size: int | None = None,
+        interval: float | None = None,
+    ):
+        self.wal = wal
+        self.sink = sink
+        self.batch_size = batch_size or int(os.getenv("WAL_REPLAY_BATCH_SIZE", "1000"))
+        self.interval = interval or float(os.getenv("WAL_REPLAY_INTERVAL_SECONDS", "5"))
+        # every seal means a freshly preallocated segment on the next spill, so not every pass
+        self.seal_after = float(os.getenv("WAL_SEAL_AFTER_SECONDS", "30"))
+
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def replay(self) -> int:
+        if not self.wal.has_pending():
+            return 0
+
+        if not self.wal.sealed_segments():
+            self.wal.seal(min_age=self.seal_after)
+        replayed = 0
+
+        for path in self.wal.sealed_segments():
+            offset = self.wal.read_cursor(path)
+            batch: list[bytes] = []
+            batch_end = offset
+
+            for payload, end in self.wal.read_segment(path, start=offset):
+                batch.append(payload)
+                batch_end = end
+                if len(batch) >= self.batch_size:
+                    if not self.sink(batch):
+                        return replayed
+                    replayed += len(batch)
+                    self.wal.write_cursor(path, batch_end)
+                    batch = []
+
+            if batch:
+                if not self.sink(batch):
+                    return replayed
+                replayed += len(batch)
+
+            self.wal.remove_segment(path)
+            logging.info(f"WAL segment replayed | path={path}")
+
+        if replayed:
+            logging.info(f"WAL replay completed | records={replayed}")
+        return replayed
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="wal-replayer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(timeout=self.interval):
+            try:
+                self.replay()
+            except Exception as e:
+                logging.exception(f"WAL replay failed | error={e}")
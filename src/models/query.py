@@ -0,0 +1,69 @@
+import os
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+QUERY_MAX_PAGE_SIZE = int(os.getenv("QUERY_MAX_PAGE_SIZE", "1000"))
+EXPORT_MAX_ROWS = int(os.getenv("EXPORT_MAX_ROWS", "10000000"))
+
+
+class LogFilters(BaseModel):
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+    event_type: Optional[str] = None
+    event_name: Optional[str] = None
+    event_category: Optional[str] = None
+    severity_level: Optional[str] = None
+    status_code: Optional[int] = None
+    session_id: Optional[str] = None
+
+
+class LogQuery(LogFilters):
+    limit: int = Field(default=100, ge=1, le=QUERY_MAX_PAGE_SIZE)
+    cursor: Optional[str] = None
+
+
+class LogExportQuery(LogFilters):
+    limit: Optional[int] = Field(default=None, ge=1, le=EXPORT_MAX_ROWS)
+    # comma-separated column names; all stored columns when omitted
+    columns: Optional[str] = None
+
+
+class LogPage(BaseModel):
+    count: int
+    logs: list[dict]
+    next_cursor: Optional[str] = None
+
+
+class LogSearchQuery(LogQuery):
+    q: str = Field(min_length=1, max_length=256)
+    # tokens: every word matches; phrase: the exact text; prefix: like tokens, last word is a prefix
+    mode: Literal["tokens", "phrase", "prefix"] = "tokens"
+
+
+class LogSearchPage(LogPage):
+    total: int
+    # true when `total` stopped at SEARCH_COUNT_CAP
+    total_is_estimate: bool = False
+
+
+class LogStatsQuery(BaseModel):
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    # picked from the range when omitted
+    grain: Optional[Literal["1m", "1h", "1d"]] = None
+    # comma-separated subset of event_type, severity_level, status_code
+    group_by: Optional[str] = None
+
+    event_type: Optional[str] = None
+    severity_level: Optional[str] = None
+    status_code: Optional[int] = None
+
+
+class LogStats(BaseModel):
+    grain: str
+    start: datetime
+    end: datetime
+    series: list[dict]
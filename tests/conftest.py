@@ -0,0 +1,277 @@
+import fnmatch
+import time
+from types import SimpleNamespace
+
+import pytest
+import redis
+
+
+def _stream_id(entry_id) -> tuple[int, int]:
+    ms, _, seq = (entry_id.decode() if isinstance(entry_id, bytes) else str(entry_id)).partition("-")
+    return int(ms), int(seq or 0)
+
+
+def _bytes(value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, bytearray):
+        return bytes(value)
+    return str(value).encode()
+
+
+class FakePipeline:
+    def __init__(self, client: "FakeRedis"):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+
+        def queue(*args, **kwargs):
+            self.calls.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self, raise_on_error: bool = True):
+        calls, self.calls = self.calls, []
+        results = []
+        for method, args, kwargs in calls:
+            try:
+                results.append(method(*args, **kwargs))
+            except Exception as e:
+                if raise_on_error:
+                    raise
+                results.append(e)
+        return results
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the redis-py client, covering the commands the
+    buffer, hot index and query cache use. Values come back as bytes, like
+    a client without decode_responses.
+    """
+
+    def __init__(self):
+        self.strings: dict[str, bytes] = {}
+        self.hashes: dict[str, dict[str, bytes]] = {}
+        self.zsets: dict[str, dict[str, float]] = {}
+        self.sets: dict[str, set[str]] = {}
+        # stream key -> [(entry id, fields)], (stream key, group) -> group state
+        self.streams: dict[str, list[tuple[str, dict[bytes, bytes]]]] = {}
+        self.groups: dict[tuple[str, str], dict] = {}
+
+    def pipeline(self, transaction: bool = False) -> FakePipeline:
+        return FakePipeline(self)
+
+    # strings
+    def get(self, key):
+        return self.strings.get(key)
+
+    def set(self, key, value, px=None):
+        self.strings[key] = _bytes(value)
+        return True
+
+    def mget(self, keys):
+        return [self.strings.get(key) for key in keys]
+
+    def mset(self, mapping):
+        for key, value in mapping.items():
+            self.strings[key] = _bytes(value)
+        return True
+
+    def incrby(self, key, amount):
+        value = int(self.strings.get(key, b"0")) + amount
+        self.strings[key] = _bytes(value)
+        return value
+
+    def incr(self, key):
+        return self.incrby(key, 1)
+
+    def decrby(self, key, amount):
+        return self.incrby(key, -amount)
+
+    def delete(self, *keys):
+        deleted = 0
+        for key in keys:
+            for store in (self.strings, self.hashes, self.zsets, self.sets):
+                if store.pop(key, None) is not None:
+                    deleted += 1
+        return deleted
+
+    def expire(self, key, seconds):
+        return True
+
+    def scan_iter(self, match=None, count=None, _type=None):
+        stores = {"STRING": self.strings, "HASH": self.hashes, "ZSET": self.zsets, "SET": self.sets}
+        for type_name, store in stores.items():
+            if _type is not None and _type != type_name:
+                continue
+            for key in list(store):
+                if match is None or fnmatch.fnmatchcase(key, match):
+                    yield key.encode()
+
+    # hashes
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update({field: _bytes(value) for field, value in mapping.items()})
+        return len(mapping)
+
+    def hmget(self, key, fields):
+        stored = self.hashes.get(key, {})
+        return [stored.get(field) for field in fields]
+
+    def hdel(self, key, *fields):
+        stored = self.hashes.get(key, {})
+        return sum(1 for field in fields if stored.pop(field, None) is not None)
+
+    def hincrby(self, key, field, amount):
+        stored = self.hashes.setdefault(key, {})
+        stored[field] = _bytes(int(stored.get(field, b"0")) + amount)
+        return int(stored[field])
+
+    def hgetall(self, key):
+        return {field.encode(): value for field, value in self.hashes.get(key, {}).items()}
+
+    # sorted sets
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+        return len(mapping)
+
+    def zrem(self, key, *members):
+        stored = self.zsets.get(key, {})
+        return sum(1 for member in members if stored.pop(member, None) is not None)
+
+    def zrevrangebyscore(self, key, max, min, start=None, num=None):
+        def bound(value, default):
+            value = str(value)
+            if value in ("+inf", "-inf"):
+                return default, False
+            if value.startswith("("):
+                return float(value[1:]), True
+            return float(value), False
+
+        high, high_open = bound(max, float("inf"))
+        low, low_open = bound(min, float("-inf"))
+        members = [
+            (score, member) for member, score in self.zsets.get(key, {}).items()
+            if (score > low if low_open else score >= low) and (score < high if high_open else score <= high)
+        ]
+        members.sort(reverse=True)
+        members = members[start or 0:]
+        if num is not None:
+            members = members[:num]
+        return [member.encode() for _, member in members]
+
+    # sets
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+        return len(members)
+
+    def smembers(self, key):
+        return {member.encode() for member in self.sets.get(key, set())}
+
+    # streams, with a single-node consumer group model: a pending entry list
+    # per group, delivery times for XAUTOCLAIM and MINID trimming
+    def _entry(self, key, entry_id):
+        return next(((i, f) for i, f in self.streams.get(key, []) if i == entry_id), None)
+
+    def xgroup_create(self, name, groupname, id="0", mkstream=False):
+        if (name, groupname) in self.groups:
+            raise redis.exceptions.ResponseError("BUSYGROUP Consumer Group name already exists")
+        self.streams.setdefault(name, [])
+        self.groups[(name, groupname)] = {"last": "0-0", "pending": {}}
+        return True
+
+    def xadd(self, name, fields):
+        entries = self.streams.setdefault(name, [])
+        ms = int(time.time() * 1000)
+        last_ms, last_seq = _stream_id(entries[-1][0]) if entries else (0, -1)
+        entry_id = f"{last_ms}-{last_seq + 1}" if ms <= last_ms else f"{ms}-0"
+        entries.append((entry_id, {_bytes(k): _bytes(v) for k, v in fields.items()}))
+        return entry_id.encode()
+
+    def xlen(self, name):
+        return len(self.streams.get(name, []))
+
+    def xrange(self, name, min="-", max="+", count=None):
+        low = (0, 0) if min == "-" else _stream_id(min)
+        high = (float("inf"), 0) if max == "+" else _stream_id(max)
+        found = [(i.encode(), f) for i, f in self.streams.get(name, []) if low <= _stream_id(i) <= high]
+        return found[:count] if count is not None else found
+
+    def xreadgroup(self, groupname, consumername, streams, count=None):
+        response = []
+        for name in streams:
+            group = self.groups[(name, groupname)]
+            fresh = [(i, f) for i, f in self.streams.get(name, []) if _stream_id(i) > _stream_id(group["last"])]
+            fresh = fresh[:count] if count is not None else fresh
+            for entry_id, _ in fresh:
+                group["pending"][entry_id] = (consumername, time.monotonic())
+                group["last"] = entry_id
+            if fresh:
+                response.append([name.encode(), [(i.encode(), f) for i, f in fresh]])
+        return response
+
+    def xautoclaim(self, name, groupname, consumername, min_idle_time, start_id="0-0", count=None):
+        group = self.groups[(name, groupname)]
+        claimed = []
+        for entry_id, (_, delivered) in sorted(group["pending"].items(), key=lambda item: _stream_id(item[0])):
+            if count is not None and len(claimed) >= count:
+                break
+            if (time.monotonic() - delivered) * 1000 < min_idle_time or _stream_id(entry_id) < _stream_id(start_id):
+                continue
+            group["pending"][entry_id] = (consumername, time.monotonic())
+            entry = self._entry(name, entry_id)
+            claimed.append((entry_id.encode(), entry[1] if entry else None))
+        return [b"0-0", claimed, []]
+
+    def xack(self, name, groupname, *entry_ids):
+        pending = self.groups[(name, groupname)]["pending"]
+        return sum(1 for entry_id in entry_ids if pending.pop(_bytes(entry_id).decode(), None) is not None)
+
+    def xpending(self, name, groupname):
+        pending = sorted(self.groups[(name, groupname)]["pending"], key=_stream_id)
+        if not pending:
+            return {"pending": 0, "min": None, "max": None, "consumers": []}
+        return {"pending": len(pending), "min": pending[0].encode(), "max": pending[-1].encode(), "consumers": []}
+
+    def xinfo_groups(self, name):
+        return [
+            {"name": group_name.encode(), "last-delivered-id": group["last"].encode(), "pending": len(group["pending"])}
+            for (stream, group_name), group in self.groups.items() if stream == name
+        ]
+
+    def xtrim(self, name, minid, approximate=True):
+        entries = self.streams.get(name, [])
+        kept = [(i, f) for i, f in entries if _stream_id(i) >= _stream_id(minid)]
+        self.streams[name] = kept
+        return len(entries) - len(kept)
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis()
+
+
+def _redis_services(monkeypatch, fake_redis, mode: str):
+    monkeypatch.setenv("REDIS_BUFFER_MODE", mode)
+    monkeypatch.setenv("REDIS_CODEC", "json")
+    monkeypatch.setenv("REDIS_CODEC_COMPRESSION", "none")
+
+    from src.db.redis import services
+
+    monkeypatch.setattr(services, "Initialise", lambda: SimpleNamespace(redis_client=fake_redis))
+    return services.RedisServices()
+
+
+@pytest.fixture
+def redis_services(monkeypatch, fake_redis):
+    """RedisServices in keys mode on top of FakeRedis, with a plain JSON codec."""
+    return _redis_services(monkeypatch, fake_redis, "keys")
+
+
+@pytest.fixture
+def stream_services(monkeypatch, fake_redis):
+    """RedisServices in stream mode on top of FakeRedis, with a plain JSON codec."""
+    return _redis_services(monkeypatch, fake_redis, "stream")
@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from src.logging.admission import AdmissionController
+from src.logging.url import require_admission
+
+
+class Backlog:
+    def __init__(self, count: int = 0, size: int = 0):
+        self.value = (count, size)
+
+    def __call__(self) -> tuple[int, int]:
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+
+def _controller(backlog: Backlog, drain_rate=None) -> AdmissionController:
+    return AdmissionController(
+        backlog=backlog,
+        drain_rate=drain_rate,
+        max_count=1000,
+        max_bytes=1_000_000,
+        resume_ratio=0.8,
+        cache_seconds=0,
+        min_retry_after=1,
+        max_retry_after=60,
+    )
+
+
+def test_sheds_over_the_mark_until_back_under_the_resume_mark():
+    backlog = Backlog(999)
+    controller = _controller(backlog)
+    assert controller.check().admitted
+
+    backlog.value = (1000, 0)
+    assert not controller.check().admitted
+    # between the resume mark and the high-water mark: still shedding
+    backlog.value = (900, 0)
+    assert not controller.check().admitted
+    backlog.value = (799, 0)
+    assert controller.check().admitted
+
+
+def test_byte_mark_sheds_too():
+    assert not _controller(Backlog(1, 1_000_000)).check().admitted
+
+
+def test_retry_after_follows_the_drain_rate():
+    decision = _controller(Backlog(1400), drain_rate=lambda: 100.0).check()
+    # 600 logs above the resume mark at 100 logs/s
+    assert decision.retry_after == 6
+    assert decision.headers()["Retry-After"] == "6"
+
+    assert _controller(Backlog(1400), drain_rate=lambda: None).check().retry_after == 60
+
+
+def test_unreadable_backlog_admits():
+    backlog = Backlog()
+    backlog.value = ConnectionError("redis is down")
+    assert _controller(backlog).check().admitted
+
+
+def test_ingest_is_rejected_with_429_and_retry_after():
+    engine = SimpleNamespace(admission=_controller(Backlog(5000), drain_rate=lambda: 1000.0))
+    with pytest.raises(HTTPException) as excinfo:
+        require_admission(SimpleNamespace(headers={}), tenant={}, engine=engine)
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.headers["Retry-After"] == "5"
+
+    response = SimpleNamespace(headers={})
+    engine.admission = _controller(Backlog(10, 100))
+    require_admission(response, tenant={}, engine=engine)
+    assert response.headers == {"X-Backlog-Count": "10", "X-Backlog-Bytes": "100"}
+
+
+def test_failed_buffer_writes_are_not_counted(fake_redis, redis_services, monkeypatch):
+    set_key = fake_redis.set
+
+    def set_or_fail(key, value, px=None):
+        if key.endswith("log-2"):
+            raise ConnectionError("write rejected")
+        return set_key(key, value, px=px)
+
+    monkeypatch.setattr(fake_redis, "set", set_or_fail)
+    payloads = [(f"log-{n}", {"app_id": "app", "timestamp": "2026-01-01T00:00:00"}) for n in range(3)]
+    assert redis_services.buffer_logs(payloads) == 2
+
+    count, size = redis_services.backlog()
+    assert count == 2
+    assert size == sum(len(value) for key, value in fake_redis.strings.items() if key.startswith("logs:buf:"))
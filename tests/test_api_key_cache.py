@@ -0,0 +1,82 @@
+import pytest
+
+from src.api_key import cache as cache_module
+from src.api_key.cache import APIKeyCache
+
+VALID = (True, "app", "server")
+INVALID = (False, None, None)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def _cache(fake_redis=None) -> APIKeyCache:
+    redis_client = (lambda: fake_redis) if fake_redis is not None else None
+    return APIKeyCache(redis_client=redis_client, ttl=300, negative_ttl=10)
+
+
+def test_keys_are_cached_by_digest_only(fake_redis):
+    cache = _cache(fake_redis)
+    cache.set("secret-key", VALID)
+
+    assert cache.get("secret-key") == VALID
+    assert not any("secret-key" in key for key in fake_redis.strings)
+
+
+def test_negative_entries_expire_after_the_negative_ttl(clock):
+    cache = _cache()
+    cache.set("good-key", VALID)
+    cache.set("unknown-key", INVALID)
+    assert cache.get("unknown-key") == INVALID
+
+    clock.now += 11
+    assert cache.get("unknown-key") is None
+    assert cache.get("good-key") == VALID
+
+
+def test_other_instances_read_through_redis(fake_redis):
+    _cache(fake_redis).set("good-key", VALID)
+    other = _cache(fake_redis)
+
+    assert other.get_local("good-key") is None
+    assert other.get("good-key") == VALID
+    assert other.get_local("good-key") == VALID
+
+
+def test_invalidate_drops_the_local_and_the_shared_entry(fake_redis, clock):
+    cache = _cache(fake_redis)
+    other = _cache(fake_redis)
+    cache.set("new-key", INVALID)
+    assert other.get("new-key") == INVALID
+
+    cache.invalidate("new-key")
+    assert cache.get("new-key") is None
+    assert _cache(fake_redis).get("new-key") is None
+
+    # an instance that already copied the entry keeps it for local_ttl at most
+    assert other.get("new-key") == INVALID
+    clock.now += other.local_ttl
+    assert other.get("new-key") is None
+
+
+def test_local_layer_evicts_the_least_recently_used(clock):
+    cache = APIKeyCache(max_size=2, ttl=300, negative_ttl=10)
+    cache.set("a", VALID)
+    cache.set("b", VALID)
+    cache.get("a")
+    cache.set("c", VALID)
+
+    assert cache.get("a") == VALID
+    assert cache.get("b") is None
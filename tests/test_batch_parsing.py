@@ -0,0 +1,34 @@
+import pytest
+from fastapi import HTTPException
+
+from src.logging.url import _parse_batch_body
+
+
+def test_json_array_body():
+    items, errors = _parse_batch_body(b'[{"a": 1}, {"a": 2}]', "application/json")
+    assert items == [{"a": 1}, {"a": 2}]
+    assert errors == []
+
+
+def test_single_json_object_body():
+    assert _parse_batch_body(b'{"a": 1}', None) == ([{"a": 1}], [])
+
+
+def test_ndjson_body_reports_bad_lines_by_index():
+    body = b'{"a": 1}\n\nnot json\n{"a": 3}\n'
+    items, errors = _parse_batch_body(body, "application/x-ndjson")
+
+    assert items == [{"a": 1}, None, {"a": 3}]
+    assert [err["index"] for err in errors] == [1]
+
+
+def test_json_content_type_falls_back_to_ndjson():
+    items, errors = _parse_batch_body(b'{"a": 1}\n{"a": 2}', "application/json")
+    assert items == [{"a": 1}, {"a": 2}]
+    assert errors == []
+
+
+def test_json_scalar_body_is_rejected():
+    with pytest.raises(HTTPException) as excinfo:
+        _parse_batch_body(b"42", "application/json")
+    assert excinfo.value.status_code == 400
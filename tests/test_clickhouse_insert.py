@@ -0,0 +1,78 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from src.db.clickhouse import services
+
+APP_ID = "8f0c5a56-6c1d-4a2e-9c55-3f1b6a0e2d11"
+LOGS_TABLE = [
+    ("log_id", "UUID", "DEFAULT"),
+    ("app_id", "Nullable(UUID)", ""),
+    ("event_type", "LowCardinality(String)", ""),
+    ("request_info", "String", ""),
+    ("severity_level", "String", "MATERIALIZED"),
+]
+
+
+class FakeClient:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.inserts: list[dict] = []
+        self.commands: list[str] = []
+
+    def query(self, query, parameters=None, settings=None):
+        return SimpleNamespace(result_rows=LOGS_TABLE)
+
+    def insert(self, **kwargs):
+        if self.fail:
+            raise RuntimeError("insert rejected")
+        self.inserts.append(kwargs)
+
+    def command(self, query, settings=None):
+        if self.fail:
+            raise RuntimeError("insert rejected")
+        self.commands.append(query)
+
+
+@pytest.fixture
+def clickhouse(monkeypatch):
+    def build(insert_mode: str = "native", fail: bool = False) -> services.ClickHouseServices:
+        monkeypatch.setenv("CLICKHOUSE_INSERT_MODE", insert_mode)
+        client = FakeClient(fail=fail)
+        monkeypatch.setattr(services, "Initialise", lambda: SimpleNamespace(client=client))
+        return services.ClickHouseServices()
+
+    return build
+
+
+def test_native_insert_sends_one_array_per_column(clickhouse):
+    service = clickhouse()
+    log_id = str(uuid.uuid4())
+    entries = [
+        {log_id: {"log_id": log_id, "app_id": APP_ID, "event_type": "click", "request_info": {"status_code": 200}}},
+        {"other": {"event_type": "view"}},
+    ]
+
+    assert service.insert_log(entries) == 2
+    [insert] = service.init.client.inserts
+    # the MATERIALIZED column is computed by the server and never sent
+    assert insert["column_names"] == ["log_id", "app_id", "event_type", "request_info"]
+    log_ids, app_ids, event_types, request_infos = insert["data"]
+    assert log_ids[0] == uuid.UUID(log_id) and isinstance(log_ids[1], uuid.UUID)
+    assert app_ids == [uuid.UUID(APP_ID), None]
+    assert event_types == ["click", "view"]
+    assert request_infos == ['{"status_code": 200}', ""]
+
+
+@pytest.mark.parametrize("insert_mode", ["native", "sql"])
+def test_failed_insert_is_not_reported_as_written(clickhouse, insert_mode):
+    service = clickhouse(insert_mode, fail=True)
+    assert service.insert_log([{"log-1": {"app_id": APP_ID, "event_type": "click"}}]) is None
+
+
+def test_sql_insert_reports_written_rows(clickhouse):
+    service = clickhouse("sql")
+    assert service.insert_log([{"log-1": {"event_type": "click"}}, {"log-2": {"event_type": "view"}}]) == 2
+    [command] = service.init.client.commands
+    assert command.startswith("INSERT INTO logs")
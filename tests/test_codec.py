@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from src.db.redis.codec import FORMAT_VERSION, PayloadCodec, decode_payload, payload_to_json_bytes
+
+PAYLOAD = {"log_id": "log-1", "app_id": "app", "message_info": {"message": "héllo"}, "status_code": 200}
+
+
+def test_default_codec_writes_legacy_json():
+    codec = PayloadCodec()
+    encoded = codec.encode(PAYLOAD)
+
+    assert codec.is_legacy
+    assert json.loads(encoded) == PAYLOAD
+    assert decode_payload(encoded) == PAYLOAD
+    assert decode_payload(encoded.decode()) == PAYLOAD
+
+
+def test_tagged_payload_round_trips():
+    pytest.importorskip("orjson")
+    codec = PayloadCodec(serializer="orjson")
+    encoded = codec.encode(PAYLOAD)
+
+    assert encoded[:3] == bytes([FORMAT_VERSION, 2, 0])
+    assert decode_payload(encoded) == PAYLOAD
+    assert json.loads(payload_to_json_bytes(encoded)) == PAYLOAD
+
+
+@pytest.mark.parametrize("compression,module", [("zstd", "zstandard"), ("lz4", "lz4.frame")])
+def test_compressed_payload_round_trips(compression, module):
+    pytest.importorskip(module)
+    codec = PayloadCodec(compression=compression)
+    encoded = codec.encode(PAYLOAD)
+
+    assert encoded[0] == FORMAT_VERSION
+    assert decode_payload(encoded) == PAYLOAD
+
+    body = json.dumps(PAYLOAD).encode()
+    assert payload_to_json_bytes(codec.encode_json_bytes(body)) == body
+
+
+def test_json_bytes_are_not_reparsed():
+    body = b'{"log_id": "log-1",  "message_info": {"message": "kept as sent"}}'
+
+    assert PayloadCodec().encode_json_bytes(body) is body
+    assert payload_to_json_bytes(body) is body
+
+
+def test_legacy_non_json_text_decodes_as_text():
+    assert decode_payload(b"plain text") == "plain text"
+    assert decode_payload(None) is None
+
+
+def test_unknown_header_ids_are_rejected():
+    with pytest.raises(ValueError):
+        decode_payload(bytes([FORMAT_VERSION, 99, 0]) + b"{}")
+    with pytest.raises(ValueError):
+        decode_payload(bytes([FORMAT_VERSION, 1, 99]) + b"{}")
+    with pytest.raises(ValueError):
+        PayloadCodec(serializer="yaml")
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+from src.logging.flusher import BackgroundFlusher
+
+
+class FakeBuffer:
+    buffer_mode = "keys"
+
+    def __init__(self):
+        self.count = 0
+        self.size = 0
+
+    def backlog(self) -> tuple[int, int]:
+        return self.count, self.size
+
+    def oldest_buffered_age(self):
+        return None
+
+
+class FakeIngestion:
+    consumer_name = "test"
+    drain_batch_size = 10
+
+    def __init__(self):
+        self.redis_services = FakeBuffer()
+        self.on_buffered = None
+        self.drained = threading.Event()
+
+    def drain_redis_to_clickhouse(self, consumer=None) -> int:
+        flushed = min(self.redis_services.count, self.drain_batch_size)
+        self.redis_services.count -= flushed
+        if flushed:
+            self.drained.set()
+        return flushed
+
+
+@pytest.fixture
+def flusher():
+    return BackgroundFlusher(
+        FakeIngestion(), max_batch_size=100, max_age_seconds=60, max_bytes=1000, poll_interval=30, jitter=0,
+    )
+
+
+def test_triggers_on_size_bytes_and_age(flusher):
+    buffer = flusher.redis_services
+    assert flusher._trigger() is None
+
+    buffer.count, buffer.size = 10, 10
+    assert flusher._trigger() is None
+
+    buffer.count = 100
+    assert flusher._trigger() == "size"
+
+    buffer.count, buffer.size = 10, 1000
+    assert flusher._trigger() == "bytes"
+
+    # keys mode has no oldest entry: the age runs from the last drain
+    buffer.size = 10
+    flusher._last_flush -= 61
+    assert flusher._trigger() == "age"
+
+
+def test_flush_now_drains_every_batch_and_records_the_rate(flusher):
+    flusher.redis_services.count = 25
+    assert flusher.flush_now() == 25
+    assert flusher.redis_services.count == 0
+    assert flusher.drain_rate() > 0
+
+
+def test_notify_wakes_a_worker_before_the_poll_interval(flusher):
+    flusher.start()
+    try:
+        assert flusher.ingestion_service.on_buffered == flusher.notify
+        flusher.redis_services.count = 100
+        flusher.notify()
+        assert flusher.ingestion_service.drained.wait(timeout=5)
+    finally:
+        flusher.stop(final_flush=False)
+
+
+@pytest.mark.parametrize("final_flush,left", [(True, 0), (False, 5)])
+def test_stop_joins_workers_and_flushes_what_is_left(flusher, final_flush, left):
+    flusher.start()
+    flusher.redis_services.count = 5
+
+    start = time.monotonic()
+    flusher.stop(final_flush=final_flush)
+    # woken, not left to sleep out the 30s poll interval
+    assert time.monotonic() - start < 5
+    assert flusher.ingestion_service.on_buffered is None
+    assert flusher.redis_services.count == left
@@ -0,0 +1,28 @@
+from src.logging.ingestion import LogIngestionService
+from src.models.logs import Logs
+
+APP_ID = "8f0c5a56-6c1d-4a2e-9c55-3f1b6a0e2d11"
+
+
+def _service(redis_services) -> LogIngestionService:
+    # no WAL: a failed Redis write has nowhere else to go
+    return LogIngestionService(redis_services=redis_services, click_house_services=object())
+
+
+def test_buffered_batch_is_reported_stored(redis_services):
+    service = _service(redis_services)
+    logs = [Logs(app_id=APP_ID), Logs(app_id=APP_ID)]
+
+    assert service.ingest_logs(logs) == logs
+    assert redis_services.buffered_count() == 2
+    assert service.batch_caching.cache == []
+
+
+def test_unbuffered_log_is_reported_lost(redis_services, monkeypatch):
+    service = _service(redis_services)
+    monkeypatch.setattr(redis_services, "buffer_logs", lambda log_pairs: None)
+
+    assert service.ingest_log(Logs(app_id=APP_ID)) is None
+    assert service.ingest_logs([Logs(app_id=APP_ID)]) is None
+    # a failed log must not ride along with the next request's batch
+    assert service.batch_caching.cache == []
@@ -0,0 +1,90 @@
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from src.fetch.query import LogQueryService, decode_cursor, encode_cursor
+from src.models.query import LogQuery
+
+APP_ID = "8f0c5a56-6c1d-4a2e-9c55-3f1b6a0e2d11"
+SECOND_US = int(datetime(2026, 1, 1, 0, 0, 5, tzinfo=timezone.utc).timestamp() * 1_000_000)
+
+
+class FakeClickHouse:
+    """Answers the page query with fixed rows, already in ClickHouse order."""
+
+    def __init__(self, rows: list[dict], timestamp_type: str = "DateTime"):
+        self.rows = rows
+        self.columns = [("log_id", "UUID", ""), ("app_id", "UUID", ""), ("timestamp", timestamp_type, "")]
+        self.queries: list[tuple[str, dict]] = []
+        self.init = SimpleNamespace(client=SimpleNamespace(query=self._query))
+
+    def describe_table(self, table):
+        return self.columns
+
+    def table_schema(self, table):
+        return [(name, ch_type) for name, ch_type, _ in self.columns]
+
+    def _query(self, query, parameters=None, settings=None):
+        self.queries.append((query, parameters))
+        rows = [dict(row) for row in self.rows]
+        return SimpleNamespace(named_results=lambda: iter(rows))
+
+
+def _ch_row(log_id: str) -> dict:
+    return {
+        "log_id": uuid.UUID(log_id),
+        "app_id": uuid.UUID(APP_ID),
+        "timestamp": datetime(2026, 1, 1, 0, 0, 5),
+        "_cursor_us": SECOND_US,
+    }
+
+
+def test_cursor_round_trips():
+    log_id = str(uuid.uuid4())
+    assert decode_cursor(encode_cursor(SECOND_US, log_id)) == (SECOND_US, log_id)
+    assert decode_cursor(encode_cursor(SECOND_US, uuid.UUID(log_id))) == (SECOND_US, log_id)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(SECOND_US, "not-a-uuid")])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_buffered_logs_merge_in_clickhouse_order(redis_services):
+    # four logs in the same second, two flushed and two still buffered
+    ids = sorted(str(uuid.uuid4()) for _ in range(4))
+    redis_services.buffer_logs([
+        # cut to the whole second like the DateTime column, so it sorts by log_id alone
+        (ids[0], {"app_id": APP_ID, "timestamp": "2026-01-01T00:00:05.700000"}),
+        (ids[2], {"app_id": APP_ID, "timestamp": "2026-01-01T00:00:05"}),
+        # flushed already but not yet acknowledged: must not show up twice
+        (ids[3], {"app_id": APP_ID, "timestamp": "2026-01-01T00:00:05"}),
+    ])
+    clickhouse = FakeClickHouse([_ch_row(ids[3]), _ch_row(ids[1])])
+    service = LogQueryService(clickhouse_services=clickhouse, redis_services=redis_services)
+
+    page = service.query(APP_ID, LogQuery(limit=3))
+    assert [str(row["log_id"]) for row in page["logs"]] == [ids[3], ids[2], ids[1]]
+    assert decode_cursor(page["next_cursor"]) == (SECOND_US, ids[1])
+    assert all("_cursor_us" not in row for row in page["logs"])
+
+    clickhouse.rows = []
+    page = service.query(APP_ID, LogQuery(limit=3, cursor=page["next_cursor"]))
+    assert [str(row["log_id"]) for row in page["logs"]] == [ids[0]]
+    assert page["next_cursor"] is None
+
+    query, parameters = clickhouse.queries[-1]
+    assert "toString(log_id)" in query
+    assert parameters["cursor_id"] == ids[1]
+
+
+def test_buffered_timestamps_keep_the_column_precision(redis_services):
+    log_id = str(uuid.uuid4())
+    redis_services.buffer_logs([(log_id, {"app_id": APP_ID, "timestamp": "2026-01-01T00:00:05.123456"})])
+    service = LogQueryService(clickhouse_services=FakeClickHouse([], "DateTime64(3, 'UTC')"), redis_services=redis_services)
+
+    page = service.query(APP_ID, LogQuery(limit=10))
+    assert page["logs"][0]["timestamp"] == datetime(2026, 1, 1, 0, 0, 5, 123000)
@@ -0,0 +1,58 @@
+from src.fetch.cache import QueryResultCache
+from src.logging.ingestion import LogIngestionService
+
+APP_ID = "8f0c5a56-6c1d-4a2e-9c55-3f1b6a0e2d11"
+
+
+class FakeClickHouse:
+    insert_mode = "native"
+
+    def __init__(self):
+        self.rows = []
+
+    def insert_log(self, entries, settings=None, async_insert=None):
+        self.rows.extend(entries)
+        return len(entries)
+
+
+def _cache(fake_redis) -> QueryResultCache:
+    return QueryResultCache(redis_client=lambda: fake_redis, ttl=30)
+
+
+def test_keys_mode_drain_leaves_other_string_keys(fake_redis, redis_services):
+    cache = _cache(fake_redis)
+    key = cache.key(APP_ID, "query", {"limit": 10})
+    cache.bump([APP_ID])
+    cache.store(key, 1, {"count": 0, "logs": []})
+    fake_redis.set("apikey:0123abcd", b'{"app_id": "x"}')
+
+    redis_services.buffer_logs([("log-1", {"app_id": APP_ID, "timestamp": "2026-01-01T00:00:00"})])
+    handles, entries = redis_services.drain_batch(consumer="test", count=100)
+
+    assert [list(entry) for entry in entries] == [["log-1"]]
+    redis_services.acknowledge(handles)
+    assert fake_redis.get(key) is not None
+    assert fake_redis.get(f"querycache:gen:{APP_ID}") == b"1"
+    assert fake_redis.get("apikey:0123abcd") is not None
+    assert redis_services.backlog() == (0, 0)
+
+
+def test_keys_mode_flush_invalidates_cached_pages(fake_redis, redis_services):
+    cache = _cache(fake_redis)
+    clickhouse = FakeClickHouse()
+    service = LogIngestionService(redis_services=redis_services, click_house_services=clickhouse)
+    service.on_committed = cache.bump
+
+    key = cache.key(APP_ID, "query", {"limit": 10})
+    value, generation = cache.lookup(APP_ID, key)
+    assert value is None
+    cache.store(key, generation, {"count": 0, "logs": []})
+    assert cache.lookup(APP_ID, key)[0] == {"count": 0, "logs": []}
+
+    redis_services.buffer_logs([("log-1", {"app_id": APP_ID, "timestamp": "2026-01-01T00:00:00"})])
+    assert service.drain_redis_to_clickhouse() == 1
+    assert len(clickhouse.rows) == 1
+
+    value, new_generation = cache.lookup(APP_ID, key)
+    assert value is None
+    assert new_generation == generation + 1
@@ -0,0 +1,106 @@
+import pytest
+
+from src.logging.rate_limit import RateLimiter
+
+TENANT = {"app_id": "app", "server_id": "server"}
+
+
+class ScriptRedis:
+    """Runs the token-bucket script itself, against one in-memory hash and a settable clock."""
+
+    def __init__(self):
+        lupa = pytest.importorskip("lupa")
+        self.lua = lupa.LuaRuntime()
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.now_ms = 1_700_000_000_000
+        self.calls = 0
+
+    def _call(self, command, *args):
+        command = command.upper()
+        if command == "TIME":
+            return self.lua.table(str(self.now_ms // 1000), str(self.now_ms % 1000 * 1000))
+        if command == "HMGET":
+            fields = self.hashes.get(args[0], {})
+            return self.lua.table(*[fields.get(name) for name in args[1:]])
+        if command == "HSET":
+            fields = self.hashes.setdefault(args[0], {})
+            for name, value in zip(args[1::2], args[2::2]):
+                fields[name] = str(value)
+            return 1
+        if command == "PEXPIRE":
+            return 1
+        raise NotImplementedError(command)
+
+    def register_script(self, source):
+        script = self.lua.eval(f"function(KEYS, ARGV, redis) {source} end")
+        api = self.lua.table_from({"call": lambda command, *args: self._call(command, *args)})
+
+        def run(keys, args, client=None):
+            self.calls += 1
+            result = script(self.lua.table(*keys), self.lua.table(*[str(arg) for arg in args]), api)
+            return list(result.values())
+
+        return run
+
+    def advance(self, seconds: float) -> None:
+        self.now_ms += int(seconds * 1000)
+
+
+def _limiter(redis_client, **limits) -> RateLimiter:
+    return RateLimiter(redis_client=lambda: redis_client, load_limits=lambda app_id: limits, config_ttl=60)
+
+
+def test_burst_is_admitted_then_denied_until_refilled():
+    redis = ScriptRedis()
+    limiter = _limiter(redis, logs_per_sec=10, logs_burst=20)
+
+    assert limiter.check(TENANT, logs=15) is None
+    # 5 tokens left, 10 needed: one more token arrives every 100ms
+    assert limiter.check(TENANT, logs=10) == 1
+    calls = redis.calls
+
+    # the denial is answered locally until its retry time
+    assert limiter.check(TENANT, logs=1) == 1
+    assert redis.calls == calls
+
+    # a second instance shares the bucket but not the local denial
+    redis.advance(0.4)
+    assert _limiter(redis, logs_per_sec=10, logs_burst=20).check(TENANT, logs=10) == 1
+    redis.advance(0.1)
+    assert _limiter(redis, logs_per_sec=10, logs_burst=20).check(TENANT, logs=10) is None
+
+
+def test_bytes_bucket_limits_independently():
+    limiter = _limiter(ScriptRedis(), logs_per_sec=1000, bytes_per_sec=100, bytes_burst=100)
+
+    assert limiter.check(TENANT, logs=1, size=100) is None
+    assert limiter.check(TENANT, logs=1, size=50) == 1
+
+
+def test_batch_larger_than_the_burst_waits_for_a_full_bucket():
+    redis = ScriptRedis()
+    limiter = _limiter(redis, logs_per_sec=10, logs_burst=10)
+
+    # admitted on a full bucket and driven negative, so the next batch waits longer
+    assert limiter.check(TENANT, logs=30) is None
+    assert limiter.check(TENANT, logs=1) == 3
+
+
+def test_unlimited_tenant_never_touches_redis():
+    redis = ScriptRedis()
+    assert _limiter(redis, logs_per_sec=0, bytes_per_sec=0).check(TENANT, logs=10_000) is None
+    assert redis.calls == 0
+
+
+def test_unavailable_redis_admits():
+    def unavailable():
+        raise ConnectionError("redis is down")
+
+    limiter = RateLimiter(redis_client=unavailable, load_limits=lambda app_id: {"logs_per_sec": 1})
+    assert limiter.check(TENANT, logs=100) is None
+
+
+def test_server_scope_gets_its_own_bucket():
+    limiter = RateLimiter(redis_client=lambda: None, load_limits=lambda app_id: None, scope="server", key_prefix="ratelimit")
+    assert limiter._bucket_key(TENANT) == "ratelimit:app:server"
+    assert limiter._bucket_key({"app_id": "app"}) == "ratelimit:app"
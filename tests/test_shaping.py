@@ -0,0 +1,28 @@
+import uuid
+from datetime import datetime
+
+from src.fetch.shaping import shape_logs
+
+
+def test_rows_are_flattened_sorted_and_json_safe():
+    log_id = uuid.uuid4()
+    redis_records = [{
+        "log_id": "buffered",
+        "timestamp": "2026-01-01T10:00:00+00:00",
+        "message_info": {"message": "later"},
+        "source_info": {"source": {"tenant": {"app_id": "app"}}, "diagnostics": {}},
+    }]
+    clickhouse_records = [
+        {"log_id": log_id, "timestamp": datetime(2026, 1, 1, 9, 0, 0), "score": float("nan")},
+        {"log_id": "no-time", "timestamp": "not a timestamp"},
+    ]
+
+    rows = shape_logs(redis_records, clickhouse_records)
+
+    assert [row["log_id"] for row in rows] == [str(log_id), "buffered", "no-time"]
+    assert [row["timestamp"] for row in rows] == ["2026-01-01T14:30:00+05:30", "2026-01-01T15:30:00+05:30", None]
+    # every row carries the union of keys, and deeper dicts are kept as text
+    assert all(set(row) == set(rows[0]) for row in rows)
+    assert rows[1]["message"] == "later"
+    assert rows[1]["tenant"] == "{'app_id': 'app'}"
+    assert rows[0]["score"] is None
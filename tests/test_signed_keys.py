@@ -0,0 +1,113 @@
+import pytest
+
+from src.api_key.authenticate import GenerateAPIKey
+from src.api_key.cache import APIKeyCache
+from src.api_key.revocation import RevocationSet
+from src.api_key.signed import SignedAPIKeys
+
+APP_ID = "8f0c5a56-6c1d-4a2e-9c55-3f1b6a0e2d11"
+SERVER_ID = "3d6e1b2a-9f4c-4e8d-a1b7-5c2f0e9d8a64"
+
+
+class FakePostgres:
+    def __init__(self):
+        self.revoked: dict[str, str] = {}
+        self.store_revocations = True
+
+    def get_servers_by_app_id(self, app_id):
+        return [{"server_id": SERVER_ID}]
+
+    def insert_api_key(self, app_id, api_key):
+        return True
+
+    def delete_api_key(self, app_id, api_key):
+        return True
+
+    def insert_revoked_api_key(self, key_id, app_id, expires_at=None):
+        if not self.store_revocations:
+            return False
+        self.revoked[key_id] = app_id
+        return True
+
+    def get_revoked_key_ids(self):
+        return list(self.revoked)
+
+    def resolve_tenant(self, app_id, server_id, api_key):
+        return {"key_found": True, "server_found": True}
+
+
+@pytest.fixture
+def api_keys(monkeypatch):
+    monkeypatch.setenv("ENCRYPTION_KEY", "0123456789abcdef0123456789abcdef")
+    monkeypatch.setenv("API_KEY_SIGNING_SECRETS", "1:first-secret")
+    return GenerateAPIKey(db_pgs=FakePostgres())
+
+
+def test_signed_key_verifies_without_postgres():
+    keys = SignedAPIKeys(secrets_spec="1:first-secret")
+    api_key, claims = keys.issue(app_id=APP_ID, server_id=SERVER_ID)
+
+    assert keys.verify(api_key) == claims
+    assert (claims["a"], claims["s"]) == (APP_ID, SERVER_ID)
+
+    payload, _, signature = api_key.partition(".")[2].partition(".")
+    assert keys.verify(f"cl2.{payload}.{'A' * len(signature)}") is None
+    assert keys.verify(f"cl2.{payload[:-2]}.{signature}") is None
+    assert SignedAPIKeys(secrets_spec="1:other-secret").verify(api_key) is None
+
+
+def test_rotated_secret_still_verifies_older_keys():
+    old_key, _ = SignedAPIKeys(secrets_spec="1:first-secret").issue(app_id=APP_ID, server_id=SERVER_ID)
+    rotated = SignedAPIKeys(secrets_spec="1:first-secret,2:second-secret")
+
+    assert rotated.issue(app_id=APP_ID, server_id=SERVER_ID)[1]["v"] == 2
+    assert rotated.verify(old_key) is not None
+    # dropping version 1 retires every key signed with it
+    assert SignedAPIKeys(secrets_spec="2:second-secret").verify(old_key) is None
+
+
+def test_expired_key_is_rejected():
+    keys = SignedAPIKeys(secrets_spec="1:first-secret")
+    api_key, _ = keys.issue(app_id=APP_ID, server_id=SERVER_ID, ttl=-1)
+    assert keys.verify(api_key) is None
+
+
+def test_revoked_signed_key_is_rejected(api_keys):
+    api_key = api_keys.generate_api_key(APP_ID)
+    assert api_keys.validate_api_key(api_key) == (True, APP_ID, SERVER_ID)
+
+    assert api_keys.revoke_api_key(api_key)
+    assert api_keys.validate_api_key(api_key) == (False, None, None)
+
+    # a fresh process picks the revocation up from Postgres on its first lookup
+    restarted = GenerateAPIKey(db_pgs=api_keys.db_pgs)
+    assert restarted.validate_api_key(api_key) == (False, None, None)
+
+
+def test_unstored_revocation_is_reported(api_keys):
+    api_key = api_keys.generate_api_key(APP_ID)
+    api_keys.db_pgs.store_revocations = False
+
+    assert not api_keys.revoke_api_key(api_key)
+    assert api_keys.validate_api_key(api_key) == (True, APP_ID, SERVER_ID)
+
+
+def test_failed_cache_invalidation_is_reported(monkeypatch):
+    monkeypatch.setenv("ENCRYPTION_KEY", "0123456789abcdef0123456789abcdef")
+    monkeypatch.setenv("API_KEY_SIGNING_SECRETS", "")
+
+    def unavailable():
+        raise ConnectionError("redis is down")
+
+    api_keys = GenerateAPIKey(db_pgs=FakePostgres(), cache=APIKeyCache(redis_client=unavailable))
+    api_key = api_keys.generate_api_key(APP_ID)
+
+    # stored, so the key is refused either way; the caller still learns the revocation is incomplete
+    assert not api_keys.revoke_api_key(api_key)
+    assert api_keys.validate_api_key(api_key) == (False, None, None)
+
+
+def test_first_lookup_syncs_the_revocation_list():
+    revocations = RevocationSet(load=lambda: ["revoked-key"], sync_interval=3600)
+    assert revocations.is_revoked("revoked-key")
+    assert not revocations.is_revoked("live-key")
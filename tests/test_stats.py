@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.fetch.stats import LogStatsService, choose_grain
+from src.models.query import LogStatsQuery
+
+APP_ID = "8f0c5a56-6c1d-4a2e-9c55-3f1b6a0e2d11"
+END = datetime(2026, 1, 31, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    monkeypatch.setenv("STATS_MAX_POINTS", "500")
+    return LogStatsService(clickhouse_services=object())
+
+
+def test_grain_is_the_finest_within_the_points_cap():
+    assert choose_grain(END - timedelta(hours=8), END, 500) == "1m"
+    assert choose_grain(END - timedelta(days=7), END, 500) == "1h"
+    assert choose_grain(END - timedelta(days=30), END, 500) == "1d"
+
+
+def test_picked_grain_reads_its_rollup(stats):
+    query, parameters, window = stats.build_query(APP_ID, LogStatsQuery(start=END - timedelta(days=7), end=END))
+    assert window["grain"] == "1h"
+    assert "FROM logs_stats_1h" in query
+    assert parameters["app_id"] == APP_ID
+
+
+@pytest.mark.parametrize("grain,days", [("1m", 1), ("1d", 1000)])
+def test_series_over_the_points_cap_is_rejected(stats, grain, days):
+    # explicit 1m over a day is 1440 buckets; 1d has no coarser fallback
+    with pytest.raises(ValueError, match="more than 500"):
+        stats.build_query(APP_ID, LogStatsQuery(start=END - timedelta(days=days), end=END, grain=grain))
+
+
+def test_unknown_group_by_is_rejected(stats):
+    with pytest.raises(ValueError, match="Cannot group by: app_id"):
+        stats.build_query(APP_ID, LogStatsQuery(start=END - timedelta(hours=1), end=END, group_by="event_type,app_id"))
@@ -0,0 +1,72 @@
+import pytest
+
+APP_ID = "8f0c5a56-6c1d-4a2e-9c55-3f1b6a0e2d11"
+
+
+def _buffer(services, count: int) -> list[str]:
+    log_ids = [f"log-{n}" for n in range(count)]
+    written = services.buffer_logs([(log_id, {"app_id": APP_ID, "timestamp": "2026-01-01T00:00:00"}) for log_id in log_ids])
+    assert written == count
+    return log_ids
+
+
+def _log_ids(entries: list[dict]) -> list[str]:
+    return [log_id for entry in entries for log_id in entry]
+
+
+def test_each_entry_is_claimed_by_one_drainer(stream_services):
+    log_ids = _buffer(stream_services, 3)
+
+    first_handles, first = stream_services.drain_batch(consumer="a", count=2)
+    second_handles, second = stream_services.drain_batch(consumer="b", count=10)
+    assert _log_ids(first) == log_ids[:2]
+    assert _log_ids(second) == log_ids[2:]
+    assert stream_services.drain_batch(consumer="c", count=10) == ([], [])
+
+    assert stream_services.acknowledge(first_handles) == 2
+    assert stream_services.acknowledge(second_handles) == 1
+    assert stream_services.backlog() == (0, 0)
+
+
+def test_entries_of_a_dead_drainer_are_reclaimed(stream_services):
+    log_ids = _buffer(stream_services, 2)
+    stream_services.drain_batch(consumer="dead", count=10)
+
+    # not idle long enough yet: nobody else may take them
+    assert stream_services.drain_batch(consumer="live", count=10) == ([], [])
+
+    stream_services.stream_claim_idle_ms = 0
+    handles, entries = stream_services.drain_batch(consumer="live", count=10)
+    assert _log_ids(entries) == log_ids
+
+    assert stream_services.acknowledge(handles) == 2
+    # acking the same entries again must not take them off the counters twice
+    assert stream_services.acknowledge(handles) == 0
+    assert stream_services.backlog() == (0, 0)
+
+
+def test_acked_entries_are_trimmed_behind_pending_ones(fake_redis, stream_services):
+    _buffer(stream_services, 3)
+    first_handles, _ = stream_services.drain_batch(consumer="a", count=1)
+    stream_services.drain_batch(consumer="b", count=1)
+    last_handles, _ = stream_services.drain_batch(consumer="c", count=1)
+
+    # the oldest pending entry (b's) is kept, and everything after it
+    stream_services.acknowledge(first_handles + last_handles)
+    assert fake_redis.xlen(stream_services.stream_key) == 2
+
+
+@pytest.mark.parametrize("services_fixture,command", [("stream_services", "xack"), ("redis_services", "delete")])
+def test_failed_ack_keeps_the_backlog(request, fake_redis, monkeypatch, services_fixture, command):
+    services = request.getfixturevalue(services_fixture)
+    _buffer(services, 2)
+    handles, _ = services.drain_batch(consumer="a", count=10)
+    backlog = services.backlog()
+
+    def unavailable(*args, **kwargs):
+        raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(fake_redis, command, unavailable)
+    with pytest.raises(ConnectionError):
+        services.acknowledge(handles)
+    assert services.backlog() == backlog
@@ -0,0 +1,105 @@
+import json
+
+from src.logging.ingestion import LogIngestionService
+from src.logging.wal import WALReplayer, WriteAheadLog
+
+
+def _wal(directory) -> WriteAheadLog:
+    return WriteAheadLog(directory=str(directory), segment_bytes=4096, fsync_policy="never")
+
+
+def _records(wal: WriteAheadLog, path: str) -> list[bytes]:
+    return [payload for payload, _ in wal.read_segment(path)]
+
+
+def test_records_survive_reopen(tmp_path):
+    wal = _wal(tmp_path)
+    assert wal.append(b"first")
+    assert wal.append(b"second")
+    wal.close()
+
+    reopened = _wal(tmp_path)
+    [path] = reopened._segment_paths()
+    assert _records(reopened, path) == [b"first", b"second"]
+
+    # appends continue after the recovered records instead of overwriting them
+    assert reopened.append(b"third")
+    reopened.close()
+    assert _records(reopened, path) == [b"first", b"second", b"third"]
+
+
+def test_torn_tail_is_dropped_on_recovery(tmp_path):
+    wal = _wal(tmp_path)
+    wal.append(b"intact")
+    wal.append(b"torn")
+    wal.close()
+
+    [path] = wal._segment_paths()
+    with open(path, "r+b") as f:
+        data = f.read()
+        f.seek(data.index(b"torn"))
+        f.write(b"TORN")
+
+    reopened = _wal(tmp_path)
+    assert _records(reopened, path) == [b"intact"]
+    reopened.append(b"next")
+    reopened.close()
+    assert _records(reopened, path) == [b"intact", b"next"]
+
+
+def test_replay_resumes_after_sink_failure(tmp_path):
+    wal = _wal(tmp_path)
+    for record in (b"a", b"b", b"c"):
+        wal.append(record)
+    wal.seal()
+
+    delivered: list[bytes] = []
+
+    def flaky_sink(batch: list[bytes]) -> bool:
+        if batch == [b"b"]:
+            return False
+        delivered.extend(batch)
+        return True
+
+    replayer = WALReplayer(wal, sink=flaky_sink, batch_size=1)
+    assert replayer.replay() == 1
+
+    replayer.sink = lambda batch: delivered.extend(batch) or True
+    assert replayer.replay() == 2
+    assert delivered == [b"a", b"b", b"c"]
+    assert not wal.has_pending()
+
+
+def test_active_segment_is_sealed_only_once_it_has_aged(tmp_path, monkeypatch):
+    monkeypatch.setenv("WAL_SEAL_AFTER_SECONDS", "3600")
+    wal = _wal(tmp_path)
+    wal.append(b"young")
+
+    delivered: list[bytes] = []
+    replayer = WALReplayer(wal, sink=lambda batch: delivered.extend(batch) or True)
+    assert replayer.replay() == 0
+    assert wal.has_pending()
+
+    replayer.seal_after = 0
+    assert replayer.replay() == 1
+    assert delivered == [b"young"]
+
+
+def test_batch_spill_replays_into_redis(tmp_path, redis_services):
+    service = LogIngestionService(redis_services=redis_services, click_house_services=object())
+    service.wal = _wal(tmp_path)
+    log_pairs = [
+        ("log-1", {"app_id": "app", "timestamp": "2026-01-01T00:00:00"}),
+        ("log-2", {"app_id": "app", "timestamp": "2026-01-01T00:00:01"}),
+    ]
+    assert service._spill_to_wal(log_pairs)
+    service.wal.seal()
+
+    [path] = service.wal.sealed_segments()
+    [record] = _records(service.wal, path)
+    assert [item["log_id"] for item in json.loads(record)] == ["log-1", "log-2"]
+
+    assert WALReplayer(service.wal, sink=service.replay_wal_records).replay() == 1
+    buffered = redis_services.get_object()
+    assert sorted(log_id for entry in buffered for log_id in entry) == ["log-1", "log-2"]
+    assert redis_services.buffered_count() == 2